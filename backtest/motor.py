@@ -0,0 +1,449 @@
+import itertools
+import time
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from conexion.barras import Barras
+from estrategias.base import Barra
+
+# Tipos de posición (mismos valores que POSITION_TYPE_BUY/SELL de MT5)
+POSICION_COMPRA = 0
+POSICION_VENTA = 1
+
+# Formato de las barras que reproduce el motor
+DTYPE_BARRAS = np.dtype([('time', 'i8'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'),
+                         ('close', 'f8'), ('spread', 'i4')])
+
+
+def preparar_barras(datos):
+    """
+    Convierte los datos históricos a un arreglo estructurado de barras
+
+    Args:
+        datos: Barras, DataFrame de obtener_datos_historicos o arreglo estructurado de MT5/AlmacenBarras
+
+    Returns:
+        Arreglo estructurado con los campos time (segundos), open, high, low, close y spread
+    """
+    if isinstance(datos, Barras):
+        barras = np.zeros(len(datos), dtype=DTYPE_BARRAS)
+        for campo in DTYPE_BARRAS.names:
+            if campo in datos:
+                barras[campo] = datos[campo]
+        return barras
+
+    if isinstance(datos, pd.DataFrame):
+        barras = np.zeros(len(datos), dtype=DTYPE_BARRAS)
+        tiempos = datos['time']
+        if pd.api.types.is_datetime64_any_dtype(tiempos):
+            tiempos = tiempos.astype('datetime64[s]').astype('int64')
+        barras['time'] = tiempos
+        for campo in ('open', 'high', 'low', 'close', 'spread'):
+            if campo in datos:
+                barras[campo] = datos[campo].to_numpy()
+            elif campo != 'spread':
+                barras[campo] = datos['close'].to_numpy()
+        return barras
+
+    # Si ya tiene el formato esperado se usa tal cual, sin copiar
+    if datos.dtype == DTYPE_BARRAS:
+        return datos
+    nombres = datos.dtype.names
+    if nombres is None or 'close' not in nombres:
+        raise ValueError("Los datos deben tener al menos los campos 'time' y 'close'")
+    barras = np.zeros(len(datos), dtype=DTYPE_BARRAS)
+    for campo in DTYPE_BARRAS.names:
+        if campo in nombres:
+            barras[campo] = datos[campo]
+        elif campo != 'spread':
+            barras[campo] = datos['close']
+    return barras
+
+
+class Posicion:
+    """
+    Posición abierta en el simulador (atributos equivalentes a TradePosition de MT5)
+    """
+    __slots__ = ('ticket', 'symbol', 'type', 'volume', 'price_open', 'sl', 'tp',
+                 'time', 'comment', 'profit')
+
+    def __init__(self, ticket, symbol, tipo, volumen, precio, sl, tp, tiempo, comentario):
+        """
+        Inicializa la posición con los datos de su apertura
+        """
+        self.ticket = ticket
+        self.symbol = symbol
+        self.type = tipo
+        self.volume = volumen
+        self.price_open = precio
+        self.sl = sl
+        self.tp = tp
+        self.time = tiempo
+        self.comment = comentario
+        self.profit = 0.0
+
+
+class ConectorBacktest:
+    """
+    Conector simulado que reproduce barras históricas exponiendo la misma
+    interfaz que ConectorMT5, con ejecuciones simuladas, spread y comisión
+    """
+    def __init__(self, barras, par_divisas="EURUSD", periodo_tiempo=None, capital_inicial=10000.0,
+                 spread=None, punto=0.00001, comision=0.0, tamano_contrato=100000):
+        """
+        Inicializa el conector simulado
+
+        Args:
+            barras: Arreglo estructurado devuelto por preparar_barras
+            par_divisas: Símbolo simulado
+            periodo_tiempo: Periodo de las barras
+            capital_inicial: Balance inicial de la cuenta
+            spread: Spread fijo en puntos (por defecto el de cada barra)
+            punto: Tamaño de un punto del símbolo
+            comision: Comisión por lote y por lado, en moneda de la cuenta
+            tamano_contrato: Unidades por lote
+        """
+        self.par_divisas = par_divisas
+        self.periodo_tiempo = periodo_tiempo
+        self.conectado = True
+        self.capital_inicial = capital_inicial
+        self.balance = capital_inicial
+        self.punto = punto
+        self.comision = comision
+        self.tamano_contrato = tamano_contrato
+        self._barras = barras
+        self._spreads = (np.full(len(barras), float(spread)) if spread is not None
+                         else barras['spread'].astype(np.float64)) * punto
+        self._indice = -1
+        self._tickets = itertools.count(1)
+        self._posiciones = {}
+        # Tickets cerrados por stop loss o take profit, con el motivo
+        self._cerradas_por_stop = {}
+        self.operaciones = []
+        self.avisos = []
+
+    def conectar(self):
+        """
+        La conexión simulada siempre está disponible
+        """
+        self.conectado = True
+        return True
+
+    def desconectar(self):
+        """
+        Marca el conector simulado como desconectado
+        """
+        self.conectado = False
+
+    def _precios(self):
+        """
+        Obtiene (bid, ask) de la barra actual
+        """
+        bid = float(self._barras['close'][self._indice])
+        return bid, bid + float(self._spreads[self._indice])
+
+    def _flotante(self, bid, ask):
+        """
+        Calcula el beneficio no realizado de las posiciones abiertas
+        """
+        total = 0.0
+        for posicion in self._posiciones.values():
+            if posicion.type == POSICION_COMPRA:
+                posicion.profit = (bid - posicion.price_open) * posicion.volume * self.tamano_contrato
+            else:
+                posicion.profit = (posicion.price_open - ask) * posicion.volume * self.tamano_contrato
+            total += posicion.profit
+        return total
+
+    def obtener_info_cuenta(self):
+        """
+        Obtiene la información simulada de la cuenta
+        """
+        flotante = self._flotante(*self._precios()) if self._posiciones else 0.0
+        return SimpleNamespace(login=0, balance=self.balance, equity=self.balance + flotante,
+                               profit=flotante, margin=0.0)
+
+    def obtener_divisas_disponibles(self):
+        """
+        Obtiene el único símbolo simulado
+        """
+        return [(self.par_divisas, "Backtest")]
+
+    def obtener_barras(self, numero_barras=1000, par_divisas=None, periodo_tiempo=None):
+        """
+        Obtiene las barras hasta la actual (nunca barras futuras), como vista sin copia
+        """
+        fin = self._indice + 1
+        if fin <= 0:
+            raise ValueError(f"No se pudieron obtener datos históricos para {self.par_divisas}")
+        return self._barras[max(0, fin - numero_barras):fin]
+
+    def obtener_datos(self, numero_barras=1000, par_divisas=None, periodo_tiempo=None, dtype=None):
+        """
+        Obtiene las barras hasta la actual como contenedor Barras
+        """
+        return Barras.desde_arreglo(self.obtener_barras(numero_barras), dtype)
+
+    def obtener_datos_historicos(self, numero_barras=1000, par_divisas=None, periodo_tiempo=None):
+        """
+        Obtiene las barras hasta la actual como DataFrame
+        """
+        df = pd.DataFrame(self.obtener_barras(numero_barras))
+        df['time'] = pd.to_datetime(df['time'], unit='s')
+        return df
+
+    def obtener_datos_multiples(self, solicitudes, numero_barras=1000):
+        """
+        Obtiene los datos del símbolo simulado para cada solicitud
+        """
+        return {clave: self.obtener_datos(numero_barras) for clave in dict.fromkeys(solicitudes)}
+
+    def abrir_posicion(self, tipo, volumen, par_divisas=None, sl=None, tp=None, comentario=""):
+        """
+        Abre una posición al precio de cierre de la barra actual
+
+        Args:
+            tipo: 'compra' o 'venta'
+            volumen: Volumen en lotes
+            par_divisas: Símbolo (solo se admite el simulado)
+            sl: Precio de stop loss (opcional)
+            tp: Precio de take profit (opcional)
+            comentario: Comentario de la orden
+
+        Returns:
+            Ticket de la posición
+
+        Raises:
+            ValueError: Si el tipo o el volumen no son válidos
+        """
+        if tipo not in ('compra', 'venta'):
+            raise ValueError(f"Tipo de orden no válido: {tipo}")
+        if volumen <= 0:
+            raise ValueError("El volumen debe ser mayor que cero")
+        bid, ask = self._precios()
+        ticket = next(self._tickets)
+        tipo_posicion = POSICION_COMPRA if tipo == 'compra' else POSICION_VENTA
+        precio = ask if tipo_posicion == POSICION_COMPRA else bid
+        self._posiciones[ticket] = Posicion(ticket, self.par_divisas, tipo_posicion, volumen, precio,
+                                            sl, tp, int(self._barras['time'][self._indice]), comentario)
+        self.balance -= self.comision * volumen
+        return ticket
+
+    def cerrar_posicion(self, ticket, precio=None, motivo=None):
+        """
+        Cierra una posición al precio actual (o al indicado, para stops).
+        Cerrar una posición que ya cerró su stop loss o take profit no hace
+        nada y queda anotado en avisos, porque la estrategia no se entera del stop
+
+        Returns:
+            Beneficio neto de la operación, o None si ya la había cerrado un stop
+
+        Raises:
+            ValueError: Si la posición no existe
+        """
+        posicion = self._posiciones.pop(ticket, None)
+        if posicion is None:
+            if ticket in self._cerradas_por_stop:
+                self.avisos.append(f"Cierre ignorado de la posición {ticket}: ya cerrada por "
+                                   f"{self._cerradas_por_stop[ticket]}")
+                return None
+            raise ValueError(f"No existe la posición {ticket}")
+        if motivo is not None:
+            self._cerradas_por_stop[ticket] = motivo
+        bid, ask = self._precios()
+        if posicion.type == POSICION_COMPRA:
+            salida = bid if precio is None else precio
+            bruto = (salida - posicion.price_open) * posicion.volume * self.tamano_contrato
+        else:
+            salida = ask if precio is None else precio
+            bruto = (posicion.price_open - salida) * posicion.volume * self.tamano_contrato
+        comision = self.comision * posicion.volume
+        self.balance += bruto - comision
+        self.operaciones.append({
+            'ticket': ticket,
+            'tipo': 'compra' if posicion.type == POSICION_COMPRA else 'venta',
+            'volumen': posicion.volume,
+            'tiempo_apertura': posicion.time,
+            'precio_apertura': posicion.price_open,
+            'tiempo_cierre': int(self._barras['time'][self._indice]),
+            'precio_cierre': salida,
+            'motivo': motivo or 'cierre',
+            # Beneficio neto incluyendo la comisión de apertura y de cierre
+            'beneficio': bruto - 2 * comision,
+        })
+        return bruto - 2 * comision
+
+    def obtener_posiciones(self, par_divisas=None):
+        """
+        Obtiene las posiciones abiertas en el simulador
+        """
+        return list(self._posiciones.values())
+
+    def _revisar_stops(self, apertura, maximo, minimo, spread):
+        """
+        Cierra las posiciones cuyo stop loss o take profit se alcanzó en la
+        barra actual. Si ambos caben en la barra se asume el stop loss. Si la
+        barra abre más allá del nivel (hueco) la ejecución es al precio de
+        apertura, no al del stop
+        """
+        for posicion in list(self._posiciones.values()):
+            if posicion.type == POSICION_COMPRA:
+                if posicion.sl is not None and minimo <= posicion.sl:
+                    self.cerrar_posicion(posicion.ticket, min(posicion.sl, apertura), 'sl')
+                elif posicion.tp is not None and maximo >= posicion.tp:
+                    self.cerrar_posicion(posicion.ticket, max(posicion.tp, apertura), 'tp')
+            else:
+                if posicion.sl is not None and maximo + spread >= posicion.sl:
+                    self.cerrar_posicion(posicion.ticket, max(posicion.sl, apertura + spread), 'sl')
+                elif posicion.tp is not None and minimo + spread <= posicion.tp:
+                    self.cerrar_posicion(posicion.ticket, min(posicion.tp, apertura + spread), 'tp')
+
+
+class ResultadoBacktest:
+    """
+    Resultado de un backtest: curva de equity, operaciones y métricas
+    """
+    def __init__(self, tiempos, curva_equity, operaciones, capital_inicial, duracion, avisos=None):
+        """
+        Inicializa el resultado
+
+        Args:
+            tiempos: Marcas de tiempo de las barras procesadas
+            curva_equity: Equity al cierre de cada barra
+            operaciones: Lista de operaciones cerradas
+            capital_inicial: Balance inicial de la cuenta
+            duracion: Segundos que tardó el backtest
+            avisos: Mensajes del simulador (ej: cierres ignorados de posiciones ya cerradas)
+        """
+        self.tiempos = tiempos
+        self.curva_equity = curva_equity
+        self.operaciones = operaciones
+        self.capital_inicial = capital_inicial
+        self.duracion = duracion
+        self.avisos = avisos or []
+
+    def resumen(self):
+        """
+        Calcula las métricas principales del backtest
+
+        Returns:
+            Diccionario con beneficio neto, operaciones, ganadoras, perdedoras,
+            factor de beneficio, drawdown máximo y barras por segundo
+        """
+        beneficios = np.array([op['beneficio'] for op in self.operaciones], dtype=np.float64)
+        ganancias = float(beneficios[beneficios > 0].sum())
+        perdidas = float(-beneficios[beneficios < 0].sum())
+        if len(self.curva_equity):
+            maximos = np.maximum.accumulate(self.curva_equity)
+            drawdown = float(np.max((maximos - self.curva_equity) / maximos))
+            equity_final = float(self.curva_equity[-1])
+        else:
+            drawdown = 0.0
+            equity_final = self.capital_inicial
+        return {
+            'beneficio_neto': equity_final - self.capital_inicial,
+            'operaciones': len(beneficios),
+            'ganadoras': int((beneficios > 0).sum()),
+            'perdedoras': int((beneficios < 0).sum()),
+            'ganancias': ganancias,
+            'perdidas': perdidas,
+            'factor_beneficio': ganancias / perdidas if perdidas > 0 else float('inf') if ganancias > 0 else 0.0,
+            'drawdown_maximo': drawdown,
+            'barras': len(self.curva_equity),
+            'barras_por_segundo': len(self.curva_equity) / self.duracion if self.duracion > 0 else 0.0,
+        }
+
+    def obtener_operaciones(self):
+        """
+        Obtiene las operaciones cerradas como DataFrame
+        """
+        return pd.DataFrame(self.operaciones)
+
+
+class MotorBacktest:
+    """
+    Motor de backtest orientado a eventos: reproduce las barras una a una a
+    través de un ConectorBacktest y llama a EstrategiaBase.en_barra en cada cierre
+    """
+    def __init__(self, datos, par_divisas="EURUSD", periodo_tiempo=None, capital_inicial=10000.0,
+                 spread=None, punto=0.00001, comision=0.0, tamano_contrato=100000):
+        """
+        Inicializa el motor
+
+        Args:
+            datos: DataFrame o arreglo estructurado con las barras históricas
+            par_divisas: Símbolo simulado
+            periodo_tiempo: Periodo de las barras
+            capital_inicial: Balance inicial de la cuenta
+            spread: Spread fijo en puntos (por defecto el de cada barra)
+            punto: Tamaño de un punto del símbolo
+            comision: Comisión por lote y por lado
+            tamano_contrato: Unidades por lote
+        """
+        self.barras = preparar_barras(datos)
+        self.conector = ConectorBacktest(self.barras, par_divisas, periodo_tiempo, capital_inicial,
+                                         spread, punto, comision, tamano_contrato)
+
+    @classmethod
+    def desde_almacen(cls, almacen, par_divisas, periodo_tiempo, numero_barras=None, **kwargs):
+        """
+        Crea un motor a partir de las barras guardadas en un AlmacenBarras
+
+        Raises:
+            ValueError: Si no hay barras guardadas
+        """
+        barras = almacen.leer(par_divisas, periodo_tiempo, numero_barras)
+        if barras is None:
+            raise ValueError(f"No hay barras guardadas de {par_divisas}")
+        return cls(barras, par_divisas, periodo_tiempo, **kwargs)
+
+    def ejecutar(self, estrategia):
+        """
+        Ejecuta el backtest de una estrategia creada con self.conector
+
+        Args:
+            estrategia: Instancia de EstrategiaBase
+
+        Returns:
+            ResultadoBacktest
+        """
+        conector = self.conector
+        barras = self.barras
+        n = len(barras)
+        # Listas de Python: el acceso por índice es mucho más rápido que sobre numpy
+        tiempos = barras['time'].tolist()
+        aperturas = barras['open'].tolist()
+        maximos = barras['high'].tolist()
+        minimos = barras['low'].tolist()
+        cierres = barras['close'].tolist()
+        spreads = conector._spreads.tolist()
+        curva = np.empty(n, dtype=np.float64)
+
+        inicio = time.perf_counter()
+        estrategia.iniciar()
+        procesadas = 0
+        for i in range(n):
+            conector._indice = i
+            if conector._posiciones:
+                conector._revisar_stops(aperturas[i], maximos[i], minimos[i], spreads[i])
+            estrategia.en_barra(Barra(tiempos[i], aperturas[i], maximos[i], minimos[i], cierres[i]))
+            if conector._posiciones:
+                curva[i] = conector.balance + conector._flotante(cierres[i], cierres[i] + spreads[i])
+            else:
+                curva[i] = conector.balance
+            procesadas = i + 1
+            if not estrategia.activo:
+                break
+
+        # Cerrar lo que quede abierto al final de los datos
+        for ticket in list(conector._posiciones):
+            conector.cerrar_posicion(ticket)
+        if procesadas:
+            curva[procesadas - 1] = conector.balance
+        if estrategia.activo:
+            estrategia.detener()
+        duracion = time.perf_counter() - inicio
+
+        return ResultadoBacktest(barras['time'][:procesadas], curva[:procesadas],
+                                 list(conector.operaciones), conector.capital_inicial, duracion,
+                                 list(conector.avisos))
@@ -0,0 +1,169 @@
+import itertools
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from .motor import ConectorBacktest, MotorBacktest, preparar_barras
+
+# Estado de cada proceso de trabajo (se rellena en _inicializar_proceso)
+_BARRAS = None
+_MEMORIA = None
+_CLASE_ESTRATEGIA = None
+_OPCIONES_MOTOR = None
+
+
+class _ColaNula:
+    """
+    Cola que descarta los mensajes de las estrategias durante la optimización
+    """
+    def put(self, evento):
+        pass
+
+
+def _inicializar_proceso(nombre_memoria, forma, dtype, clase_estrategia, opciones_motor):
+    """
+    Conecta el proceso de trabajo con las barras en memoria compartida
+    """
+    global _BARRAS, _MEMORIA, _CLASE_ESTRATEGIA, _OPCIONES_MOTOR
+    _MEMORIA = shared_memory.SharedMemory(name=nombre_memoria)
+    _BARRAS = np.ndarray(forma, dtype=dtype, buffer=_MEMORIA.buf)
+    _CLASE_ESTRATEGIA = clase_estrategia
+    _OPCIONES_MOTOR = opciones_motor
+
+
+def _evaluar(parametros):
+    """
+    Ejecuta un backtest con una combinación de parámetros
+
+    Returns:
+        Diccionario con los parámetros y las métricas, o None si la combinación no es válida
+    """
+    motor = MotorBacktest(_BARRAS, **_OPCIONES_MOTOR)
+    try:
+        estrategia = _CLASE_ESTRATEGIA(motor.conector, **parametros)
+    except ValueError:
+        return None
+    estrategia.cola_eventos = _ColaNula()
+    resultado = motor.ejecutar(estrategia).resumen()
+    return {**parametros, **resultado}
+
+
+class Optimizador:
+    """
+    Búsqueda de parámetros de estrategias (en rejilla o aleatoria) en paralelo
+    sobre un pool de procesos. Las barras se comparten entre procesos mediante
+    memoria compartida en lugar de serializarlas en cada tarea
+    """
+    def __init__(self, clase_estrategia, datos, parametros, metrica='beneficio_neto',
+                 max_procesos=None, **opciones_motor):
+        """
+        Inicializa el optimizador
+
+        Args:
+            clase_estrategia: Subclase de EstrategiaBase; recibe los parámetros como argumentos con nombre
+            datos: DataFrame o arreglo estructurado con las barras históricas
+            parametros: Diccionario {nombre: lista de valores} a explorar
+            metrica: Métrica del resumen del backtest usada para ordenar (mayor es mejor)
+            max_procesos: Número de procesos (por defecto todos los núcleos)
+            opciones_motor: Argumentos adicionales para MotorBacktest (spread, comision, ...)
+        """
+        if not parametros:
+            raise ValueError("Debe indicar al menos un parámetro a optimizar")
+        self.clase_estrategia = clase_estrategia
+        self.barras = preparar_barras(datos)
+        self.parametros = {nombre: list(valores) for nombre, valores in parametros.items()}
+        self.metrica = metrica
+        self.max_procesos = max_procesos
+        self.opciones_motor = opciones_motor
+        self._conector_validacion = None
+
+    def es_valida(self, parametros):
+        """
+        Indica si la estrategia acepta una combinación de parámetros (su
+        constructor no lanza ValueError, ej: periodo rápido >= lento)
+        """
+        if self._conector_validacion is None:
+            self._conector_validacion = ConectorBacktest(self.barras, **self.opciones_motor)
+        try:
+            self.clase_estrategia(self._conector_validacion, **parametros)
+        except ValueError:
+            return False
+        return True
+
+    def combinaciones_rejilla(self):
+        """
+        Genera todas las combinaciones válidas de la rejilla de parámetros
+        """
+        nombres = list(self.parametros)
+        for valores in itertools.product(*self.parametros.values()):
+            parametros = dict(zip(nombres, valores))
+            if self.es_valida(parametros):
+                yield parametros
+
+    def combinaciones_aleatorias(self, cantidad, semilla=None):
+        """
+        Genera combinaciones aleatorias distintas y válidas de la rejilla de
+        parámetros. Las no válidas se descartan sin contar para la cantidad
+
+        Args:
+            cantidad: Número máximo de combinaciones válidas
+            semilla: Semilla para reproducir la búsqueda
+        """
+        generador = random.Random(semilla)
+        total = 1
+        for valores in self.parametros.values():
+            total *= len(valores)
+        vistas = set()
+        generadas = 0
+        while generadas < cantidad and len(vistas) < total:
+            indices = tuple(generador.randrange(len(valores)) for valores in self.parametros.values())
+            if indices in vistas:
+                continue
+            vistas.add(indices)
+            parametros = {nombre: valores[i] for (nombre, valores), i in zip(self.parametros.items(), indices)}
+            if self.es_valida(parametros):
+                generadas += 1
+                yield parametros
+
+    def ejecutar(self, busqueda='rejilla', cantidad=100, semilla=None):
+        """
+        Ejecuta la búsqueda de parámetros
+
+        Args:
+            busqueda: 'rejilla' o 'aleatoria'
+            cantidad: Combinaciones a evaluar en la búsqueda aleatoria
+            semilla: Semilla de la búsqueda aleatoria
+
+        Returns:
+            DataFrame con una fila por combinación válida, ordenado por la métrica
+        """
+        if busqueda == 'rejilla':
+            combinaciones = list(self.combinaciones_rejilla())
+        elif busqueda == 'aleatoria':
+            combinaciones = list(self.combinaciones_aleatorias(cantidad, semilla))
+        else:
+            raise ValueError(f"Tipo de búsqueda no válido: {busqueda}")
+
+        memoria = shared_memory.SharedMemory(create=True, size=max(1, self.barras.nbytes))
+        try:
+            compartidas = np.ndarray(self.barras.shape, dtype=self.barras.dtype, buffer=memoria.buf)
+            compartidas[:] = self.barras
+            with ProcessPoolExecutor(
+                max_workers=self.max_procesos,
+                initializer=_inicializar_proceso,
+                initargs=(memoria.name, self.barras.shape, self.barras.dtype,
+                          self.clase_estrategia, self.opciones_motor)
+            ) as pool:
+                # Lotes grandes para amortizar la comunicación entre procesos
+                lote = max(1, len(combinaciones) // ((self.max_procesos or 8) * 4))
+                resultados = [r for r in pool.map(_evaluar, combinaciones, chunksize=lote) if r is not None]
+            del compartidas
+        finally:
+            memoria.close()
+            memoria.unlink()
+
+        tabla = pd.DataFrame(resultados)
+        if not tabla.empty:
+            tabla = tabla.sort_values(self.metrica, ascending=False).reset_index(drop=True)
+        return tabla
@@ -0,0 +1,232 @@
+"""
+Benchmarks de los caminos críticos del bot: indicadores, construcción de
+DataFrames de datos históricos, listado de símbolos y comprobaciones de
+riesgo. Se ejecutan sin terminal ni interfaz gráfica usando el backend simulado:
+
+    python -m benchmarks.ejecutar --max-barras 1000000 --json resultados.json
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from conexion.backend import TIMEFRAME_M1
+from conexion.mt5 import ConectorMT5
+from conexion.riesgo import MotorRiesgo
+from conexion.simulado import BackendSimulado, DTYPE_RATES
+from indicadores.atr import ATR
+from indicadores.bollinger import Bollinger
+from indicadores.ema import EMA
+from indicadores.estocastico import Estocastico
+from indicadores.macd import MACD
+from indicadores.motor import MotorIndicadores
+from indicadores.nucleos import NUCLEOS_DISPONIBLES, usar_nucleos
+from indicadores.rsi import RSI
+from indicadores.sma import SMA
+
+# Tamaños fijos de los conjuntos sintéticos
+TAMANOS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+# Número de símbolos del catálogo simulado para obtener_divisas_disponibles
+TAMANOS_CATALOGO = (100, 1_000, 5_000)
+
+
+def generar_barras(numero_barras, semilla=42):
+    """
+    Genera un arreglo de barras sintéticas reproducible
+
+    Args:
+        numero_barras: Número de barras
+        semilla: Semilla del generador
+
+    Returns:
+        Arreglo estructurado con el mismo formato que MT5
+    """
+    generador = np.random.default_rng(semilla)
+    cierres = 1.1 * np.exp(np.cumsum(generador.normal(0.0, 0.0002, numero_barras)))
+    barras = np.zeros(numero_barras, dtype=DTYPE_RATES)
+    barras['time'] = 1_600_000_000 + 60 * np.arange(numero_barras)
+    barras['open'] = np.concatenate(([1.1], cierres[:-1]))
+    barras['close'] = cierres
+    barras['high'] = np.maximum(barras['open'], cierres) + 0.0001
+    barras['low'] = np.minimum(barras['open'], cierres) - 0.0001
+    barras['tick_volume'] = 100
+    barras['spread'] = 10
+    return barras
+
+
+def medir(funcion, repeticiones, elementos):
+    """
+    Mide latencia, rendimiento y memoria pico de una función
+
+    Args:
+        funcion: Función sin argumentos a medir
+        repeticiones: Veces que se ejecuta para la estadística de latencia
+        elementos: Elementos procesados por llamada (para el rendimiento)
+
+    Returns:
+        Diccionario con mediana, p95, elementos por segundo y memoria pico en MB
+    """
+    funcion()  # calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mediana = statistics.median(tiempos)
+    tiempos.sort()
+    return {
+        'mediana_ms': mediana * 1000,
+        'p95_ms': tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))] * 1000,
+        'elementos_por_segundo': elementos / mediana if mediana > 0 else float('inf'),
+        'memoria_pico_mb': pico / 1e6,
+    }
+
+
+def casos_indicadores(barras):
+    """
+    Casos de cálculo por lotes e incremental de los indicadores
+    """
+    n = len(barras)
+    datos = pd.DataFrame({'close': barras['close']})
+    sma = SMA(20)
+    rsi = RSI(14)
+    motor = MotorIndicadores([('SMA', p) for p in (5, 10, 20, 50, 200)] + [('RSI', p) for p in (7, 14, 21)])
+    yield 'SMA.calcular', lambda: sma.calcular(datos), n
+    yield 'RSI.calcular', lambda: rsi.calcular(datos), n
+    for indicador in (EMA(20), Bollinger(20), MACD()):
+        yield f'{indicador.nombre}.calcular', lambda indicador=indicador: indicador.calcular(datos), n
+    for indicador in (ATR(14), Estocastico()):
+        yield f'{indicador.nombre}.calcular', lambda indicador=indicador: indicador.calcular(barras), n
+    yield 'MotorIndicadores (8 indicadores)', lambda: motor.calcular(barras['close']), n
+
+    precios = barras['close'][:min(n, 100_000)].tolist()
+    sma_incremental = SMA(20)
+    rsi_incremental = RSI(14)
+
+    def actualizar_sma():
+        for precio in precios:
+            sma_incremental.actualizar(precio)
+
+    def actualizar_rsi():
+        for precio in precios:
+            rsi_incremental.actualizar(precio)
+
+    yield 'SMA.actualizar', actualizar_sma, len(precios)
+    yield 'RSI.actualizar', actualizar_rsi, len(precios)
+
+
+def casos_conector(barras):
+    """
+    Casos de obtención de datos históricos a través del conector
+    """
+    n = len(barras)
+    backend = BackendSimulado(datos={('EURUSD', TIMEFRAME_M1): barras})
+    sin_cache = ConectorMT5(backend=backend, usar_cache=False)
+    sin_cache.conectar()
+    con_cache = ConectorMT5(backend=backend)
+    con_cache.conectar()
+    con_cache.obtener_barras(n)
+    yield 'obtener_datos_historicos (sin caché)', lambda: sin_cache.obtener_datos_historicos(n), n
+    yield 'obtener_barras (con caché)', lambda: con_cache.obtener_barras(n), n
+
+
+def casos_catalogo(numero_simbolos):
+    """
+    Casos del listado de símbolos disponibles
+    """
+    sufijos = ["USD", "EUR", "JPY", ".STOCK", "INDEX", "XAU"]
+    simbolos = {f"S{i:05d}{sufijos[i % len(sufijos)]}": 1.0 for i in range(numero_simbolos)}
+    conector = ConectorMT5(backend=BackendSimulado(simbolos=simbolos))
+    conector.conectar()
+    yield 'obtener_divisas_disponibles (forzado)', lambda: conector.obtener_divisas_disponibles(forzar=True), numero_simbolos
+    yield 'obtener_divisas_disponibles (catálogo)', conector.obtener_divisas_disponibles, numero_simbolos
+    yield 'CatalogoSimbolos.buscar', lambda: conector.catalogo.buscar("S001"), numero_simbolos
+
+
+def casos_riesgo(numero_comprobaciones=100_000):
+    """
+    Casos de las comprobaciones previas del motor de riesgo
+    """
+    riesgo = MotorRiesgo(max_volumen_orden=5.0, max_posiciones=100, max_volumen_simbolo=50.0,
+                         max_exposicion_divisa=1e7, max_perdida_diaria=1e6, max_drawdown=0.5)
+    riesgo.balance = 10000.0
+    for ticket, simbolo in enumerate(("EURUSD", "GBPUSD", "USDJPY"), 1):
+        riesgo.actualizar_precio(simbolo, 1.1, 1.1001)
+        riesgo.registrar_apertura(ticket, simbolo, 'compra', 1.0, 1.1)
+
+    def verificar():
+        for _ in range(numero_comprobaciones):
+            riesgo.verificar('compra', 1.0, "EURUSD")
+
+    def actualizar_precio():
+        for _ in range(numero_comprobaciones):
+            riesgo.actualizar_precio("EURUSD", 1.1, 1.1001)
+
+    yield 'MotorRiesgo.verificar', verificar, numero_comprobaciones
+    yield 'MotorRiesgo.actualizar_precio', actualizar_precio, numero_comprobaciones
+
+
+def ejecutar(max_barras=1_000_000, repeticiones=5, filtro=None):
+    """
+    Ejecuta todos los benchmarks
+
+    Args:
+        max_barras: Tamaño máximo de los conjuntos de barras a usar
+        repeticiones: Repeticiones por caso
+        filtro: Texto que debe aparecer en el nombre del caso (opcional)
+
+    Returns:
+        Lista de diccionarios con los resultados
+    """
+    resultados = []
+
+    def registrar(casos, tamano):
+        for nombre, funcion, elementos in casos:
+            if filtro and filtro.lower() not in nombre.lower():
+                continue
+            resultado = {'caso': nombre, 'tamano': tamano, **medir(funcion, repeticiones, elementos)}
+            resultados.append(resultado)
+            print(f"{nombre:<40} {tamano:>10}  mediana {resultado['mediana_ms']:>10.3f} ms  "
+                  f"p95 {resultado['p95_ms']:>10.3f} ms  {resultado['elementos_por_segundo']:>14,.0f} el/s  "
+                  f"pico {resultado['memoria_pico_mb']:>9.2f} MB")
+
+    for tamano in TAMANOS:
+        if tamano > max_barras:
+            break
+        barras = generar_barras(tamano)
+        registrar(casos_indicadores(barras), tamano)
+        registrar(casos_conector(barras), tamano)
+    for numero_simbolos in TAMANOS_CATALOGO:
+        registrar(casos_catalogo(numero_simbolos), numero_simbolos)
+    registrar(casos_riesgo(), 3)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de los caminos críticos del bot")
+    parser.add_argument('--max-barras', type=int, default=1_000_000,
+                        help="Tamaño máximo de los conjuntos (hasta 10000000)")
+    parser.add_argument('--repeticiones', type=int, default=5, help="Repeticiones por caso")
+    parser.add_argument('--filtro', help="Ejecutar solo los casos cuyo nombre contenga este texto")
+    parser.add_argument('--json', help="Archivo donde guardar los resultados en JSON")
+    parser.add_argument('--nucleos', choices=NUCLEOS_DISPONIBLES + ('auto',), default='numpy',
+                        help="Núcleos de cálculo de los indicadores")
+    args = parser.parse_args()
+    print(f"Núcleos de los indicadores: {usar_nucleos(args.nucleos)}")
+
+    resultados = ejecutar(args.max_barras, args.repeticiones, args.filtro)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+
+if __name__ == "__main__":
+    main()
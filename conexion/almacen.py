@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+from urllib.parse import quote
+import numpy as np
+
+class AlmacenBarras:
+    """
+    Almacén local de barras en disco, un archivo binario por símbolo/periodo.
+    Las lecturas usan mapeo en memoria, así que cargar años de barras no
+    requiere parsear ni copiar los datos
+    """
+    def __init__(self, directorio="datos"):
+        """
+        Inicializa el almacén
+        
+        Args:
+            directorio: Carpeta donde se guardan los archivos de barras
+        """
+        self.directorio = directorio
+        self._bloqueo = threading.RLock()
+        os.makedirs(directorio, exist_ok=True)
+
+    def _rutas(self, par_divisas, periodo_tiempo):
+        """
+        Obtiene las rutas del archivo de datos y del archivo de metadatos. El
+        nombre se codifica para que los símbolos con '/', '\\' o ':' (ej:
+        "EUR/USD", ".US30:cash") no salgan del directorio ni colisionen entre sí
+        """
+        nombre = quote(f"{par_divisas}_{periodo_tiempo}", safe='')
+        base = os.path.join(self.directorio, nombre)
+        return base + ".bin", base + ".json"
+
+    def _leer_dtype(self, ruta_meta):
+        """
+        Lee el tipo estructurado guardado en los metadatos
+        """
+        with open(ruta_meta, 'r', encoding='utf-8') as archivo:
+            meta = json.load(archivo)
+        return np.dtype([tuple(campo) for campo in meta['dtype']])
+
+    def existe(self, par_divisas, periodo_tiempo):
+        """
+        Indica si hay barras guardadas para el símbolo/periodo
+        """
+        ruta_datos, ruta_meta = self._rutas(par_divisas, periodo_tiempo)
+        return os.path.exists(ruta_datos) and os.path.exists(ruta_meta)
+
+    def leer(self, par_divisas, periodo_tiempo, numero_barras=None):
+        """
+        Lee las barras guardadas mediante mapeo en memoria (sin copia)
+        
+        Args:
+            par_divisas: Símbolo a leer
+            periodo_tiempo: Periodo de las barras
+            numero_barras: Número de barras finales a devolver (por defecto todas)
+            
+        Returns:
+            Arreglo estructurado de solo lectura, o None si no hay datos guardados
+        """
+        if not self.existe(par_divisas, periodo_tiempo):
+            return None
+        ruta_datos, ruta_meta = self._rutas(par_divisas, periodo_tiempo)
+        with self._bloqueo:
+            dtype = self._leer_dtype(ruta_meta)
+            cantidad = os.path.getsize(ruta_datos) // dtype.itemsize
+            if cantidad == 0:
+                return None
+            barras = np.memmap(ruta_datos, dtype=dtype, mode='r', shape=(cantidad,))
+        if numero_barras is not None:
+            barras = barras[-numero_barras:]
+        return barras
+
+    def ultimo_tiempo(self, par_divisas, periodo_tiempo):
+        """
+        Obtiene la marca de tiempo de la última barra guardada
+        
+        Returns:
+            Segundos desde la época, o None si no hay datos guardados
+        """
+        barras = self.leer(par_divisas, periodo_tiempo, 1)
+        if barras is None:
+            return None
+        return int(barras['time'][-1])
+
+    def escribir(self, par_divisas, periodo_tiempo, barras):
+        """
+        Agrega barras al final del archivo. Solo se guardan las posteriores a
+        la última almacenada; si la primera coincide con ella (barra en
+        formación) se sobrescribe en su lugar
+        
+        Args:
+            par_divisas: Símbolo de las barras
+            periodo_tiempo: Periodo de las barras
+            barras: Arreglo estructurado de MT5 ordenado por tiempo
+        """
+        if barras is None or len(barras) == 0:
+            return
+        ruta_datos, ruta_meta = self._rutas(par_divisas, periodo_tiempo)
+        with self._bloqueo:
+            # Un archivo vacío (sin barras) se reescribe igual que uno nuevo
+            ultimo = self.ultimo_tiempo(par_divisas, periodo_tiempo)
+            if ultimo is None:
+                with open(ruta_meta, 'w', encoding='utf-8') as archivo:
+                    json.dump({'dtype': [list(campo) for campo in barras.dtype.descr]}, archivo)
+                with open(ruta_datos, 'wb') as archivo:
+                    archivo.write(np.ascontiguousarray(barras).tobytes())
+                return
+
+            dtype = self._leer_dtype(ruta_meta)
+            barras = np.ascontiguousarray(barras).astype(dtype, copy=False)
+            barras = barras[barras['time'] >= ultimo]
+            if len(barras) == 0:
+                return
+            with open(ruta_datos, 'r+b') as archivo:
+                if int(barras['time'][0]) == ultimo:
+                    archivo.seek(-dtype.itemsize, os.SEEK_END)
+                else:
+                    archivo.seek(0, os.SEEK_END)
+                archivo.write(barras.tobytes())
+
+    def eliminar(self, par_divisas, periodo_tiempo):
+        """
+        Borra las barras guardadas de un símbolo/periodo
+        """
+        with self._bloqueo:
+            for ruta in self._rutas(par_divisas, periodo_tiempo):
+                if os.path.exists(ruta):
+                    os.remove(ruta)
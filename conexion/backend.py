@@ -0,0 +1,79 @@
+import importlib
+
+# Constantes de MetaTrader 5 (mismos valores que el paquete MetaTrader5), para
+# poder usarlas sin importar el paquete, que solo existe en Windows
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+TIMEFRAME_W1 = 32769
+TIMEFRAME_MN1 = 49153
+
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+
+TRADE_ACTION_DEAL = 1
+TRADE_ACTION_SLTP = 6
+ORDER_TIME_GTC = 0
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_PRICE_CHANGED = 10020
+TRADE_RETCODE_PRICE_OFF = 10021
+
+COPY_TICKS_ALL = -1
+COPY_TICKS_INFO = 1
+COPY_TICKS_TRADE = 2
+
+
+def segundos_periodo(periodo_tiempo):
+    """
+    Convierte una constante TIMEFRAME_* de MT5 a su duración en segundos
+
+    Args:
+        periodo_tiempo: Constante de periodo (ej: TIMEFRAME_M1)
+
+    Returns:
+        Duración de una barra en segundos (los meses se aproximan a 30 días)
+    """
+    if periodo_tiempo == TIMEFRAME_MN1:
+        return 30 * 86400
+    if periodo_tiempo == TIMEFRAME_W1:
+        return 7 * 86400
+    if periodo_tiempo & 0x4000:
+        return (periodo_tiempo & 0x3FFF) * 3600
+    return periodo_tiempo * 60
+
+
+def cargar_backend(backend=None, **opciones):
+    """
+    Obtiene el backend que usa ConectorMT5 para hablar con el terminal
+
+    Args:
+        backend: 'mt5' (paquete MetaTrader5, por defecto), 'simulado' (BackendSimulado
+            con datos sintéticos o grabados) o un objeto con la misma interfaz
+        opciones: Argumentos para construir el backend simulado
+
+    Returns:
+        Objeto con la interfaz del módulo MetaTrader5
+
+    Raises:
+        ImportError: Si se pide el backend real y el paquete MetaTrader5 no está instalado
+        ValueError: Si el nombre del backend no es válido
+    """
+    if backend is None or backend == 'mt5':
+        return importlib.import_module('MetaTrader5')
+    if backend == 'simulado':
+        from .simulado import BackendSimulado
+        return BackendSimulado(**opciones)
+    if isinstance(backend, str):
+        raise ValueError(f"Backend no válido: {backend}")
+    return backend
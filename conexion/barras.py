@@ -0,0 +1,175 @@
+import numpy as np
+from estrategias.base import Barra
+
+# Columnas de precios (se pueden guardar en float32) y columnas enteras
+COLUMNAS_PRECIO = ('open', 'high', 'low', 'close')
+COLUMNAS_ENTERAS = ('time', 'tick_volume', 'spread', 'real_volume')
+COLUMNAS = ('time',) + COLUMNAS_PRECIO + COLUMNAS_ENTERAS[1:]
+
+
+class Barras:
+    """
+    Contenedor compacto de barras OHLCV por columnas. Construido a partir de
+    un arreglo de MT5 cada columna es una vista sin copia; con dtype se
+    obtienen columnas contiguas (por ejemplo float32 para reducir memoria).
+    Se indexa como un DataFrame: barras['close'] devuelve la columna,
+    barras[-1] la última Barra y barras[a:b] otro Barras con vistas
+    """
+    __slots__ = COLUMNAS
+
+    def __init__(self, time, open, high, low, close, tick_volume=None, spread=None, real_volume=None):
+        """
+        Inicializa el contenedor con arreglos de igual longitud
+
+        Args:
+            time: Apertura de cada barra en segundos desde la época (int64)
+            open, high, low, close: Precios de cada barra
+            tick_volume, spread, real_volume: Columnas opcionales
+        """
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.tick_volume = tick_volume
+        self.spread = spread
+        self.real_volume = real_volume
+
+    @classmethod
+    def desde_arreglo(cls, arreglo, dtype=None):
+        """
+        Crea el contenedor a partir de un arreglo estructurado (MT5, caché o almacén)
+
+        Args:
+            arreglo: Arreglo estructurado con al menos time y close
+            dtype: None para usar vistas sin copia del arreglo, o el tipo de las
+                columnas de precios (np.float64, np.float32) para copiarlas contiguas
+
+        Returns:
+            Barras
+        """
+        nombres = arreglo.dtype.names or ()
+        if 'time' not in nombres or 'close' not in nombres:
+            raise ValueError("Los datos deben tener al menos los campos 'time' y 'close'")
+        columnas = {}
+        for nombre in COLUMNAS:
+            if nombre not in nombres:
+                columnas[nombre] = None
+            elif dtype is None:
+                columnas[nombre] = arreglo[nombre]
+            elif nombre in COLUMNAS_PRECIO:
+                columnas[nombre] = np.ascontiguousarray(arreglo[nombre], dtype=dtype)
+            else:
+                columnas[nombre] = np.ascontiguousarray(arreglo[nombre])
+        for nombre in COLUMNAS_PRECIO:
+            if columnas[nombre] is None:
+                columnas[nombre] = columnas['close']
+        return cls(**columnas)
+
+    @classmethod
+    def desde_dataframe(cls, datos, dtype=np.float64):
+        """
+        Crea el contenedor a partir de un DataFrame con columnas como las de MT5
+
+        Args:
+            datos: DataFrame con al menos time y close (time en segundos o datetime)
+            dtype: Tipo de las columnas de precios
+
+        Returns:
+            Barras
+        """
+        tiempos = datos['time'].to_numpy()
+        if np.issubdtype(tiempos.dtype, np.datetime64):
+            tiempos = tiempos.astype('datetime64[s]').astype(np.int64)
+        columnas = {'time': np.ascontiguousarray(tiempos, dtype=np.int64)}
+        for nombre in COLUMNAS[1:]:
+            if nombre in datos:
+                tipo = dtype if nombre in COLUMNAS_PRECIO else None
+                columnas[nombre] = np.ascontiguousarray(datos[nombre].to_numpy(), dtype=tipo)
+            else:
+                columnas[nombre] = None
+        for nombre in COLUMNAS_PRECIO:
+            if columnas[nombre] is None:
+                columnas[nombre] = columnas['close']
+        return cls(**columnas)
+
+    @classmethod
+    def convertir(cls, datos):
+        """
+        Obtiene un Barras a partir de Barras, DataFrame o arreglo estructurado
+        """
+        if isinstance(datos, cls):
+            return datos
+        if isinstance(datos, np.ndarray):
+            return cls.desde_arreglo(datos)
+        return cls.desde_dataframe(datos)
+
+    def __len__(self):
+        return len(self.close)
+
+    def __contains__(self, nombre):
+        return nombre in COLUMNAS and getattr(self, nombre) is not None
+
+    def __getitem__(self, clave):
+        """
+        Obtiene una columna (por nombre), una Barra (por posición) o un Barras (por rebanada)
+        """
+        if isinstance(clave, str):
+            if clave not in COLUMNAS:
+                raise KeyError(clave)
+            columna = getattr(self, clave)
+            if columna is None:
+                raise KeyError(clave)
+            return columna
+        if isinstance(clave, slice):
+            return Barras(**{nombre: None if getattr(self, nombre) is None else getattr(self, nombre)[clave]
+                             for nombre in COLUMNAS})
+        return Barra(int(self.time[clave]), float(self.open[clave]), float(self.high[clave]),
+                     float(self.low[clave]), float(self.close[clave]))
+
+    @property
+    def columnas(self):
+        """
+        Nombres de las columnas disponibles
+        """
+        return [nombre for nombre in COLUMNAS if getattr(self, nombre) is not None]
+
+    @property
+    def ultima(self):
+        """
+        Última barra, o None si el contenedor está vacío
+        """
+        return self[-1] if len(self) else None
+
+    @property
+    def tiempos(self):
+        """
+        Columna time como datetime64[s] (vista sin copia cuando es contigua)
+        """
+        tiempos = np.ascontiguousarray(self.time, dtype=np.int64)
+        return tiempos.view('datetime64[s]')
+
+    @property
+    def nbytes(self):
+        """
+        Memoria propia de las columnas en bytes. Las vistas de un mismo
+        arreglo se cuentan una sola vez
+        """
+        vistos = {}
+        for nombre in COLUMNAS:
+            columna = getattr(self, nombre)
+            if columna is None:
+                continue
+            base = columna if columna.base is None else columna.base
+            vistos[id(base)] = base.nbytes
+        return sum(vistos.values())
+
+    def a_dataframe(self):
+        """
+        Convierte el contenedor a DataFrame (copia), con time como datetime
+        """
+        import pandas as pd
+        datos = {nombre: getattr(self, nombre) for nombre in self.columnas}
+        datos['time'] = self.tiempos
+        return pd.DataFrame(datos)
+
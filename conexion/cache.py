@@ -0,0 +1,147 @@
+import threading
+import numpy as np
+
+class BufferBarras:
+    """
+    Buffer preasignado de barras para un símbolo/periodo. Conserva el arreglo
+    estructurado de MT5 y entrega vistas contiguas sin copiar los datos
+    """
+    def __init__(self, capacidad, dtype):
+        """
+        Inicializa el buffer
+        
+        Args:
+            capacidad: Número máximo de barras que se conservan
+            dtype: Tipo estructurado de las barras devueltas por MT5
+        """
+        self.capacidad = capacidad
+        # Se reserva un margen de 1/8 de la capacidad para que las vistas sean
+        # siempre contiguas: al llegar al final se compacta una vez cada
+        # `margen` barras (coste amortizado de ~8 copias por barra nueva) sin
+        # mantener vivo el doble de memoria que ocupan las barras vigentes
+        margen = max(capacidad // 8, 64)
+        self._datos = np.zeros(capacidad + margen, dtype=dtype)
+        self._inicio = 0
+        self._fin = 0
+
+    def __len__(self):
+        return self._fin - self._inicio
+
+    @property
+    def ultimo_tiempo(self):
+        """
+        Marca de tiempo (segundos) de la última barra almacenada, o None si está vacío
+        """
+        if self._fin == self._inicio:
+            return None
+        return int(self._datos['time'][self._fin - 1])
+
+    def agregar(self, barras):
+        """
+        Agrega barras nuevas en orden cronológico. Si la primera barra tiene la
+        misma marca de tiempo que la última almacenada (barra en formación),
+        la sobrescribe en lugar de duplicarla
+        
+        Args:
+            barras: Arreglo estructurado de MT5 ordenado por tiempo
+        """
+        if len(barras) == 0:
+            return
+        ultimo = self.ultimo_tiempo
+        if ultimo is not None:
+            barras = barras[barras['time'] >= ultimo]
+            if len(barras) == 0:
+                return
+            if int(barras['time'][0]) == ultimo:
+                self._datos[self._fin - 1] = barras[0]
+                barras = barras[1:]
+
+        # Si llegan más barras que la capacidad solo interesan las últimas
+        if len(barras) >= self.capacidad:
+            barras = barras[-self.capacidad:]
+            self._datos[:self.capacidad] = barras
+            self._inicio, self._fin = 0, self.capacidad
+            return
+
+        if self._fin + len(barras) > len(self._datos):
+            # Solo se conservan las barras que seguirán vigentes tras agregar
+            self._compactar(self.capacidad - len(barras))
+        self._datos[self._fin:self._fin + len(barras)] = barras
+        self._fin += len(barras)
+        if self._fin - self._inicio > self.capacidad:
+            self._inicio = self._fin - self.capacidad
+
+    def _compactar(self, conservar):
+        """
+        Mueve las últimas barras vigentes al principio del buffer
+        
+        Args:
+            conservar: Número máximo de barras a conservar
+        """
+        n = min(len(self), conservar)
+        self._datos[:n] = self._datos[self._fin - n:self._fin]
+        self._inicio, self._fin = 0, n
+
+    def vista(self, numero_barras=None):
+        """
+        Obtiene una vista (sin copia) de las últimas barras
+        
+        Args:
+            numero_barras: Número de barras a devolver (por defecto todas)
+            
+        Returns:
+            Vista de solo lectura del arreglo estructurado
+        """
+        vista = self._datos[self._inicio:self._fin]
+        if numero_barras is not None:
+            vista = vista[-numero_barras:]
+        vista = vista.view()
+        vista.flags.writeable = False
+        return vista
+
+
+class CacheBarras:
+    """
+    Caché de barras por (símbolo, periodo) compartida por el conector
+    """
+    def __init__(self):
+        """
+        Inicializa la caché vacía
+        """
+        self._buffers = {}
+        self._bloqueo = threading.RLock()
+
+    def obtener(self, par_divisas, periodo_tiempo):
+        """
+        Obtiene el buffer de un símbolo/periodo
+        
+        Returns:
+            BufferBarras o None si no está en caché
+        """
+        return self._buffers.get((par_divisas, periodo_tiempo))
+
+    def crear(self, par_divisas, periodo_tiempo, capacidad, dtype):
+        """
+        Crea (o reemplaza) el buffer de un símbolo/periodo
+        
+        Returns:
+            El nuevo BufferBarras
+        """
+        buffer = BufferBarras(capacidad, dtype)
+        with self._bloqueo:
+            self._buffers[(par_divisas, periodo_tiempo)] = buffer
+        return buffer
+
+    def claves(self):
+        """
+        Obtiene los pares (símbolo, periodo) con barras en caché
+        """
+        with self._bloqueo:
+            return list(self._buffers)
+
+    def limpiar(self):
+        """
+        Elimina todas las barras en caché
+        """
+        with self._bloqueo:
+            self._buffers.clear()
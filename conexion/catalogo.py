@@ -0,0 +1,212 @@
+import bisect
+import json
+import os
+import threading
+import time
+
+# Sufijos que identifican un par de divisas
+DIVISAS = ("USD", "EUR", "GBP", "JPY", "CHF", "AUD", "CAD", "NZD")
+
+
+def clasificar_simbolo(nombre):
+    """
+    Clasifica un símbolo por su nombre
+
+    Args:
+        nombre: Nombre del símbolo (ej: "EURUSD")
+
+    Returns:
+        Tipo de instrumento: Divisa, Metales, Índices, Acciones u Otro
+    """
+    if nombre[-3:] in DIVISAS:
+        return "Divisa"
+    if "XAU" in nombre or "XAG" in nombre:
+        return "Metales"
+    if "INDEX" in nombre:
+        return "Índices"
+    if "STOCK" in nombre:
+        return "Acciones"
+    return "Otro"
+
+
+class CatalogoSimbolos:
+    """
+    Catálogo de símbolos del broker con caché en memoria (con caducidad),
+    copia en disco e índices por tipo, divisa base/cotizada y prefijo
+    """
+    def __init__(self, ttl=3600, ruta=None):
+        """
+        Inicializa el catálogo
+
+        Args:
+            ttl: Segundos durante los que el catálogo se considera vigente
+            ruta: Archivo JSON donde se guarda la copia del catálogo (opcional)
+        """
+        self.ttl = ttl
+        self.ruta = ruta
+        self.actualizado = None
+        self._bloqueo = threading.RLock()
+        self._indexar([])
+        if ruta and os.path.exists(ruta):
+            self.cargar()
+
+    @property
+    def vigente(self):
+        """
+        Indica si el catálogo tiene datos y no ha caducado
+        """
+        return self.actualizado is not None and time.time() - self.actualizado < self.ttl
+
+    def __len__(self):
+        return len(self._simbolos)
+
+    def actualizar(self, simbolos):
+        """
+        Reconstruye el catálogo a partir del resultado de symbols_get
+
+        Args:
+            simbolos: Secuencia de objetos con name, description y opcionalmente
+                currency_base y currency_profit
+        """
+        entradas = []
+        for simbolo in simbolos or ():
+            nombre = simbolo.name
+            entradas.append({
+                'nombre': nombre,
+                'descripcion': simbolo.description,
+                'tipo': clasificar_simbolo(nombre),
+                'base': getattr(simbolo, 'currency_base', '') or nombre[:3],
+                'cotizada': getattr(simbolo, 'currency_profit', '') or nombre[3:6],
+            })
+        with self._bloqueo:
+            self._indexar(entradas)
+            self.actualizado = time.time()
+        if self.ruta:
+            self.guardar()
+
+    def _indexar(self, entradas):
+        """
+        Construye los índices del catálogo
+        """
+        self._simbolos = {entrada['nombre']: entrada for entrada in entradas}
+        self._por_tipo = {}
+        self._por_base = {}
+        self._por_cotizada = {}
+        for entrada in entradas:
+            self._por_tipo.setdefault(entrada['tipo'], []).append(entrada['nombre'])
+            self._por_base.setdefault(entrada['base'].upper(), []).append(entrada['nombre'])
+            self._por_cotizada.setdefault(entrada['cotizada'].upper(), []).append(entrada['nombre'])
+        # Listado ordenado por tipo y nombre, ya formateado para la interfaz
+        ordenadas = sorted(entradas, key=lambda e: (e['tipo'], e['nombre']))
+        self._listado = [(e['nombre'], f"{e['descripcion']} ({e['tipo']})") for e in ordenadas]
+        # Nombres en mayúsculas ordenados para búsquedas por prefijo con bisect
+        self._claves = sorted((nombre.upper(), nombre) for nombre in self._simbolos)
+        self._ultima_busqueda = (None, None)
+
+    def guardar(self):
+        """
+        Guarda la copia del catálogo en disco
+        """
+        with self._bloqueo:
+            datos = {'actualizado': self.actualizado, 'simbolos': list(self._simbolos.values())}
+        temporal = self.ruta + ".tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(datos, archivo, ensure_ascii=False)
+        os.replace(temporal, self.ruta)
+
+    def cargar(self):
+        """
+        Carga la copia del catálogo guardada en disco
+
+        Returns:
+            True si se cargó correctamente
+        """
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+        except (OSError, ValueError):
+            return False
+        with self._bloqueo:
+            self._indexar(datos.get('simbolos', []))
+            self.actualizado = datos.get('actualizado')
+        return True
+
+    def listado(self):
+        """
+        Obtiene todos los símbolos ordenados por tipo y nombre
+
+        Returns:
+            Lista de tuplas (nombre, descripcion)
+        """
+        return self._listado
+
+    def obtener(self, nombre):
+        """
+        Obtiene la entrada de un símbolo
+
+        Returns:
+            Diccionario con nombre, descripcion, tipo, base y cotizada, o None
+        """
+        return self._simbolos.get(nombre)
+
+    def por_tipo(self, tipo):
+        """
+        Obtiene los nombres de los símbolos de un tipo (ej: "Divisa")
+        """
+        return list(self._por_tipo.get(tipo, []))
+
+    def por_divisa(self, base=None, cotizada=None):
+        """
+        Obtiene los nombres de los símbolos con una divisa base y/o cotizada
+        """
+        nombres = None
+        if base:
+            nombres = set(self._por_base.get(base.upper(), []))
+        if cotizada:
+            cotizados = set(self._por_cotizada.get(cotizada.upper(), []))
+            nombres = cotizados if nombres is None else nombres & cotizados
+        return sorted(nombres or [])
+
+    def buscar(self, texto, limite=50):
+        """
+        Búsqueda incremental: primero los símbolos cuyo nombre empieza por el
+        texto (bisect sobre los nombres ordenados) y después los que lo
+        contienen en el nombre o la descripción. Si el texto amplía la
+        búsqueda anterior solo se filtran sus resultados
+
+        Args:
+            texto: Texto escrito por el usuario
+            limite: Número máximo de resultados
+
+        Returns:
+            Lista de tuplas (nombre, descripcion)
+        """
+        texto = texto.strip().upper()
+        if not texto:
+            return self._listado[:limite]
+
+        with self._bloqueo:
+            inicio = bisect.bisect_left(self._claves, (texto,))
+            prefijo = []
+            for clave, nombre in self._claves[inicio:]:
+                if not clave.startswith(texto) or len(prefijo) >= limite:
+                    break
+                prefijo.append(nombre)
+
+            resultado = list(prefijo)
+            if len(resultado) < limite:
+                anterior, candidatos = self._ultima_busqueda
+                if anterior is None or not texto.startswith(anterior):
+                    candidatos = list(self._simbolos.values())
+                candidatos = [e for e in candidatos
+                              if texto in e['nombre'].upper() or texto in e['descripcion'].upper()]
+                self._ultima_busqueda = (texto, candidatos)
+                vistos = set(prefijo)
+                for entrada in candidatos:
+                    if len(resultado) >= limite:
+                        break
+                    if entrada['nombre'] not in vistos:
+                        resultado.append(entrada['nombre'])
+
+        return [(nombre, f"{self._simbolos[nombre]['descripcion']} ({self._simbolos[nombre]['tipo']})")
+                for nombre in resultado]
@@ -0,0 +1,342 @@
+import collections
+import os
+import pickle
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+# Cabecera del archivo de grabación y de cada bloque comprimido
+MAGICO = b"MT5GRAB1"
+CABECERA_BLOQUE = struct.Struct('<I')
+
+# Registro de una llamada al terminal: instante (segundos desde el inicio de
+# la grabación), duración, función, argumentos y resultado
+Registro = namedtuple('Registro', ['instante', 'duracion', 'operacion', 'args', 'kwargs', 'resultado'])
+
+
+class _Tupla:
+    """
+    Forma portable de las tuplas con nombre del paquete MetaTrader5
+    (AccountInfo, TradePosition, ...), que se pueden reproducir sin el paquete
+    """
+    __slots__ = ('nombre', 'campos', 'valores')
+
+    def __init__(self, nombre, campos, valores):
+        self.nombre = nombre
+        self.campos = campos
+        self.valores = valores
+
+
+def _a_portable(valor):
+    """
+    Convierte las tuplas con nombre (también anidadas) a _Tupla
+    """
+    if isinstance(valor, tuple):
+        if hasattr(valor, '_fields'):
+            return _Tupla(type(valor).__name__, tuple(valor._fields), tuple(_a_portable(v) for v in valor))
+        return tuple(_a_portable(v) for v in valor)
+    if isinstance(valor, list):
+        return [_a_portable(v) for v in valor]
+    if isinstance(valor, dict):
+        return {k: _a_portable(v) for k, v in valor.items()}
+    return valor
+
+
+_clases_tupla = {}
+
+
+def _desde_portable(valor):
+    """
+    Reconstruye las tuplas con nombre guardadas con _a_portable
+    """
+    if isinstance(valor, _Tupla):
+        clave = (valor.nombre, valor.campos)
+        clase = _clases_tupla.get(clave)
+        if clase is None:
+            clase = _clases_tupla[clave] = namedtuple(valor.nombre, valor.campos)
+        return clase(*(_desde_portable(v) for v in valor.valores))
+    if isinstance(valor, tuple):
+        return tuple(_desde_portable(v) for v in valor)
+    if isinstance(valor, list):
+        return [_desde_portable(v) for v in valor]
+    if isinstance(valor, dict):
+        return {k: _desde_portable(v) for k, v in valor.items()}
+    return valor
+
+
+def leer_grabacion(ruta):
+    """
+    Lee los registros de un archivo de grabación en orden. Un bloque final
+    incompleto (por ejemplo tras un corte del proceso) se ignora
+
+    Args:
+        ruta: Archivo de grabación
+
+    Yields:
+        Registro
+
+    Raises:
+        ValueError: Si el archivo no es una grabación
+    """
+    with open(ruta, 'rb') as archivo:
+        if archivo.read(len(MAGICO)) != MAGICO:
+            raise ValueError(f"{ruta} no es un archivo de grabación")
+        while True:
+            cabecera = archivo.read(CABECERA_BLOQUE.size)
+            if len(cabecera) < CABECERA_BLOQUE.size:
+                return
+            longitud, = CABECERA_BLOQUE.unpack(cabecera)
+            bloque = archivo.read(longitud)
+            if len(bloque) < longitud:
+                return
+            for registro in pickle.loads(zlib.decompress(bloque)):
+                yield Registro(*registro[:5], _desde_portable(registro[5]))
+
+
+class BackendGrabador:
+    """
+    Envoltorio de un backend (paquete MetaTrader5 o compatible) que graba
+    cada llamada y su respuesta en un archivo binario comprimido de solo
+    anexado. La llamada solo encola el registro; la serialización y la
+    compresión se hacen por bloques en un hilo propio
+    """
+    def __init__(self, backend, ruta, nivel_compresion=1, intervalo_volcado=0.5, max_registros_bloque=1000):
+        """
+        Inicializa el grabador
+
+        Args:
+            backend: Backend a envolver
+            ruta: Archivo de grabación (se anexa si ya existe)
+            nivel_compresion: Nivel de zlib (1 = rápido)
+            intervalo_volcado: Segundos máximos que un registro espera a escribirse
+            max_registros_bloque: Registros máximos por bloque comprimido
+        """
+        self._backend = backend
+        self.ruta = ruta
+        self.nivel_compresion = nivel_compresion
+        self.intervalo_volcado = intervalo_volcado
+        self.max_registros_bloque = max_registros_bloque
+        self.registros = 0
+        self.bytes_escritos = 0
+        self.ultimo_error = None
+        self._origen = time.monotonic()
+        self._cola = queue.SimpleQueue()
+        self._envolturas = {}
+        nuevo = not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+        self._archivo = open(ruta, 'ab')
+        if nuevo:
+            self._archivo.write(MAGICO)
+            self._archivo.flush()
+        self._hilo = threading.Thread(target=self._bucle, name="BackendGrabador", daemon=True)
+        self._hilo.start()
+
+    def __getattr__(self, nombre):
+        """
+        Devuelve las constantes tal cual y las funciones envueltas para grabarlas
+        """
+        atributo = getattr(self._backend, nombre)
+        if not callable(atributo) or nombre.startswith('_'):
+            return atributo
+        envoltura = self._envolturas.get(nombre)
+        if envoltura is None:
+            def envoltura(*args, **kwargs):
+                inicio = time.monotonic()
+                resultado = atributo(*args, **kwargs)
+                self._cola.put((inicio - self._origen, time.monotonic() - inicio, nombre, args, kwargs, resultado))
+                return resultado
+            self._envolturas[nombre] = envoltura
+        return envoltura
+
+    def _bucle(self):
+        """
+        Bucle del hilo de escritura: agrupa los registros en bloques
+        """
+        terminar = False
+        while not terminar:
+            bloque = []
+            limite = time.monotonic() + self.intervalo_volcado
+            while len(bloque) < self.max_registros_bloque:
+                try:
+                    elemento = self._cola.get(timeout=max(0.0, limite - time.monotonic()))
+                except queue.Empty:
+                    break
+                if elemento is None:
+                    terminar = True
+                    break
+                bloque.append(elemento)
+            if bloque:
+                self._escribir(bloque)
+
+    def _escribir(self, bloque):
+        """
+        Serializa, comprime y anexa un bloque de registros
+        """
+        try:
+            registros = [registro[:5] + (_a_portable(registro[5]),) for registro in bloque]
+            datos = zlib.compress(pickle.dumps(registros, protocol=pickle.HIGHEST_PROTOCOL),
+                                  self.nivel_compresion)
+            self._archivo.write(CABECERA_BLOQUE.pack(len(datos)) + datos)
+            self._archivo.flush()
+            self.registros += len(bloque)
+            self.bytes_escritos += CABECERA_BLOQUE.size + len(datos)
+        except Exception as e:
+            # Un fallo de escritura no debe afectar a la operativa
+            self.ultimo_error = e
+
+    def cerrar(self, espera=5.0):
+        """
+        Escribe los registros pendientes y cierra el archivo
+        """
+        if self._hilo is None:
+            return
+        self._cola.put(None)
+        self._hilo.join(espera)
+        self._hilo = None
+        self._archivo.close()
+
+
+def _clave_argumentos(valor):
+    """
+    Convierte los argumentos de una llamada en una clave hashable. Los
+    diccionarios (solicitudes de órdenes) se ordenan por campo y los
+    escalares de numpy se pasan a su valor de Python
+    """
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _clave_argumentos(v)) for k, v in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_clave_argumentos(v) for v in valor)
+    if hasattr(valor, 'item') and getattr(valor, 'shape', None) == ():
+        return valor.item()
+    try:
+        hash(valor)
+    except TypeError:
+        return repr(valor)
+    return valor
+
+
+def _simbolo_llamada(args, kwargs):
+    """
+    Obtiene el símbolo de una llamada al terminal: primer argumento de texto,
+    campo symbol de una solicitud o argumento symbol=
+    """
+    if args:
+        if isinstance(args[0], str):
+            return args[0]
+        if isinstance(args[0], dict):
+            return args[0].get('symbol')
+    return kwargs.get('symbol')
+
+
+class BackendReproduccion:
+    """
+    Backend que reproduce una grabación a través de ConectorMT5. Cada llamada
+    devuelve la siguiente respuesta grabada de la misma función con los mismos
+    argumentos, así que el conector y las estrategias ven exactamente las
+    mismas respuestas que en la sesión original aunque los hilos hagan las
+    llamadas en otro orden, con su ritmo original o lo más rápido posible
+    """
+    def __init__(self, ruta, velocidad=None):
+        """
+        Inicializa la reproducción. Las respuestas se buscan primero por
+        función y argumentos exactos; si no hay ninguna (argumentos que
+        dependen del reloj, como el fin de copy_rates_range) por función y
+        símbolo, y las llamadas sin símbolo solo por función
+
+        Args:
+            ruta: Archivo de grabación
+            velocidad: None para reproducir sin esperas, 1.0 para el ritmo
+                original (2.0 para el doble de rápido, etc.)
+        """
+        self.ruta = ruta
+        self.velocidad = velocidad
+        self._registros = []
+        self._consumidos = []
+        self._por_argumentos = collections.defaultdict(collections.deque)
+        self._por_simbolo = collections.defaultdict(collections.deque)
+        self._por_operacion = collections.defaultdict(collections.deque)
+        self.total = 0
+        # Se activa cuando se pide una respuesta que ya no está en la grabación
+        self.agotada = False
+        for registro in leer_grabacion(ruta):
+            indice = len(self._registros)
+            self._registros.append(registro)
+            self._consumidos.append(False)
+            self._por_argumentos[self._clave(registro.operacion, registro.args, registro.kwargs)].append(indice)
+            simbolo = _simbolo_llamada(registro.args, registro.kwargs)
+            if simbolo is not None:
+                self._por_simbolo[(registro.operacion, simbolo)].append(indice)
+            self._por_operacion[registro.operacion].append(indice)
+            self.total += 1
+        self._reproducidos = 0
+        self._inicio = None
+        self._bloqueo = threading.Lock()
+        self._error = (1, 'Success')
+        # Constantes de MT5 como atributos, igual que el paquete real
+        from . import backend as constantes
+        for nombre in dir(constantes):
+            if nombre.isupper():
+                setattr(self, nombre, getattr(constantes, nombre))
+
+    @property
+    def pendientes(self):
+        """
+        Número de respuestas grabadas que aún no se han reproducido
+        """
+        return self.total - self._reproducidos
+
+    @staticmethod
+    def _clave(operacion, args, kwargs):
+        return (operacion, _clave_argumentos(args), _clave_argumentos(kwargs))
+
+    def __getattr__(self, nombre):
+        if nombre.startswith('_'):
+            raise AttributeError(nombre)
+        return lambda *args, **kwargs: self._reproducir(nombre, args, kwargs)
+
+    def _siguiente(self, cola):
+        """
+        Saca de una cola el siguiente registro no reproducido. Cada registro
+        está en varias colas, así que los ya consumidos se descartan al pasar
+        """
+        while cola:
+            indice = cola.popleft()
+            if not self._consumidos[indice]:
+                self._consumidos[indice] = True
+                self._reproducidos += 1
+                return self._registros[indice]
+        return None
+
+    def _reproducir(self, operacion, args=(), kwargs=None):
+        """
+        Devuelve la siguiente respuesta grabada de una función para los mismos
+        argumentos, esperando hasta su instante original si se reproduce con
+        velocidad
+        """
+        kwargs = kwargs or {}
+        with self._bloqueo:
+            registro = self._siguiente(self._por_argumentos.get(self._clave(operacion, args, kwargs), ()))
+            if registro is None:
+                simbolo = _simbolo_llamada(args, kwargs)
+                if simbolo is not None:
+                    registro = self._siguiente(self._por_simbolo.get((operacion, simbolo), ()))
+                else:
+                    registro = self._siguiente(self._por_operacion.get(operacion, ()))
+            if registro is None:
+                if operacion == 'last_error':
+                    return self._error
+                self._error = (-1, f"Fin de la grabación para {operacion}")
+                self.agotada = True
+                return None
+            if self._inicio is None:
+                # Alinear el primer registro reproducido con el instante actual
+                self._inicio = time.monotonic() - (registro.instante / self.velocidad if self.velocidad else 0.0)
+        if self.velocidad:
+            espera = self._inicio + (registro.instante + registro.duracion) / self.velocidad - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+        if operacion == 'last_error':
+            self._error = registro.resultado
+        return registro.resultado
@@ -1,21 +1,59 @@
-import MetaTrader5 as mt5
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 import pandas as pd
+from .barras import Barras
+from .backend import (COPY_TICKS_ALL, ORDER_FILLING_IOC, ORDER_TIME_GTC, ORDER_TYPE_BUY, ORDER_TYPE_SELL,
+                      POSITION_TYPE_BUY, TIMEFRAME_M1, TRADE_ACTION_DEAL, TRADE_RETCODE_DONE, cargar_backend)
+from .cache import CacheBarras
+from .catalogo import CatalogoSimbolos
+from metricas import METRICAS
 
 class ConectorMT5:
     """
     Clase que maneja la conexión con MetaTrader 5 y obtiene datos de trading
     """
-    def __init__(self, par_divisas="EURUSD", periodo_tiempo=mt5.TIMEFRAME_M1):
+    def __init__(self, par_divisas="EURUSD", periodo_tiempo=TIMEFRAME_M1, usar_cache=True, almacen=None,
+                 backend=None, catalogo=None):
         """
         Inicializa el conector con el par de divisas y el periodo de tiempo
         
         Args:
             par_divisas: El par de divisas a monitorear (ej: "EURUSD")
-            periodo_tiempo: El periodo de tiempo para los datos (ej: mt5.TIMEFRAME_M1 para 1 minuto)
+            periodo_tiempo: El periodo de tiempo para los datos (ej: TIMEFRAME_M1 para 1 minuto)
+            usar_cache: Si es True solo se piden al terminal las barras nuevas desde la última consulta
+            almacen: AlmacenBarras opcional en disco donde se escriben y desde donde se leen las barras
+            backend: 'mt5' (por defecto), 'simulado' o un objeto con la interfaz del paquete MetaTrader5
+            catalogo: CatalogoSimbolos compartido (por defecto uno en memoria con caducidad de una hora)
         """
         self.par_divisas = par_divisas
         self.periodo_tiempo = periodo_tiempo
         self.conectado = False
+        self.cache = CacheBarras() if usar_cache else None
+        self.almacen = almacen
+        self.mt5 = cargar_backend(backend)
+        self.catalogo = catalogo if catalogo is not None else CatalogoSimbolos()
+        # Motor de riesgo opcional que comprueba cada orden antes de enviarla (ver MotorRiesgo)
+        self.riesgo = None
+        # Serializa las llamadas al terminal cuando varios hilos comparten la conexión
+        self._bloqueo = threading.RLock()
+
+    def _llamar(self, operacion, *args, **kwargs):
+        """
+        Llama a una función del terminal registrando su duración y los
+        resultados nulos (error) en las métricas
+        
+        Args:
+            operacion: Nombre de la función del paquete MetaTrader5
+            
+        Returns:
+            El resultado de la función
+        """
+        with METRICAS.temporizador('mt5_llamada_segundos', operacion=operacion):
+            resultado = getattr(self.mt5, operacion)(*args, **kwargs)
+        if resultado is None:
+            METRICAS.contador('mt5_errores_total', operacion=operacion).incrementar()
+        return resultado
 
     def conectar(self):
         """
@@ -25,8 +63,8 @@ class ConectorMT5:
             True si la conexión se estableció correctamente, False si hubo un error
         """
         try:
-            if not mt5.initialize():
-                raise ConnectionError(f"Error al conectar con MT5: {mt5.last_error()}")
+            if not self.mt5.initialize():
+                raise ConnectionError(f"Error al conectar con MT5: {self.mt5.last_error()}")
             self.conectado = True
             return True
         except Exception as e:
@@ -37,8 +75,78 @@ class ConectorMT5:
         """
         Cierra la conexión con MetaTrader 5
         """
-        mt5.shutdown()
+        self.mt5.shutdown()
         self.conectado = False
+        if self.cache is not None:
+            self.cache.limpiar()
+
+    def comprobar_salud(self):
+        """
+        Comprueba que el terminal siga respondiendo
+        
+        Returns:
+            Diccionario con conectado (bool), ping_ms (ping del terminal al
+            servidor), latencia_ms (ida y vuelta de la consulta) y error
+        """
+        inicio = time.perf_counter()
+        try:
+            with self._bloqueo:
+                info = self._llamar('terminal_info')
+        except Exception as e:
+            info, error = None, str(e)
+        else:
+            error = None if info is not None else str(self.mt5.last_error())
+        latencia = (time.perf_counter() - inicio) * 1000
+        conectado = info is not None and bool(getattr(info, 'connected', True))
+        if info is not None and not conectado:
+            error = "El terminal no está conectado al servidor"
+        return {
+            'conectado': conectado,
+            'ping_ms': getattr(info, 'ping_last', 0) / 1000 if info is not None else None,
+            'latencia_ms': latencia,
+            'error': error,
+        }
+
+    def reconectar(self):
+        """
+        Reinicia la conexión con el terminal conservando la caché de barras
+        y completa cada serie en caché desde su última barra
+        
+        Returns:
+            True si la conexión se restableció
+        """
+        with self._bloqueo:
+            try:
+                self.mt5.shutdown()
+            except Exception:
+                pass
+            self.conectado = False
+            if not self.mt5.initialize():
+                return False
+            self.conectado = True
+        self.reanudar_cache()
+        return True
+
+    def reanudar_cache(self):
+        """
+        Pide al terminal las barras que faltan en cada serie en caché
+        desde su última marca de tiempo
+        
+        Returns:
+            Número de series actualizadas
+        """
+        if self.cache is None:
+            return 0
+        actualizadas = 0
+        for par_divisas, periodo_tiempo in self.cache.claves():
+            buffer = self.cache.obtener(par_divisas, periodo_tiempo)
+            try:
+                self.obtener_barras(buffer.capacidad, par_divisas, periodo_tiempo)
+                actualizadas += 1
+            except ValueError:
+                # La serie se volverá a pedir completa en la próxima consulta
+                pass
+        return actualizadas
 
     def obtener_info_cuenta(self):
         """
@@ -53,60 +161,190 @@ class ConectorMT5:
         if not self.conectado:
             raise ValueError("No estás conectado a MetaTrader 5")
             
-        info = mt5.account_info()
+        with self._bloqueo:
+            info = self._llamar('account_info')
         if info is None:
             raise ValueError("No se pudo obtener información de la cuenta")
         return info
 
-    def obtener_divisas_disponibles(self):
+    def obtener_divisas_disponibles(self, forzar=False):
         """
-        Obtiene la lista de divisas y otros instrumentos disponibles en MetaTrader 5
+        Obtiene la lista de divisas y otros instrumentos disponibles en MetaTrader 5.
+        Mientras el catálogo esté vigente se reutiliza sin consultar al terminal
         
+        Args:
+            forzar: Si es True se vuelve a consultar el terminal aunque el catálogo esté vigente
+            
         Returns:
             Lista de tuplas (nombre, nombre_completo) de los instrumentos disponibles
         """
         if not self.conectado:
             raise ValueError("No estás conectado a MetaTrader 5")
             
-        instrumentos = []
-        try:
-            # Obtener todos los símbolos disponibles
-            symbols = mt5.symbols_get()
-            if symbols is not None:
-                for symbol in symbols:
-                    # Obtener el tipo de instrumento
-                    tipo = ""
-                    if symbol.name[-3:] in ["USD", "EUR", "GBP", "JPY", "CHF", "AUD", "CAD", "NZD"]:
-                        tipo = "Divisa"
-                    elif "XAU" in symbol.name or "XAG" in symbol.name:
-                        tipo = "Metales"
-                    elif "INDEX" in symbol.name:
-                        tipo = "Índices"
-                    elif "STOCK" in symbol.name:
-                        tipo = "Acciones"
-                    else:
-                        tipo = "Otro"
-                    
-                    # Agregar el instrumento con su tipo
-                    instrumentos.append((
-                        symbol.name,
-                        f"{symbol.description} ({tipo})",
-                        tipo
-                    ))
-        except Exception as e:
-            raise ValueError(f"Error al obtener instrumentos: {str(e)}")
+        if forzar or not self.catalogo.vigente:
+            try:
+                # Obtener todos los símbolos disponibles
+                with self._bloqueo:
+                    symbols = self._llamar('symbols_get')
+                if symbols is not None:
+                    self.catalogo.actualizar(symbols)
+            except Exception as e:
+                raise ValueError(f"Error al obtener instrumentos: {str(e)}")
+        
+        return self.catalogo.listado()
+
+    @METRICAS.medir('conector_operacion_segundos', operacion='obtener_barras')
+    def obtener_barras(self, numero_barras=1000, par_divisas=None, periodo_tiempo=None):
+        """
+        Obtiene las últimas barras como arreglo estructurado de MT5. Con la caché
+        activa solo se piden al terminal las barras posteriores a la última
+        almacenada y se devuelve una vista sin copia del buffer
+        
+        Args:
+            numero_barras: Número de barras a obtener
+            par_divisas: Símbolo a consultar (por defecto el par del conector)
+            periodo_tiempo: Periodo de las barras (por defecto el del conector)
+            
+        Returns:
+            Arreglo estructurado (time, open, high, low, close, tick_volume, spread, real_volume)
+            
+        Raises:
+            ValueError: Si no se pueden obtener los datos
+        """
+        if not self.conectado:
+            raise ValueError("No estás conectado a MetaTrader 5")
+        
+        par_divisas = par_divisas or self.par_divisas
+        periodo_tiempo = periodo_tiempo or self.periodo_tiempo
+        with self._bloqueo:
+            if self.cache is None:
+                rates = self._llamar('copy_rates_from_pos', par_divisas, periodo_tiempo, 0, numero_barras)
+                if rates is None or len(rates) == 0:
+                    raise ValueError(f"No se pudieron obtener datos históricos para {par_divisas}")
+                return rates
+            
+            buffer = self.cache.obtener(par_divisas, periodo_tiempo)
+            if buffer is not None and buffer.capacidad < numero_barras:
+                buffer = None
+            if buffer is None:
+                buffer = self._cargar_desde_almacen(par_divisas, periodo_tiempo, numero_barras)
+            
+            nuevas = None
+            historial_completo = buffer is None
+            if buffer is not None:
+                # Pedir solo desde la última barra conocida (incluida, porque
+                # puede seguir en formación) hasta ahora
+                nuevas = self._copiar_rango(par_divisas, periodo_tiempo, buffer.ultimo_tiempo)
+            
+            if nuevas is None:
+                # Sin datos previos o error del rango: historial completo
+                historial_completo = True
+                nuevas = self._llamar('copy_rates_from_pos', par_divisas, periodo_tiempo, 0, numero_barras)
+                if nuevas is None or len(nuevas) == 0:
+                    raise ValueError(f"No se pudieron obtener datos históricos para {par_divisas}")
+                buffer = self.cache.crear(par_divisas, periodo_tiempo, numero_barras, nuevas.dtype)
+            buffer.agregar(nuevas)
+            
+            if self.almacen is not None:
+                if historial_completo and self.almacen.existe(par_divisas, periodo_tiempo):
+                    # Completar el hueco desde la última barra guardada para
+                    # que el archivo en disco no quede con saltos
+                    self.sincronizar_almacen(par_divisas, periodo_tiempo)
+                else:
+                    self.almacen.escribir(par_divisas, periodo_tiempo, nuevas)
+            
+            return buffer.vista(numero_barras)
+
+    def _copiar_rango(self, par_divisas, periodo_tiempo, desde):
+        """
+        Pide al terminal las barras desde una marca de tiempo hasta ahora
         
-        # Ordenar los instrumentos por tipo y luego por nombre
-        instrumentos.sort(key=lambda x: (x[2], x[0]))
+        Returns:
+            Arreglo estructurado de MT5, o None si la consulta falla
+        """
+        desde = datetime.fromtimestamp(desde, tz=timezone.utc)
+        hasta = datetime.now(timezone.utc) + timedelta(days=1)
+        return self._llamar('copy_rates_range', par_divisas, periodo_tiempo, desde, hasta)
+
+    def _cargar_desde_almacen(self, par_divisas, periodo_tiempo, numero_barras):
+        """
+        Crea el buffer de caché a partir de las barras guardadas en disco
         
-        return [(nombre, descripcion) for nombre, descripcion, _ in instrumentos]
+        Returns:
+            BufferBarras con las barras guardadas, o None si no hay suficientes
+        """
+        if self.almacen is None:
+            return None
+        guardadas = self.almacen.leer(par_divisas, periodo_tiempo, numero_barras)
+        if guardadas is None or len(guardadas) < numero_barras:
+            return None
+        buffer = self.cache.crear(par_divisas, periodo_tiempo, numero_barras, guardadas.dtype)
+        buffer.agregar(guardadas)
+        return buffer
 
-    def obtener_datos_historicos(self, numero_barras=1000):
+    def sincronizar_almacen(self, par_divisas=None, periodo_tiempo=None, desde=None):
+        """
+        Descarga al almacén en disco las barras que falten desde la última
+        guardada (o desde una fecha dada si aún no hay datos)
+        
+        Args:
+            par_divisas: Símbolo a sincronizar (por defecto el par del conector)
+            periodo_tiempo: Periodo de las barras (por defecto el del conector)
+            desde: datetime inicial si el almacén está vacío
+            
+        Returns:
+            Número de barras recibidas del terminal
+            
+        Raises:
+            ValueError: Si no hay almacén, conexión o fecha inicial
+        """
+        if self.almacen is None:
+            raise ValueError("El conector no tiene un almacén de barras configurado")
+        if not self.conectado:
+            raise ValueError("No estás conectado a MetaTrader 5")
+        
+        par_divisas = par_divisas or self.par_divisas
+        periodo_tiempo = periodo_tiempo or self.periodo_tiempo
+        ultimo = self.almacen.ultimo_tiempo(par_divisas, periodo_tiempo)
+        if ultimo is None:
+            if desde is None:
+                raise ValueError(f"No hay barras guardadas de {par_divisas}; indica una fecha inicial")
+            ultimo = int(desde.timestamp())
+        with self._bloqueo:
+            nuevas = self._copiar_rango(par_divisas, periodo_tiempo, ultimo)
+        if nuevas is None:
+            raise ValueError(f"No se pudieron obtener datos históricos para {par_divisas}")
+        self.almacen.escribir(par_divisas, periodo_tiempo, nuevas)
+        return len(nuevas)
+
+    def obtener_datos(self, numero_barras=1000, par_divisas=None, periodo_tiempo=None, dtype=None):
+        """
+        Obtiene las últimas barras como contenedor Barras por columnas
+        
+        Args:
+            numero_barras: Número de barras a obtener
+            par_divisas: Símbolo a consultar (por defecto el par del conector)
+            periodo_tiempo: Periodo de las barras (por defecto el del conector)
+            dtype: None para columnas que son vistas sin copia de la caché (válidas
+                hasta la siguiente consulta de la misma serie), o el tipo de los
+                precios (np.float64, np.float32) para obtener columnas propias
+            
+        Returns:
+            Barras
+            
+        Raises:
+            ValueError: Si no se pueden obtener los datos
+        """
+        return Barras.desde_arreglo(self.obtener_barras(numero_barras, par_divisas, periodo_tiempo), dtype)
+
+    def obtener_datos_historicos(self, numero_barras=1000, par_divisas=None, periodo_tiempo=None):
         """
         Obtiene datos históricos de precios
         
         Args:
             numero_barras: Número de barras de datos a obtener
+            par_divisas: Símbolo a consultar (por defecto el par del conector)
+            periodo_tiempo: Periodo de las barras (por defecto el del conector)
             
         Returns:
             DataFrame con los datos históricos
@@ -114,12 +352,256 @@ class ConectorMT5:
         Raises:
             ValueError: Si no se pueden obtener los datos
         """
+        rates = self.obtener_barras(numero_barras, par_divisas, periodo_tiempo)
+        with METRICAS.temporizador('conector_operacion_segundos', operacion='construir_dataframe'):
+            df = pd.DataFrame(rates)
+            df['time'] = pd.to_datetime(df['time'], unit='s')
+        return df
+
+    def obtener_info_simbolo(self, par_divisas=None):
+        """
+        Obtiene la información de un símbolo (divisas, tamaño del contrato, ...)
+        
+        Args:
+            par_divisas: Símbolo a consultar (por defecto el par del conector)
+            
+        Returns:
+            Información del símbolo de symbol_info
+            
+        Raises:
+            ValueError: Si no se puede obtener la información
+        """
         if not self.conectado:
             raise ValueError("No estás conectado a MetaTrader 5")
         
-        rates = mt5.copy_rates_from_pos(self.par_divisas, self.periodo_tiempo, 0, numero_barras)
-        if rates is None or len(rates) == 0:
-            raise ValueError(f"No se pudieron obtener datos históricos para {self.par_divisas}")
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        return df
+        par_divisas = par_divisas or self.par_divisas
+        with self._bloqueo:
+            info = self._llamar('symbol_info', par_divisas)
+        if info is None:
+            raise ValueError(f"No se pudo obtener la información de {par_divisas}")
+        return info
+
+    def obtener_ultimo_tick(self, par_divisas=None):
+        """
+        Obtiene el último tick de un símbolo
+        
+        Args:
+            par_divisas: Símbolo a consultar (por defecto el par del conector)
+            
+        Returns:
+            Tick con time, bid, ask, last, volume y time_msc
+            
+        Raises:
+            ValueError: Si no se puede obtener el tick
+        """
+        if not self.conectado:
+            raise ValueError("No estás conectado a MetaTrader 5")
+        
+        par_divisas = par_divisas or self.par_divisas
+        with self._bloqueo:
+            tick = self._llamar('symbol_info_tick', par_divisas)
+        if tick is None:
+            raise ValueError(f"No se pudo obtener el tick de {par_divisas}")
+        return tick
+
+    def obtener_ticks(self, par_divisas, desde_msc, cantidad=1000):
+        """
+        Obtiene los ticks de un símbolo a partir de un instante
+        
+        Args:
+            par_divisas: Símbolo a consultar
+            desde_msc: Instante inicial en milisegundos desde la época
+            cantidad: Número máximo de ticks
+            
+        Returns:
+            Arreglo estructurado de ticks (puede estar vacío)
+            
+        Raises:
+            ValueError: Si no se pueden obtener los ticks
+        """
+        if not self.conectado:
+            raise ValueError("No estás conectado a MetaTrader 5")
+        
+        desde = datetime.fromtimestamp(desde_msc / 1000.0, tz=timezone.utc)
+        with self._bloqueo:
+            ticks = self._llamar('copy_ticks_from', par_divisas, desde, cantidad, COPY_TICKS_ALL)
+        if ticks is None:
+            raise ValueError(f"No se pudieron obtener los ticks de {par_divisas}: {self.mt5.last_error()}")
+        return ticks
+
+    def obtener_datos_multiples(self, solicitudes, numero_barras=1000):
+        """
+        Obtiene las barras de varios símbolos/periodos en un solo lote,
+        consultando una única vez cada combinación repetida
+        
+        Args:
+            solicitudes: Iterable de tuplas (par_divisas, periodo_tiempo)
+            numero_barras: Número de barras a obtener por combinación
+            
+        Returns:
+            Diccionario {(par_divisas, periodo_tiempo): Barras o excepción}.
+            Los errores de un símbolo no interrumpen el resto del lote
+        """
+        resultados = {}
+        with self._bloqueo:
+            for clave in dict.fromkeys(solicitudes):
+                try:
+                    resultados[clave] = self.obtener_datos(numero_barras, *clave)
+                except Exception as e:
+                    resultados[clave] = e
+        return resultados
+
+    def construir_solicitud(self, tipo, volumen, par_divisas=None, sl=None, tp=None, comentario="",
+                            posicion=None, desviacion=20):
+        """
+        Construye una solicitud de orden a mercado con el precio actual
+        
+        Args:
+            tipo: 'compra' o 'venta'
+            volumen: Volumen en lotes
+            par_divisas: Símbolo (por defecto el par del conector)
+            sl: Precio de stop loss (opcional)
+            tp: Precio de take profit (opcional)
+            comentario: Comentario de la orden
+            posicion: Ticket de la posición a cerrar (opcional)
+            desviacion: Desviación máxima del precio en puntos
+            
+        Returns:
+            Diccionario con la solicitud para order_send
+            
+        Raises:
+            ValueError: Si el tipo no es válido o no hay precio
+        """
+        if tipo not in ('compra', 'venta'):
+            raise ValueError(f"Tipo de orden no válido: {tipo}")
+        par_divisas = par_divisas or self.par_divisas
+        tick = self.obtener_ultimo_tick(par_divisas)
+        solicitud = {
+            'action': TRADE_ACTION_DEAL,
+            'symbol': par_divisas,
+            'volume': float(volumen),
+            'type': ORDER_TYPE_BUY if tipo == 'compra' else ORDER_TYPE_SELL,
+            'price': tick.ask if tipo == 'compra' else tick.bid,
+            'deviation': desviacion,
+            'comment': comentario,
+            'type_time': ORDER_TIME_GTC,
+            'type_filling': ORDER_FILLING_IOC,
+        }
+        if sl is not None:
+            solicitud['sl'] = float(sl)
+        if tp is not None:
+            solicitud['tp'] = float(tp)
+        if posicion is not None:
+            solicitud['position'] = posicion
+        return solicitud
+
+    def enviar_solicitud(self, solicitud):
+        """
+        Envía una solicitud de orden al terminal
+        
+        Args:
+            solicitud: Diccionario construido con construir_solicitud
+            
+        Returns:
+            Resultado de order_send (con retcode, order, price, ...)
+            
+        Raises:
+            ValueError: Si no hay conexión o el terminal no devuelve resultado
+            OrdenVetada: Si el motor de riesgo veta la orden
+        """
+        if not self.conectado:
+            raise ValueError("No estás conectado a MetaTrader 5")
+        if self.riesgo is not None:
+            veto = self.riesgo.verificar_solicitud(solicitud)
+            if veto is not None:
+                raise veto
+        with self._bloqueo:
+            resultado = self._llamar('order_send', solicitud)
+        if resultado is None:
+            raise ValueError(f"Error al enviar la orden: {self.mt5.last_error()}")
+        if self.riesgo is not None:
+            self.riesgo.registrar_resultado(solicitud, resultado)
+        return resultado
+
+    def abrir_posicion(self, tipo, volumen, par_divisas=None, sl=None, tp=None, comentario=""):
+        """
+        Abre una posición a mercado de forma síncrona
+        
+        Args:
+            tipo: 'compra' o 'venta'
+            volumen: Volumen en lotes
+            par_divisas: Símbolo (por defecto el par del conector)
+            sl: Precio de stop loss (opcional)
+            tp: Precio de take profit (opcional)
+            comentario: Comentario de la orden
+            
+        Returns:
+            Ticket de la posición abierta
+            
+        Raises:
+            ValueError: Si la orden es rechazada
+        """
+        resultado = self.enviar_solicitud(self.construir_solicitud(tipo, volumen, par_divisas, sl, tp, comentario))
+        if resultado.retcode != TRADE_RETCODE_DONE:
+            raise ValueError(f"Orden rechazada ({resultado.retcode}): {resultado.comment}")
+        return resultado.order
+
+    def obtener_posiciones(self, par_divisas=None):
+        """
+        Obtiene las posiciones abiertas
+        
+        Args:
+            par_divisas: Símbolo para filtrar (por defecto todas)
+            
+        Returns:
+            Lista de posiciones abiertas
+        """
+        if not self.conectado:
+            raise ValueError("No estás conectado a MetaTrader 5")
+        with self._bloqueo:
+            if par_divisas:
+                posiciones = self._llamar('positions_get', symbol=par_divisas)
+            else:
+                posiciones = self._llamar('positions_get')
+        return list(posiciones or [])
+
+    def solicitud_cierre(self, ticket, desviacion=20):
+        """
+        Construye la solicitud que cierra una posición abierta
+        
+        Args:
+            ticket: Ticket de la posición
+            desviacion: Desviación máxima del precio en puntos
+            
+        Returns:
+            Diccionario con la solicitud para order_send
+            
+        Raises:
+            ValueError: Si la posición no existe
+        """
+        with self._bloqueo:
+            posiciones = self._llamar('positions_get', ticket=ticket)
+        if not posiciones:
+            raise ValueError(f"No existe la posición {ticket}")
+        posicion = posiciones[0]
+        tipo = 'venta' if posicion.type == POSITION_TYPE_BUY else 'compra'
+        return self.construir_solicitud(tipo, posicion.volume, posicion.symbol, posicion=ticket,
+                                        desviacion=desviacion)
+
+    def cerrar_posicion(self, ticket):
+        """
+        Cierra una posición a mercado de forma síncrona
+        
+        Args:
+            ticket: Ticket de la posición
+            
+        Returns:
+            Resultado de order_send
+            
+        Raises:
+            ValueError: Si la posición no existe o el cierre es rechazado
+        """
+        resultado = self.enviar_solicitud(self.solicitud_cierre(ticket))
+        if resultado.retcode != TRADE_RETCODE_DONE:
+            raise ValueError(f"Cierre rechazado ({resultado.retcode}): {resultado.comment}")
+        return resultado
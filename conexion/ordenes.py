@@ -0,0 +1,292 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from .backend import (ORDER_TYPE_BUY, TRADE_RETCODE_DONE, TRADE_RETCODE_PRICE_CHANGED,
+                      TRADE_RETCODE_PRICE_OFF, TRADE_RETCODE_REQUOTE)
+from .riesgo import OrdenVetada
+
+# Códigos de respuesta tras los que se reintenta con un precio nuevo
+RETCODES_REINTENTO = (TRADE_RETCODE_REQUOTE, TRADE_RETCODE_PRICE_CHANGED, TRADE_RETCODE_PRICE_OFF)
+
+
+class Orden:
+    """
+    Orden enviada a través del GestorOrdenes. Se rellena desde el hilo de
+    envío; esperar() bloquea hasta que termina. Las órdenes síncronas de
+    las estrategias se devuelven ya terminadas (ver sincrona)
+    """
+    def __init__(self, identificador, tipo, volumen, par_divisas, sl=None, tp=None, comentario="", cerrar=None):
+        """
+        Inicializa la orden
+
+        Args:
+            identificador: Identificador interno de la orden
+            tipo: 'compra' o 'venta' ('cierre' para cerrar una posición)
+            volumen: Volumen en lotes
+            par_divisas: Símbolo de la orden
+            sl: Precio de stop loss (opcional)
+            tp: Precio de take profit (opcional)
+            comentario: Comentario de la orden
+            cerrar: Ticket de la posición a cerrar, u Orden que la abrió (opcional)
+        """
+        self.id = identificador
+        self.tipo = tipo
+        self.volumen = volumen
+        self.par_divisas = par_divisas
+        self.sl = sl
+        self.tp = tp
+        self.comentario = comentario
+        self.cerrar = cerrar
+        self.estado = 'pendiente'
+        self.intentos = 0
+        self.ticket = None
+        self.precio_solicitado = None
+        self.precio_ejecutado = None
+        self.deslizamiento = None
+        # Envío → confirmación final, incluidos reintentos y sus esperas
+        self.latencia = None
+        # Duración de cada llamada a order_send
+        self.latencias_intentos = []
+        self.error = None
+        self.resultado = None
+        self.creada = time.perf_counter()
+        self._terminada = threading.Event()
+
+    @classmethod
+    def sincrona(cls, tipo, volumen, par_divisas, ticket=None, resultado=None, cerrar=None):
+        """
+        Crea una orden ya ejecutada de forma síncrona (sin GestorOrdenes), para
+        que las estrategias reciban el mismo tipo con y sin gestor de órdenes
+
+        Args:
+            tipo: 'compra', 'venta' o 'cierre'
+            volumen: Volumen en lotes
+            par_divisas: Símbolo de la orden
+            ticket: Ticket de la posición abierta
+            resultado: Valor devuelto por el conector
+            cerrar: Ticket de la posición cerrada
+
+        Returns:
+            Orden terminada en estado 'ejecutada'
+        """
+        orden = cls(None, tipo, volumen, par_divisas, cerrar=cerrar)
+        orden.estado = 'ejecutada'
+        orden.ticket = ticket
+        orden.resultado = resultado
+        orden._terminada.set()
+        return orden
+
+    @property
+    def terminada(self):
+        """
+        Indica si la orden ya fue ejecutada o rechazada
+        """
+        return self._terminada.is_set()
+
+    def esperar(self, espera=None):
+        """
+        Espera a que la orden termine
+
+        Args:
+            espera: Segundos máximos de espera (None para esperar indefinidamente)
+
+        Returns:
+            True si la orden terminó
+        """
+        return self._terminada.wait(espera)
+
+    def __repr__(self):
+        return (f"Orden(id={self.id}, tipo={self.tipo}, volumen={self.volumen}, "
+                f"par={self.par_divisas}, estado={self.estado}, ticket={self.ticket})")
+
+
+class GestorOrdenes:
+    """
+    Gestor de órdenes asíncrono: las órdenes se encolan y un hilo dedicado
+    las envía al terminal, reintentando ante recotizaciones y registrando la
+    latencia envío → confirmación y el deslizamiento de cada una
+    """
+    def __init__(self, conector, max_reintentos=3, espera_reintento=0.05, desviacion=20,
+                 al_terminar=None, muestras=10000):
+        """
+        Inicializa el gestor
+
+        Args:
+            conector: Instancia de ConectorMT5
+            max_reintentos: Reintentos ante recotización o cambio de precio
+            espera_reintento: Segundos entre reintentos
+            desviacion: Desviación máxima del precio en puntos
+            al_terminar: Función opcional llamada con cada Orden al terminar
+            muestras: Órdenes terminadas conservadas para las estadísticas
+        """
+        self.conector = conector
+        self.max_reintentos = max_reintentos
+        self.espera_reintento = espera_reintento
+        self.desviacion = desviacion
+        self.al_terminar = al_terminar
+        self._cola = queue.Queue()
+        self._ids = itertools.count(1)
+        self._terminadas = deque(maxlen=muestras)
+        self._hilo = None
+        self._detener = threading.Event()
+
+    def iniciar(self):
+        """
+        Inicia el hilo de envío de órdenes
+        """
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="GestorOrdenes", daemon=True)
+        self._hilo.start()
+
+    def detener(self, espera=5.0):
+        """
+        Detiene el hilo tras enviar las órdenes ya encoladas
+        """
+        self._detener.set()
+        self._cola.put(None)
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(espera)
+        self._hilo = None
+
+    @property
+    def pendientes(self):
+        """
+        Número de órdenes en cola
+        """
+        return self._cola.qsize()
+
+    def enviar(self, tipo, volumen, par_divisas=None, sl=None, tp=None, comentario=""):
+        """
+        Encola una orden a mercado sin bloquear
+
+        Returns:
+            Orden en curso
+        """
+        if tipo not in ('compra', 'venta'):
+            raise ValueError(f"Tipo de orden no válido: {tipo}")
+        if volumen <= 0:
+            raise ValueError("El volumen debe ser mayor que cero")
+        orden = Orden(next(self._ids), tipo, volumen, par_divisas or self.conector.par_divisas,
+                      sl, tp, comentario)
+        self._cola.put(orden)
+        return orden
+
+    def cerrar(self, ticket):
+        """
+        Encola el cierre de una posición sin bloquear
+
+        Args:
+            ticket: Ticket de la posición, o la Orden que la abrió; en ese caso
+                el cierre espera a que termine y se rechaza si no abrió la posición
+
+        Returns:
+            Orden en curso
+        """
+        orden = Orden(next(self._ids), 'cierre', None, None, cerrar=ticket)
+        self._cola.put(orden)
+        return orden
+
+    def _bucle(self):
+        """
+        Bucle del hilo de envío
+        """
+        while True:
+            orden = self._cola.get()
+            if orden is None:
+                if self._detener.is_set():
+                    break
+                continue
+            self._procesar(orden)
+
+    def _procesar(self, orden):
+        """
+        Envía una orden, reintentando ante recotizaciones
+        """
+        orden.estado = 'enviada'
+        try:
+            if isinstance(orden.cerrar, Orden):
+                # Cierre de una orden propia: esperar su ejecución (normalmente
+                # ya terminó, porque la cola se procesa en orden) y usar su ticket
+                apertura = orden.cerrar
+                apertura.esperar()
+                if apertura.estado != 'ejecutada' or apertura.ticket is None:
+                    raise ValueError(f"La orden {apertura.id} no abrió ninguna posición ({apertura.estado})")
+                orden.cerrar = apertura.ticket
+            inicio = time.perf_counter()
+            while True:
+                orden.intentos += 1
+                # Cada intento se construye con el precio actual
+                if orden.cerrar is not None:
+                    solicitud = self.conector.solicitud_cierre(orden.cerrar, self.desviacion)
+                else:
+                    solicitud = self.conector.construir_solicitud(
+                        orden.tipo, orden.volumen, orden.par_divisas, orden.sl, orden.tp,
+                        orden.comentario, desviacion=self.desviacion)
+                orden.precio_solicitado = solicitud['price']
+                inicio_intento = time.perf_counter()
+                resultado = self.conector.enviar_solicitud(solicitud)
+                fin = time.perf_counter()
+                orden.latencias_intentos.append(fin - inicio_intento)
+                orden.latencia = fin - inicio
+                orden.resultado = resultado
+
+                if resultado.retcode == TRADE_RETCODE_DONE:
+                    orden.estado = 'ejecutada'
+                    orden.ticket = resultado.order
+                    orden.precio_ejecutado = resultado.price
+                    # Deslizamiento positivo = precio peor que el solicitado
+                    signo = 1 if solicitud['type'] == ORDER_TYPE_BUY else -1
+                    orden.deslizamiento = (resultado.price - orden.precio_solicitado) * signo
+                    break
+                if resultado.retcode in RETCODES_REINTENTO and orden.intentos <= self.max_reintentos:
+                    time.sleep(self.espera_reintento)
+                    continue
+                orden.estado = 'rechazada'
+                orden.error = f"({resultado.retcode}) {resultado.comment}"
+                break
+        except OrdenVetada as e:
+            # Vetada por el motor de riesgo: no se reintenta
+            orden.estado = 'vetada'
+            orden.error = str(e)
+        except Exception as e:
+            orden.estado = 'rechazada'
+            orden.error = str(e)
+
+        self._terminadas.append(orden)
+        orden._terminada.set()
+        if self.al_terminar is not None:
+            try:
+                self.al_terminar(orden)
+            except Exception as e:
+                # Un error del callback no debe detener el hilo de envío
+                orden.error = orden.error or f"Error en al_terminar: {str(e)}"
+
+    def estadisticas(self):
+        """
+        Calcula estadísticas de las órdenes terminadas
+
+        Returns:
+            Diccionario con ejecutadas, rechazadas, vetadas (por el motor de riesgo),
+            reintentos, latencia p50/p99/máxima en milisegundos y deslizamiento
+            medio/máximo en precio
+        """
+        ordenes = list(self._terminadas)
+        ejecutadas = [orden for orden in ordenes if orden.estado == 'ejecutada']
+        vetadas = sum(1 for orden in ordenes if orden.estado == 'vetada')
+        latencias = sorted(orden.latencia for orden in ejecutadas if orden.latencia is not None)
+        deslizamientos = [orden.deslizamiento for orden in ejecutadas if orden.deslizamiento is not None]
+        return {
+            'ejecutadas': len(ejecutadas),
+            'rechazadas': len(ordenes) - len(ejecutadas) - vetadas,
+            'vetadas': vetadas,
+            'reintentos': sum(orden.intentos - 1 for orden in ordenes),
+            'latencia_p50_ms': latencias[len(latencias) // 2] * 1000 if latencias else None,
+            'latencia_p99_ms': latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))] * 1000 if latencias else None,
+            'latencia_max_ms': latencias[-1] * 1000 if latencias else None,
+            'deslizamiento_medio': sum(deslizamientos) / len(deslizamientos) if deslizamientos else None,
+            'deslizamiento_max': max(deslizamientos) if deslizamientos else None,
+        }
@@ -0,0 +1,456 @@
+import calendar
+from datetime import datetime, timezone
+import numpy as np
+from estrategias.base import Barra
+from .backend import TIMEFRAME_M1, TIMEFRAME_MN1, TIMEFRAME_W1, segundos_periodo
+from .barras import Barras
+from .cache import BufferBarras
+from .simulado import DTYPE_RATES
+
+# Las barras semanales de MT5 empiezan el domingo; el 4 de enero de 1970 fue domingo
+DESFASE_SEMANA = 3 * 86400
+
+
+def inicio_periodo(tiempo, periodo_tiempo):
+    """
+    Calcula el inicio de la barra que contiene un instante
+
+    Args:
+        tiempo: Segundos desde la época (entero o arreglo de enteros)
+        periodo_tiempo: Constante TIMEFRAME_* de MT5
+
+    Returns:
+        Inicio de la barra en segundos (del mismo tipo que tiempo)
+    """
+    if periodo_tiempo == TIMEFRAME_MN1:
+        if isinstance(tiempo, np.ndarray):
+            meses = tiempo.astype('datetime64[s]').astype('datetime64[M]')
+            return meses.astype('datetime64[s]').astype(np.int64)
+        fecha = datetime.fromtimestamp(tiempo, tz=timezone.utc)
+        return calendar.timegm((fecha.year, fecha.month, 1, 0, 0, 0))
+    if periodo_tiempo == TIMEFRAME_W1:
+        return tiempo - (tiempo - DESFASE_SEMANA) % (7 * 86400)
+    return tiempo - tiempo % segundos_periodo(periodo_tiempo)
+
+
+def fin_periodo(inicio, periodo_tiempo):
+    """
+    Calcula el inicio de la barra siguiente a la que empieza en `inicio`
+    """
+    if periodo_tiempo == TIMEFRAME_MN1:
+        fecha = datetime.fromtimestamp(inicio, tz=timezone.utc)
+        anio, mes = (fecha.year + 1, 1) if fecha.month == 12 else (fecha.year, fecha.month + 1)
+        return calendar.timegm((anio, mes, 1, 0, 0, 0))
+    return inicio + segundos_periodo(periodo_tiempo)
+
+
+def remuestrear(barras, periodo_tiempo):
+    """
+    Agrupa de forma vectorizada barras de un periodo menor en barras de un
+    periodo mayor. La última barra devuelta puede estar incompleta
+
+    Args:
+        barras: Arreglo estructurado con time, open, high, low, close y
+            opcionalmente tick_volume, spread y real_volume
+        periodo_tiempo: Periodo de destino (TIMEFRAME_*)
+
+    Returns:
+        Arreglo estructurado con el formato de MT5 (DTYPE_RATES)
+    """
+    if len(barras) == 0:
+        return np.zeros(0, dtype=DTYPE_RATES)
+    inicios = inicio_periodo(np.asarray(barras['time'], dtype=np.int64), periodo_tiempo)
+    cortes = np.concatenate(([0], np.flatnonzero(np.diff(inicios)) + 1))
+    ultimos = np.concatenate((cortes[1:] - 1, [len(barras) - 1]))
+    resultado = np.zeros(len(cortes), dtype=DTYPE_RATES)
+    resultado['time'] = inicios[cortes]
+    resultado['open'] = barras['open'][cortes]
+    resultado['high'] = np.maximum.reduceat(barras['high'], cortes)
+    resultado['low'] = np.minimum.reduceat(barras['low'], cortes)
+    resultado['close'] = barras['close'][ultimos]
+    nombres = barras.dtype.names
+    for campo in ('tick_volume', 'real_volume'):
+        if campo in nombres:
+            resultado[campo] = np.add.reduceat(barras[campo], cortes)
+    if 'spread' in nombres:
+        resultado['spread'] = barras['spread'][ultimos]
+    return resultado
+
+
+class _EstadoPeriodo:
+    """
+    Estado de un periodo de destino: barras cerradas y agregado de las
+    barras base ya cerradas de la barra en formación
+    """
+    __slots__ = ('periodo', 'buffer', 'inicio', 'fin', 'apertura', 'maximo', 'minimo', 'cierre',
+                 'volumen', 'volumen_real', 'spread')
+
+    def __init__(self, periodo, capacidad):
+        self.periodo = periodo
+        self.buffer = BufferBarras(capacidad, DTYPE_RATES)
+        self.inicio = None
+        self.fin = None
+        self.vaciar()
+
+    def vaciar(self):
+        """
+        Descarta el agregado de la barra en formación
+        """
+        self.apertura = self.maximo = self.minimo = self.cierre = None
+        self.volumen = self.volumen_real = self.spread = 0
+
+    def acumular(self, apertura, maximo, minimo, cierre, volumen, spread, volumen_real):
+        """
+        Agrega una barra base cerrada a la barra en formación
+        """
+        if self.apertura is None:
+            self.apertura, self.maximo, self.minimo = apertura, maximo, minimo
+        else:
+            if maximo > self.maximo:
+                self.maximo = maximo
+            if minimo < self.minimo:
+                self.minimo = minimo
+        self.cierre = cierre
+        self.volumen += volumen
+        self.volumen_real += volumen_real
+        self.spread = spread
+
+
+class Remuestreador:
+    """
+    Construye de forma incremental barras de varios periodos (M5, M15, H1...)
+    a partir de las barras M1 de un símbolo, ya vengan de la caché del
+    conector o de las barras construidas con ticks en FlujoTicks. Cada
+    actualización cuesta O(1) por periodo; la barra M1 en formación puede
+    llegar repetida con valores nuevos sin contarse dos veces. Las barras
+    cerradas se entregan a los suscriptores
+    """
+    def __init__(self, simbolo, periodos, capacidad=1000, periodo_base=TIMEFRAME_M1):
+        """
+        Inicializa el remuestreador
+
+        Args:
+            simbolo: Símbolo de las barras
+            periodos: Periodos de destino (constantes TIMEFRAME_*)
+            capacidad: Barras conservadas por periodo
+            periodo_base: Periodo de las barras de entrada
+        """
+        self.simbolo = simbolo
+        self.periodo_base = periodo_base
+        self.capacidad = capacidad
+        self._estados = {}
+        for periodo in periodos:
+            if segundos_periodo(periodo) <= segundos_periodo(periodo_base):
+                raise ValueError(f"El periodo {periodo} no es mayor que el periodo base")
+            self._estados[periodo] = _EstadoPeriodo(periodo, capacidad)
+        self._suscriptores = []
+        # Barra base en formación: (time, open, high, low, close, tick_volume, spread, real_volume)
+        self._actual = None
+
+    @property
+    def periodos(self):
+        """
+        Periodos de destino
+        """
+        return list(self._estados)
+
+    @property
+    def ultimo_tiempo(self):
+        """
+        Marca de tiempo de la última barra base recibida, o None
+        """
+        return None if self._actual is None else self._actual[0]
+
+    def suscribir(self, funcion, periodos=None):
+        """
+        Registra una función que recibe (simbolo, periodo, Barra) al cerrarse una barra
+
+        Args:
+            funcion: Función a llamar
+            periodos: Periodos de interés (None para todos)
+        """
+        self._suscriptores.append((funcion, set(periodos) if periodos else None))
+
+    def cancelar(self, funcion):
+        """
+        Elimina una suscripción
+        """
+        self._suscriptores = [(f, p) for f, p in self._suscriptores if f is not funcion]
+
+    def conectar_estrategia(self, estrategia, periodo):
+        """
+        Llama a estrategia.en_barra con cada barra cerrada del periodo
+        """
+        self.suscribir(lambda simbolo, periodo_barra, barra: estrategia.en_barra(barra), [periodo])
+
+    def actualizar(self, barra):
+        """
+        Procesa una barra base (nueva o la en formación con valores actualizados)
+
+        Args:
+            barra: Barra, registro de un arreglo estructurado de MT5 o tupla
+                (time, open, high, low, close[, tick_volume, spread, real_volume])
+
+        Returns:
+            Lista de tuplas (periodo, Barra) con las barras que se cerraron
+        """
+        valores = tuple(barra)
+        tiempo = int(valores[0])
+        actual = (tiempo, float(valores[1]), float(valores[2]), float(valores[3]), float(valores[4]),
+                  int(valores[5]) if len(valores) > 5 else 0,
+                  int(valores[6]) if len(valores) > 6 else 0,
+                  int(valores[7]) if len(valores) > 7 else 0)
+        anterior = self._actual
+        if anterior is not None:
+            if tiempo < anterior[0]:
+                return []
+            if tiempo == anterior[0]:
+                # Revisión de la barra base en formación
+                self._actual = actual
+                return []
+
+        cerradas = []
+        for estado in self._estados.values():
+            if anterior is not None:
+                estado.acumular(*anterior[1:])
+            if estado.fin is None or tiempo >= estado.fin:
+                if estado.apertura is not None:
+                    cerrada = Barra(estado.inicio, estado.apertura, estado.maximo, estado.minimo, estado.cierre)
+                    estado.buffer.agregar(self._registro(estado.inicio, estado))
+                    cerradas.append((estado.periodo, cerrada))
+                    estado.vaciar()
+                estado.inicio = inicio_periodo(tiempo, estado.periodo)
+                estado.fin = fin_periodo(estado.inicio, estado.periodo)
+        self._actual = actual
+
+        for periodo, cerrada in cerradas:
+            for funcion, periodos in self._suscriptores:
+                if periodos is None or periodo in periodos:
+                    funcion(self.simbolo, periodo, cerrada)
+        return cerradas
+
+    def alimentar(self, barras):
+        """
+        Procesa en orden las barras base de un arreglo, ignorando las ya vistas
+        salvo la barra en formación
+
+        Args:
+            barras: Arreglo estructurado de barras base (por ejemplo la vista de la caché)
+
+        Returns:
+            Lista de tuplas (periodo, Barra) con las barras que se cerraron
+        """
+        if self._actual is not None and len(barras):
+            barras = barras[barras['time'] >= self._actual[0]]
+        cerradas = []
+        for barra in barras:
+            cerradas.extend(self.actualizar(barra))
+        return cerradas
+
+    def inicializar(self, barras):
+        """
+        Construye el historial de cada periodo a partir de un arreglo de
+        barras base de forma vectorizada. La primera barra de cada periodo
+        se descarta si el historial no empieza en su inicio
+
+        Args:
+            barras: Arreglo estructurado de barras base en orden cronológico
+        """
+        if len(barras) == 0:
+            return
+        cerradas = barras[:-1]
+        for estado in self._estados.values():
+            agrupadas = remuestrear(cerradas, estado.periodo)
+            if len(agrupadas) and inicio_periodo(int(cerradas['time'][0]), estado.periodo) != int(cerradas['time'][0]):
+                agrupadas = agrupadas[1:]
+            estado.vaciar()
+            estado.inicio = estado.fin = None
+            if len(agrupadas):
+                estado.buffer.agregar(agrupadas[:-1])
+                ultima = agrupadas[-1]
+                estado.inicio = int(ultima['time'])
+                estado.fin = fin_periodo(estado.inicio, estado.periodo)
+                estado.acumular(float(ultima['open']), float(ultima['high']), float(ultima['low']),
+                                float(ultima['close']), int(ultima['tick_volume']), int(ultima['spread']),
+                                int(ultima['real_volume']))
+        self._actual = None
+        self.actualizar(barras[-1])
+
+    def sembrar(self, periodo, barras, actual=None):
+        """
+        Carga el historial de un periodo con barras de ese periodo pedidas al
+        terminal. La última barra (en formación) pasa a ser el agregado sobre
+        el que se siguen acumulando las barras base
+
+        Args:
+            periodo: Periodo de las barras
+            barras: Arreglo estructurado del periodo en orden cronológico
+            actual: Barra base en formación en el momento de la consulta (su
+                volumen ya está incluido en la última barra y se descuenta)
+        """
+        estado = self._estados[periodo]
+        if len(barras) == 0:
+            return
+        estado.buffer = BufferBarras(self.capacidad, DTYPE_RATES)
+        estado.buffer.agregar(_convertir(barras[:-1]))
+        ultima = _convertir(barras[-1:])[0]
+        estado.vaciar()
+        estado.inicio = int(ultima['time'])
+        estado.fin = fin_periodo(estado.inicio, periodo)
+        volumen, volumen_real = int(ultima['tick_volume']), int(ultima['real_volume'])
+        if actual is not None:
+            valores = tuple(actual)
+            if estado.inicio <= int(valores[0]) < estado.fin:
+                volumen -= int(valores[5]) if len(valores) > 5 else 0
+                volumen_real -= int(valores[7]) if len(valores) > 7 else 0
+        estado.acumular(float(ultima['open']), float(ultima['high']), float(ultima['low']),
+                        float(ultima['close']), max(0, volumen), int(ultima['spread']), max(0, volumen_real))
+
+    def _registro(self, inicio, estado, actual=None):
+        """
+        Construye el registro estructurado de la barra de un periodo,
+        combinando el agregado con la barra base en formación si se indica
+        """
+        registro = np.zeros(1, dtype=DTYPE_RATES)
+        apertura, maximo, minimo, cierre = estado.apertura, estado.maximo, estado.minimo, estado.cierre
+        volumen, spread, volumen_real = estado.volumen, estado.spread, estado.volumen_real
+        if actual is not None:
+            if apertura is None:
+                apertura, maximo, minimo = actual[1], actual[2], actual[3]
+            else:
+                maximo, minimo = max(maximo, actual[2]), min(minimo, actual[3])
+            cierre = actual[4]
+            volumen += actual[5]
+            spread = actual[6]
+            volumen_real += actual[7]
+        registro[0] = (inicio, apertura, maximo, minimo, cierre, volumen, spread, volumen_real)
+        return registro
+
+    def barra_actual(self, periodo):
+        """
+        Obtiene la barra en formación de un periodo, o None si aún no hay datos
+        """
+        estado = self._estados[periodo]
+        if estado.inicio is None or (estado.apertura is None and self._actual is None):
+            return None
+        registro = self._registro(estado.inicio, estado, self._actual)[0]
+        return Barra(int(registro['time']), float(registro['open']), float(registro['high']),
+                     float(registro['low']), float(registro['close']))
+
+    def historial(self, periodo, numero_barras=None):
+        """
+        Obtiene las barras de un periodo, incluida la barra en formación (como
+        hace copy_rates_from_pos)
+
+        Args:
+            periodo: Periodo de las barras
+            numero_barras: Número de barras a devolver (por defecto todas)
+
+        Returns:
+            Arreglo estructurado de solo lectura (vista del buffer)
+        """
+        estado = self._estados[periodo]
+        if estado.inicio is not None and (estado.apertura is not None or self._actual is not None):
+            estado.buffer.agregar(self._registro(estado.inicio, estado, self._actual))
+        return estado.buffer.vista(numero_barras)
+
+
+def _convertir(barras):
+    """
+    Convierte un arreglo estructurado al formato DTYPE_RATES
+    """
+    if barras.dtype == DTYPE_RATES:
+        return barras
+    resultado = np.zeros(len(barras), dtype=DTYPE_RATES)
+    for campo in DTYPE_RATES.names:
+        if campo in barras.dtype.names:
+            resultado[campo] = barras[campo]
+    return resultado
+
+
+class GestorRemuestreo:
+    """
+    Sirve barras de varios periodos pidiendo al terminal solo las M1 de cada
+    símbolo: la primera vez siembra cada periodo con una consulta propia y
+    después los mantiene al día con el remuestreador. Tiene la misma firma de
+    obtener_datos_multiples que el conector, así que EjecutorMultiSimbolo
+    puede usarlo como fuente de datos
+    """
+    def __init__(self, conector, periodos, capacidad=1000):
+        """
+        Inicializa el gestor
+
+        Args:
+            conector: Instancia de ConectorMT5
+            periodos: Periodos mayores que M1 a mantener
+            capacidad: Barras conservadas por símbolo y periodo
+        """
+        self.conector = conector
+        self.periodos = list(periodos)
+        self.capacidad = capacidad
+        self._remuestreadores = {}
+
+    def remuestreador(self, simbolo):
+        """
+        Obtiene el remuestreador de un símbolo, creándolo y sembrándolo si no existe
+        """
+        remuestreador = self._remuestreadores.get(simbolo)
+        if remuestreador is None:
+            remuestreador = Remuestreador(simbolo, self.periodos, self.capacidad)
+            base = self.conector.obtener_barras(self.capacidad, simbolo, TIMEFRAME_M1)
+            remuestreador.inicializar(base)
+            actual = base[-1]
+            for periodo in self.periodos:
+                remuestreador.sembrar(periodo, self.conector.obtener_barras(self.capacidad, simbolo, periodo), actual)
+            self._remuestreadores[simbolo] = remuestreador
+        return remuestreador
+
+    def actualizar(self, simbolo, numero_barras=None):
+        """
+        Pide las barras M1 de un símbolo y actualiza sus periodos
+
+        Returns:
+            Arreglo de barras M1 (vista de la caché del conector)
+        """
+        nuevo = simbolo not in self._remuestreadores
+        remuestreador = self.remuestreador(simbolo)
+        base = self.conector.obtener_barras(max(numero_barras or 0, self.capacidad), simbolo, TIMEFRAME_M1)
+        if not nuevo:
+            remuestreador.alimentar(base)
+        return base
+
+    def obtener_datos_multiples(self, solicitudes, numero_barras=1000):
+        """
+        Obtiene las barras de varios símbolos/periodos con una sola consulta
+        M1 por símbolo
+
+        Args:
+            solicitudes: Iterable de tuplas (par_divisas, periodo_tiempo)
+            numero_barras: Número de barras por combinación
+
+        Returns:
+            Diccionario {(par_divisas, periodo_tiempo): Barras o excepción}
+        """
+        solicitudes = list(dict.fromkeys(solicitudes))
+        resultados = {}
+        bases = {}
+        for simbolo in dict.fromkeys(simbolo for simbolo, _ in solicitudes):
+            try:
+                bases[simbolo] = self.actualizar(simbolo, numero_barras)
+            except Exception as e:
+                bases[simbolo] = e
+        for simbolo, periodo in solicitudes:
+            base = bases[simbolo]
+            if isinstance(base, Exception):
+                resultados[(simbolo, periodo)] = base
+            elif periodo == TIMEFRAME_M1 or periodo is None:
+                resultados[(simbolo, periodo)] = Barras.desde_arreglo(base[-numero_barras:])
+            elif periodo in self.periodos:
+                historial = self._remuestreadores[simbolo].historial(periodo, numero_barras)
+                resultados[(simbolo, periodo)] = Barras.desde_arreglo(historial)
+            else:
+                try:
+                    resultados[(simbolo, periodo)] = self.conector.obtener_datos(numero_barras, simbolo, periodo)
+                except Exception as e:
+                    resultados[(simbolo, periodo)] = e
+        return resultados
@@ -0,0 +1,493 @@
+import threading
+import time
+from .backend import ORDER_TYPE_BUY, POSITION_TYPE_BUY, TRADE_RETCODE_DONE
+from metricas import METRICAS
+
+METRICAS.describir('riesgo_vetos_total', "Órdenes vetadas por el motor de riesgo por regla")
+
+
+class OrdenVetada(ValueError):
+    """
+    Orden rechazada por el motor de riesgo antes de llegar al terminal
+    """
+    def __init__(self, regla, mensaje):
+        super().__init__(mensaje)
+        self.regla = regla
+
+
+class _Simbolo:
+    """
+    Estado de un símbolo: divisas, tamaño del contrato, último precio y
+    agregados de sus posiciones largas y cortas
+    """
+    __slots__ = ('base', 'cotizada', 'contrato', 'bid', 'ask', 'volumen_largo', 'coste_largo',
+                 'volumen_corto', 'coste_corto', 'flotante', 'posiciones')
+
+    def __init__(self, base, cotizada, contrato):
+        self.base = base
+        self.cotizada = cotizada
+        self.contrato = contrato
+        self.bid = self.ask = None
+        self.volumen_largo = self.coste_largo = 0.0
+        self.volumen_corto = self.coste_corto = 0.0
+        self.flotante = 0.0
+        self.posiciones = 0
+
+    @property
+    def neto(self):
+        """
+        Volumen neto en lotes (positivo comprado, negativo vendido)
+        """
+        return self.volumen_largo - self.volumen_corto
+
+    def valorar(self):
+        """
+        Beneficio flotante de las posiciones del símbolo con el último precio
+        (las largas se cierran al bid y las cortas al ask)
+        """
+        flotante = 0.0
+        if self.volumen_largo and self.bid is not None:
+            flotante += self.bid * self.volumen_largo - self.coste_largo
+        if self.volumen_corto and self.ask is not None:
+            flotante += self.coste_corto - self.ask * self.volumen_corto
+        return flotante * self.contrato
+
+
+class MotorRiesgo:
+    """
+    Motor de riesgo en memoria: mantiene las posiciones abiertas, la
+    exposición por divisa y el resultado del día, actualizados de forma
+    incremental con cada ejecución y cada tick, y veta antes de enviarlas
+    las órdenes que superarían los límites configurados. Las comprobaciones
+    solo consultan ese estado, así que cuestan microsegundos.
+
+    Los importes (beneficio, resultado del día) están en la divisa cotizada
+    de cada símbolo, que se suponen iguales a la divisa de la cuenta
+    """
+    def __init__(self, max_volumen_orden=None, max_posiciones=None, max_volumen_simbolo=None,
+                 max_exposicion_divisa=None, max_perdida_diaria=None, max_drawdown=None,
+                 tamano_contrato=100000.0, al_bloquear=None):
+        """
+        Inicializa el motor. Los límites a None no se comprueban
+
+        Args:
+            max_volumen_orden: Volumen máximo de una orden en lotes
+            max_posiciones: Número máximo de posiciones abiertas
+            max_volumen_simbolo: Volumen neto máximo por símbolo en lotes
+            max_exposicion_divisa: Exposición neta máxima por divisa en unidades
+                de esa divisa; un número para todas o un diccionario {divisa: límite}
+            max_perdida_diaria: Pérdida máxima del día (realizada + flotante)
+            max_drawdown: Caída máxima del equity desde su máximo (fracción, ej: 0.1)
+            tamano_contrato: Tamaño del contrato de los símbolos sin información
+            al_bloquear: Función opcional llamada con el motivo al bloquear la operativa
+        """
+        self.max_volumen_orden = max_volumen_orden
+        self.max_posiciones = max_posiciones
+        self.max_volumen_simbolo = max_volumen_simbolo
+        self.max_exposicion_divisa = max_exposicion_divisa
+        self.max_perdida_diaria = max_perdida_diaria
+        self.max_drawdown = max_drawdown
+        self.tamano_contrato = tamano_contrato
+        self.al_bloquear = al_bloquear
+        self.balance = 0.0
+        self.vetos = 0
+        self.motivo_bloqueo = None
+        self._info_simbolo = None
+        self._simbolos = {}
+        self._posiciones = {}
+        self._exposicion = {}
+        self._flotante = 0.0
+        self._pico = None
+        self._dia = None
+        self._equity_inicio_dia = 0.0
+        self._bloqueo = threading.Lock()
+
+    @property
+    def bloqueado(self):
+        """
+        Indica si la operativa está bloqueada por pérdida diaria o drawdown
+        """
+        return self.motivo_bloqueo is not None
+
+    @property
+    def equity(self):
+        """
+        Balance más el beneficio flotante
+        """
+        return self.balance + self._flotante
+
+    def registrar_simbolo(self, simbolo, base=None, cotizada=None, tamano_contrato=None):
+        """
+        Registra las divisas y el tamaño del contrato de un símbolo
+
+        Args:
+            simbolo: Nombre del símbolo
+            base: Divisa base (por defecto las tres primeras letras)
+            cotizada: Divisa cotizada (por defecto las letras 4 a 6)
+            tamano_contrato: Unidades por lote (por defecto el del motor)
+        """
+        with self._bloqueo:
+            self._registrar(simbolo, base, cotizada, tamano_contrato)
+
+    def _registrar(self, simbolo, base=None, cotizada=None, tamano_contrato=None):
+        """
+        Crea o actualiza el estado de un símbolo (con el bloqueo ya adquirido)
+        """
+        estado = self._simbolos.get(simbolo)
+        if estado is None:
+            estado = self._simbolos[simbolo] = _Simbolo(base or simbolo[:3], cotizada or simbolo[3:6],
+                                                        tamano_contrato or self.tamano_contrato)
+        else:
+            estado.base = base or estado.base
+            estado.cotizada = cotizada or estado.cotizada
+            estado.contrato = tamano_contrato or estado.contrato
+        return estado
+
+    def _simbolo(self, simbolo):
+        """
+        Obtiene el estado de un símbolo (con el bloqueo ya adquirido). Nunca
+        consulta al terminal: los símbolos nuevos se consultan antes con
+        _consultar_simbolo y, si no, se registran con los valores por defecto
+        """
+        estado = self._simbolos.get(simbolo)
+        if estado is None:
+            estado = self._registrar(simbolo)
+        return estado
+
+    def _consultar_simbolo(self, simbolo):
+        """
+        Consulta al terminal la información de un símbolo aún no registrado y
+        lo registra. Se llama sin el bloqueo para que la consulta no detenga
+        a los hilos que verifican órdenes o actualizan precios
+        """
+        if simbolo in self._simbolos or self._info_simbolo is None:
+            return
+        try:
+            info = self._info_simbolo(simbolo)
+        except Exception:
+            info = None
+        if info is None:
+            self.registrar_simbolo(simbolo)
+            return
+        self.registrar_simbolo(simbolo, getattr(info, 'currency_base', None), getattr(info, 'currency_profit', None),
+                               getattr(info, 'trade_contract_size', None))
+
+    def sincronizar(self, conector, simbolos=()):
+        """
+        Reconstruye el estado a partir de la cuenta y las posiciones abiertas
+        del terminal (al iniciar o tras una reconexión) y toma el conector
+        para consultar la información de los símbolos nuevos. Los símbolos
+        de las posiciones y los indicados se consultan aquí, fuera del
+        bloqueo, para no hacerlo al verificar la primera orden
+
+        Args:
+            conector: Instancia de ConectorMT5 conectada
+            simbolos: Símbolos que se van a operar (los de las estrategias)
+        """
+        info = conector.obtener_info_cuenta()
+        posiciones = conector.obtener_posiciones()
+        self._info_simbolo = conector.obtener_info_simbolo
+        for simbolo in set(simbolos) | {posicion.symbol for posicion in posiciones}:
+            self._consultar_simbolo(simbolo)
+        with self._bloqueo:
+            for estado in self._simbolos.values():
+                estado.volumen_largo = estado.coste_largo = 0.0
+                estado.volumen_corto = estado.coste_corto = 0.0
+                estado.flotante = 0.0
+                estado.posiciones = 0
+            self._posiciones = {}
+            self._exposicion = {}
+            self._flotante = 0.0
+            self.balance = float(info.balance)
+            for posicion in posiciones:
+                tipo = 'compra' if posicion.type == POSITION_TYPE_BUY else 'venta'
+                self._abrir(posicion.ticket, posicion.symbol, tipo, float(posicion.volume), float(posicion.price_open))
+                estado = self._simbolos[posicion.symbol]
+                if tipo == 'compra':
+                    estado.bid = float(posicion.price_current)
+                else:
+                    estado.ask = float(posicion.price_current)
+            for estado in self._simbolos.values():
+                self._revalorar(estado)
+            self._comprobar_limites()
+
+    def _nuevo_dia(self):
+        """
+        Empieza el resultado del día en el primer evento de cada día (UTC)
+        """
+        dia = int(time.time() // 86400)
+        if dia != self._dia:
+            self._dia = dia
+            self._equity_inicio_dia = self.equity
+            if self.motivo_bloqueo is not None and self.motivo_bloqueo.startswith('Pérdida diaria'):
+                self.motivo_bloqueo = None
+
+    def _revalorar(self, estado):
+        """
+        Actualiza el beneficio flotante total con el de un símbolo
+        """
+        flotante = estado.valorar()
+        self._flotante += flotante - estado.flotante
+        estado.flotante = flotante
+
+    def _comprobar_limites(self):
+        """
+        Actualiza el máximo del equity y bloquea la operativa si se supera la
+        pérdida diaria o el drawdown
+        """
+        self._nuevo_dia()
+        equity = self.equity
+        if self._pico is None or equity > self._pico:
+            self._pico = equity
+        if self.motivo_bloqueo is not None:
+            return
+        motivo = None
+        perdida = self._equity_inicio_dia - equity
+        if self.max_perdida_diaria is not None and perdida >= self.max_perdida_diaria:
+            motivo = f"Pérdida diaria de {perdida:.2f} (límite {self.max_perdida_diaria:.2f})"
+        elif self.max_drawdown is not None and self._pico > 0 and 1 - equity / self._pico >= self.max_drawdown:
+            motivo = f"Drawdown de {1 - equity / self._pico:.2%} (límite {self.max_drawdown:.2%})"
+        if motivo is not None:
+            self.motivo_bloqueo = motivo
+            if self.al_bloquear is not None:
+                try:
+                    self.al_bloquear(motivo)
+                except Exception:
+                    pass
+
+    def desbloquear(self):
+        """
+        Levanta manualmente el bloqueo de la operativa
+        """
+        with self._bloqueo:
+            self.motivo_bloqueo = None
+            self._pico = self.equity
+
+    def actualizar_precio(self, simbolo, bid, ask):
+        """
+        Actualiza el precio de un símbolo y el beneficio flotante en tiempo constante
+
+        Args:
+            simbolo: Nombre del símbolo
+            bid: Precio de venta
+            ask: Precio de compra
+        """
+        self._consultar_simbolo(simbolo)
+        with self._bloqueo:
+            estado = self._simbolo(simbolo)
+            estado.bid = bid
+            estado.ask = ask
+            if estado.posiciones:
+                self._revalorar(estado)
+                self._comprobar_limites()
+
+    def en_tick(self, evento):
+        """
+        Procesa un evento de FlujoTicks (los eventos de barra se ignoran), de
+        modo que se puede usar con Suscripcion.despachar
+        """
+        bid = getattr(evento, 'bid', None)
+        if bid is not None:
+            self.actualizar_precio(evento.simbolo, bid, evento.ask)
+
+    def _vetar(self, regla, mensaje):
+        """
+        Cuenta un veto y devuelve su motivo
+        """
+        self.vetos += 1
+        METRICAS.contador('riesgo_vetos_total', regla=regla).incrementar()
+        return OrdenVetada(regla, mensaje)
+
+    def verificar(self, tipo, volumen, simbolo, precio=None):
+        """
+        Comprueba si una orden de apertura respeta los límites
+
+        Args:
+            tipo: 'compra' o 'venta'
+            volumen: Volumen en lotes
+            simbolo: Símbolo de la orden
+            precio: Precio previsto (por defecto el último conocido)
+
+        Returns:
+            None si la orden se puede enviar, o OrdenVetada con el motivo
+        """
+        self._consultar_simbolo(simbolo)
+        with self._bloqueo:
+            if self.motivo_bloqueo is not None:
+                return self._vetar('bloqueo', f"Operativa bloqueada: {self.motivo_bloqueo}")
+            if self.max_volumen_orden is not None and volumen > self.max_volumen_orden:
+                return self._vetar('volumen_orden', f"Volumen {volumen} mayor que el máximo por orden "
+                                                    f"({self.max_volumen_orden})")
+            if self.max_posiciones is not None and len(self._posiciones) >= self.max_posiciones:
+                return self._vetar('posiciones', f"Ya hay {len(self._posiciones)} posiciones abiertas "
+                                                 f"(máximo {self.max_posiciones})")
+            estado = self._simbolo(simbolo)
+            signo = 1.0 if tipo == 'compra' else -1.0
+            # Las órdenes que reducen la posición o la exposición siempre se aceptan
+            neto = estado.neto
+            nuevo_neto = neto + signo * volumen
+            if (self.max_volumen_simbolo is not None and abs(nuevo_neto) > self.max_volumen_simbolo
+                    and abs(nuevo_neto) > abs(neto)):
+                return self._vetar('volumen_simbolo', f"Volumen neto de {simbolo} quedaría en {nuevo_neto:.2f} "
+                                                      f"(máximo {self.max_volumen_simbolo})")
+            if self.max_exposicion_divisa is not None:
+                if precio is None:
+                    precio = estado.ask if signo > 0 else estado.bid
+                unidades = signo * volumen * estado.contrato
+                patas = [(estado.base, unidades)]
+                if precio is not None:
+                    patas.append((estado.cotizada, -unidades * precio))
+                for divisa, cambio in patas:
+                    limite = self._limite_exposicion(divisa)
+                    if limite is None:
+                        continue
+                    actual = self._exposicion.get(divisa, 0.0)
+                    if abs(actual + cambio) > limite and abs(actual + cambio) > abs(actual):
+                        return self._vetar('exposicion', f"Exposición en {divisa} quedaría en "
+                                                         f"{actual + cambio:,.0f} (máximo {limite:,.0f})")
+            return None
+
+    def _limite_exposicion(self, divisa):
+        """
+        Obtiene el límite de exposición de una divisa, o None si no tiene
+        """
+        if isinstance(self.max_exposicion_divisa, dict):
+            return self.max_exposicion_divisa.get(divisa)
+        return self.max_exposicion_divisa
+
+    def verificar_solicitud(self, solicitud):
+        """
+        Comprueba una solicitud de order_send. Los cierres de posiciones
+        siempre se aceptan
+
+        Args:
+            solicitud: Diccionario construido por ConectorMT5
+
+        Returns:
+            None si la orden se puede enviar, o OrdenVetada con el motivo
+        """
+        if solicitud.get('position'):
+            return None
+        tipo = 'compra' if solicitud['type'] == ORDER_TYPE_BUY else 'venta'
+        return self.verificar(tipo, solicitud['volume'], solicitud['symbol'], solicitud.get('price'))
+
+    def _abrir(self, ticket, simbolo, tipo, volumen, precio):
+        """
+        Añade una posición a los agregados de su símbolo y a la exposición
+        """
+        estado = self._simbolo(simbolo)
+        signo = 1.0 if tipo == 'compra' else -1.0
+        self._posiciones[ticket] = (simbolo, signo, volumen, precio)
+        if signo > 0:
+            estado.volumen_largo += volumen
+            estado.coste_largo += volumen * precio
+        else:
+            estado.volumen_corto += volumen
+            estado.coste_corto += volumen * precio
+        estado.posiciones += 1
+        unidades = signo * volumen * estado.contrato
+        self._exposicion[estado.base] = self._exposicion.get(estado.base, 0.0) + unidades
+        self._exposicion[estado.cotizada] = self._exposicion.get(estado.cotizada, 0.0) - unidades * precio
+        return estado
+
+    def registrar_apertura(self, ticket, simbolo, tipo, volumen, precio):
+        """
+        Registra la ejecución de una orden de apertura
+
+        Args:
+            ticket: Ticket de la posición
+            simbolo: Símbolo
+            tipo: 'compra' o 'venta'
+            volumen: Volumen ejecutado en lotes
+            precio: Precio de ejecución
+        """
+        self._consultar_simbolo(simbolo)
+        with self._bloqueo:
+            estado = self._abrir(ticket, simbolo, tipo, float(volumen), float(precio))
+            self._revalorar(estado)
+            self._comprobar_limites()
+
+    def registrar_cierre(self, ticket, precio, volumen=None):
+        """
+        Registra el cierre (total o parcial) de una posición y su resultado
+
+        Args:
+            ticket: Ticket de la posición
+            precio: Precio de cierre
+            volumen: Volumen cerrado (por defecto toda la posición)
+
+        Returns:
+            Beneficio realizado, o None si la posición no se conocía
+        """
+        with self._bloqueo:
+            posicion = self._posiciones.pop(ticket, None)
+            if posicion is None:
+                return None
+            simbolo, signo, abierto, apertura = posicion
+            cerrado = abierto if volumen is None else min(float(volumen), abierto)
+            estado = self._simbolos[simbolo]
+            if signo > 0:
+                estado.volumen_largo -= cerrado
+                estado.coste_largo -= cerrado * apertura
+            else:
+                estado.volumen_corto -= cerrado
+                estado.coste_corto -= cerrado * apertura
+            if cerrado < abierto:
+                self._posiciones[ticket] = (simbolo, signo, abierto - cerrado, apertura)
+            else:
+                estado.posiciones -= 1
+                if not estado.posiciones:
+                    # Descartar los residuos de redondeo de los agregados
+                    estado.volumen_largo = estado.coste_largo = 0.0
+                    estado.volumen_corto = estado.coste_corto = 0.0
+            unidades = signo * cerrado * estado.contrato
+            self._exposicion[estado.base] -= unidades
+            self._exposicion[estado.cotizada] += unidades * apertura
+            realizado = signo * cerrado * estado.contrato * (float(precio) - apertura)
+            self.balance += realizado
+            self._revalorar(estado)
+            self._comprobar_limites()
+            return realizado
+
+    def registrar_resultado(self, solicitud, resultado):
+        """
+        Aplica el resultado de order_send de una solicitud ejecutada
+
+        Args:
+            solicitud: Diccionario enviado a order_send
+            resultado: Resultado con retcode, order, volume y price
+        """
+        if resultado.retcode != TRADE_RETCODE_DONE:
+            return
+        volumen = resultado.volume or solicitud['volume']
+        if solicitud.get('position'):
+            self.registrar_cierre(solicitud['position'], resultado.price, volumen)
+        else:
+            tipo = 'compra' if solicitud['type'] == ORDER_TYPE_BUY else 'venta'
+            self.registrar_apertura(resultado.order, solicitud['symbol'], tipo, volumen, resultado.price)
+
+    def estadisticas(self):
+        """
+        Obtiene una instantánea del estado de riesgo
+
+        Returns:
+            Diccionario con posiciones, volumen neto por símbolo, exposición por
+            divisa, balance, flotante, equity, resultado del día, drawdown,
+            bloqueo y número de vetos
+        """
+        with self._bloqueo:
+            equity = self.equity
+            return {
+                'posiciones': len(self._posiciones),
+                'volumen_neto': {simbolo: estado.neto for simbolo, estado in self._simbolos.items()
+                                 if estado.posiciones},
+                'exposicion': {divisa: valor for divisa, valor in self._exposicion.items() if abs(valor) > 1e-9},
+                'balance': self.balance,
+                'flotante': self._flotante,
+                'equity': equity,
+                'resultado_dia': equity - self._equity_inicio_dia if self._dia is not None else None,
+                'drawdown': 1 - equity / self._pico if self._pico else None,
+                'bloqueado': self.bloqueado,
+                'motivo_bloqueo': self.motivo_bloqueo,
+                'vetos': self.vetos,
+            }
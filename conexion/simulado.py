@@ -0,0 +1,414 @@
+import fnmatch
+import itertools
+import random
+import threading
+import time
+import zlib
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+from . import backend as constantes
+from .backend import segundos_periodo
+
+# Mismos campos que los arreglos devueltos por el paquete MetaTrader5
+DTYPE_RATES = np.dtype([('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                        ('close', '<f8'), ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')])
+DTYPE_TICKS = np.dtype([('time', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('last', '<f8'), ('volume', '<u8'),
+                        ('time_msc', '<i8'), ('flags', '<u4'), ('volume_real', '<f8')])
+
+AccountInfo = namedtuple('AccountInfo', ['login', 'balance', 'equity', 'profit', 'margin', 'margin_free',
+                                         'currency', 'leverage', 'server'])
+SymbolInfo = namedtuple('SymbolInfo', ['name', 'description', 'path', 'currency_base', 'currency_profit',
+                                       'point', 'digits', 'spread', 'trade_contract_size', 'volume_min',
+                                       'volume_max', 'volume_step', 'visible'])
+Tick = namedtuple('Tick', ['time', 'bid', 'ask', 'last', 'volume', 'time_msc', 'flags', 'volume_real'])
+TradePosition = namedtuple('TradePosition', ['ticket', 'time', 'type', 'volume', 'price_open', 'sl', 'tp',
+                                             'price_current', 'profit', 'symbol', 'comment', 'magic'])
+OrderSendResult = namedtuple('OrderSendResult', ['retcode', 'deal', 'order', 'volume', 'price', 'bid', 'ask',
+                                                 'comment', 'request_id', 'request'])
+TerminalInfo = namedtuple('TerminalInfo', ['connected', 'trade_allowed', 'ping_last', 'build', 'name'])
+
+# Símbolos sintéticos por defecto y su precio inicial
+SIMBOLOS_POR_DEFECTO = {
+    'EURUSD': 1.10,
+    'GBPUSD': 1.27,
+    'USDJPY': 150.0,
+    'AUDUSD': 0.66,
+    'USDCHF': 0.88,
+    'XAUUSD': 2000.0,
+}
+
+
+class BackendSimulado:
+    """
+    Sustituto local del paquete MetaTrader5 para ejecuciones sin terminal
+    (Linux, CI, pruebas y benchmarks). Genera barras y ticks sintéticos
+    deterministas o sirve datos grabados, simula órdenes y posiciones y
+    puede añadir una latencia fija a cada llamada
+    """
+    def __init__(self, simbolos=None, datos=None, latencia=0.0, semilla=0, barras_historial=100000,
+                 balance=10000.0, spread=10, intervalo_ticks_ms=1000, probabilidad_recotizacion=0.0):
+        """
+        Inicializa el backend simulado
+
+        Args:
+            simbolos: Diccionario {símbolo: precio inicial} de los símbolos sintéticos
+            datos: Diccionario {(símbolo, periodo): arreglo de barras} con datos grabados
+            latencia: Segundos de espera añadidos a cada llamada
+            semilla: Semilla de los datos sintéticos
+            barras_historial: Barras sintéticas generadas hacia atrás desde ahora
+            balance: Balance inicial de la cuenta simulada
+            spread: Spread en puntos de los precios sintéticos
+            intervalo_ticks_ms: Milisegundos entre ticks sintéticos
+            probabilidad_recotizacion: Probabilidad de que order_send devuelva una recotización
+        """
+        self.simbolos = dict(SIMBOLOS_POR_DEFECTO if simbolos is None else simbolos)
+        self.datos = dict(datos or {})
+        for (simbolo, _), barras in self.datos.items():
+            if simbolo not in self.simbolos and len(barras):
+                self.simbolos[simbolo] = float(barras['close'][-1])
+        self.latencia = latencia
+        self.semilla = semilla
+        self.barras_historial = barras_historial
+        self.balance = balance
+        self.spread = spread
+        self.intervalo_ticks_ms = intervalo_ticks_ms
+        self.probabilidad_recotizacion = probabilidad_recotizacion
+        self._aleatorio = random.Random(semilla)
+        self._series = {}
+        self._posiciones = {}
+        self._tickets = itertools.count(1)
+        self._bloqueo = threading.RLock()
+        self._inicializado = False
+        self._error = (1, 'Success')
+
+    # --- Utilidades internas ---
+
+    def _esperar(self):
+        """
+        Aplica la latencia configurada
+        """
+        if self.latencia > 0:
+            time.sleep(self.latencia)
+
+    def _disponible(self):
+        """
+        Comprueba que initialize() se haya llamado, como hace el terminal real
+        """
+        if not self._inicializado:
+            self._error = (-10004, 'No IPC connection')
+            return False
+        return True
+
+    def _punto(self, simbolo):
+        """
+        Tamaño del punto del símbolo
+        """
+        if 'JPY' in simbolo:
+            return 0.001
+        if simbolo.startswith('XA'):
+            return 0.01
+        return 0.00001
+
+    def _tamano_contrato(self, simbolo):
+        """
+        Unidades por lote del símbolo
+        """
+        return 100 if simbolo.startswith('XA') else 100000
+
+    def _serie(self, simbolo, periodo_tiempo):
+        """
+        Obtiene todas las barras disponibles hasta ahora para un símbolo/periodo,
+        extendiendo la serie sintética con las barras nuevas
+
+        Returns:
+            Arreglo estructurado de barras, o None si el símbolo no existe
+        """
+        clave = (simbolo, periodo_tiempo)
+        if clave in self.datos:
+            return self.datos[clave]
+        if simbolo not in self.simbolos:
+            self._error = (-1, f'Unknown symbol {simbolo}')
+            return None
+
+        paso = segundos_periodo(periodo_tiempo)
+        ahora = int(time.time()) // paso * paso
+        with self._bloqueo:
+            serie = self._series.get(clave)
+            if serie is None:
+                generador = np.random.default_rng([self.semilla, zlib.crc32(simbolo.encode()), periodo_tiempo])
+                barras = self._generar(generador, self.simbolos[simbolo], ahora - (self.barras_historial - 1) * paso,
+                                       paso, self.barras_historial, self._punto(simbolo))
+                self._series[clave] = (barras, generador)
+                return barras
+
+            barras, generador = serie
+            ultimo = int(barras['time'][-1])
+            if ultimo < ahora:
+                nuevas = self._generar(generador, float(barras['close'][-1]), ultimo + paso, paso,
+                                       (ahora - ultimo) // paso, self._punto(simbolo))
+                barras = np.concatenate((barras[-self.barras_historial:], nuevas))
+                self._series[clave] = (barras, generador)
+            return barras
+
+    def _generar(self, generador, precio_inicial, desde, paso, cantidad, punto):
+        """
+        Genera barras sintéticas con un paseo aleatorio geométrico
+        """
+        volatilidad = 0.0002 * np.sqrt(paso / 60)
+        cierres = precio_inicial * np.exp(np.cumsum(generador.normal(0.0, volatilidad, cantidad)))
+        aperturas = np.concatenate(([precio_inicial], cierres[:-1]))
+        mechas = np.abs(generador.normal(0.0, volatilidad / 2, (2, cantidad))) * cierres
+        barras = np.zeros(cantidad, dtype=DTYPE_RATES)
+        barras['time'] = desde + paso * np.arange(cantidad)
+        barras['open'] = np.round(aperturas / punto) * punto
+        barras['close'] = np.round(cierres / punto) * punto
+        barras['high'] = np.maximum(barras['open'], barras['close']) + np.round(mechas[0] / punto) * punto
+        barras['low'] = np.minimum(barras['open'], barras['close']) - np.round(mechas[1] / punto) * punto
+        barras['tick_volume'] = generador.integers(10, 500, cantidad)
+        barras['spread'] = self.spread
+        return barras
+
+    def _precio(self, simbolo, tiempo_msc):
+        """
+        Precio bid sintético de un símbolo en un instante (milisegundos)
+
+        Returns:
+            Precio bid, o None si el símbolo no existe
+        """
+        barras = self._serie(simbolo, constantes.TIMEFRAME_M1)
+        if barras is None or len(barras) == 0:
+            return None
+        segundos = tiempo_msc // 1000
+        indice = int(np.searchsorted(barras['time'], segundos, side='right')) - 1
+        indice = min(max(indice, 0), len(barras) - 1)
+        barra = barras[indice]
+        fraccion = min(max((segundos - int(barra['time'])) / 60.0, 0.0), 1.0)
+        punto = self._punto(simbolo)
+        # Ruido determinista por instante para que los ticks se repitan igual
+        ruido = (zlib.crc32(f"{simbolo}{tiempo_msc}".encode()) % 7 - 3) * punto
+        precio = float(barra['open']) + (float(barra['close']) - float(barra['open'])) * fraccion + ruido
+        return round(precio / punto) * punto
+
+    def _tick(self, simbolo, tiempo_msc):
+        """
+        Construye un tick sintético
+        """
+        bid = self._precio(simbolo, tiempo_msc)
+        if bid is None:
+            return None
+        ask = bid + self.spread * self._punto(simbolo)
+        return Tick(tiempo_msc // 1000, bid, ask, 0.0, 0, tiempo_msc, 6, 0.0)
+
+    @staticmethod
+    def _segundos(fecha):
+        """
+        Convierte un datetime o una marca de tiempo a segundos
+        """
+        if isinstance(fecha, datetime):
+            return int(fecha.timestamp())
+        return int(fecha)
+
+    # --- Interfaz del paquete MetaTrader5 ---
+
+    def initialize(self, *args, **kwargs):
+        self._esperar()
+        self._inicializado = True
+        self._error = (1, 'Success')
+        return True
+
+    def login(self, *args, **kwargs):
+        self._esperar()
+        return self._disponible()
+
+    def shutdown(self):
+        self._inicializado = False
+        return True
+
+    def last_error(self):
+        return self._error
+
+    def version(self):
+        return (500, 4000, '01 Jan 2024')
+
+    def terminal_info(self):
+        self._esperar()
+        if not self._disponible():
+            return None
+        return TerminalInfo(True, True, int(self.latencia * 1e6), 4000, 'BackendSimulado')
+
+    def account_info(self):
+        self._esperar()
+        if not self._disponible():
+            return None
+        flotante = sum((posicion.profit for posicion in self.positions_get()), 0.0)
+        return AccountInfo(1000001, self.balance, self.balance + flotante, flotante, 0.0,
+                           self.balance + flotante, 'USD', 100, 'Simulado')
+
+    def symbols_total(self):
+        return len(self.simbolos)
+
+    def symbols_get(self, group=None):
+        self._esperar()
+        if not self._disponible():
+            return None
+        nombres = list(self.simbolos)
+        if group:
+            patrones = [patron.strip() for patron in group.split(',')]
+            nombres = [nombre for nombre in nombres
+                       if any(fnmatch.fnmatch(nombre, patron) for patron in patrones if not patron.startswith('!'))
+                       and not any(fnmatch.fnmatch(nombre, patron[1:]) for patron in patrones if patron.startswith('!'))]
+        return tuple(self._info_simbolo(nombre) for nombre in nombres)
+
+    def _info_simbolo(self, nombre):
+        """
+        Construye la información de un símbolo sintético
+        """
+        punto = self._punto(nombre)
+        return SymbolInfo(nombre, f"{nombre[:3]} vs {nombre[3:]}", f"Simulado\\{nombre}", nombre[:3], nombre[3:],
+                          punto, len(str(punto).split('.')[-1]), self.spread, self._tamano_contrato(nombre),
+                          0.01, 100.0, 0.01, True)
+
+    def symbol_info(self, symbol):
+        self._esperar()
+        if not self._disponible() or symbol not in self.simbolos:
+            return None
+        return self._info_simbolo(symbol)
+
+    def symbol_select(self, symbol, enable=True):
+        return symbol in self.simbolos
+
+    def symbol_info_tick(self, symbol):
+        self._esperar()
+        if not self._disponible():
+            return None
+        tiempo_msc = int(time.time() * 1000) // self.intervalo_ticks_ms * self.intervalo_ticks_ms
+        return self._tick(symbol, tiempo_msc)
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        self._esperar()
+        if not self._disponible():
+            return None
+        barras = self._serie(symbol, timeframe)
+        if barras is None:
+            return None
+        fin = len(barras) - start_pos
+        return barras[max(0, fin - count):max(0, fin)].copy()
+
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+        self._esperar()
+        if not self._disponible():
+            return None
+        barras = self._serie(symbol, timeframe)
+        if barras is None:
+            return None
+        fin = int(np.searchsorted(barras['time'], self._segundos(date_from), side='right'))
+        return barras[max(0, fin - count):fin].copy()
+
+    def copy_rates_range(self, symbol, timeframe, date_from, date_to):
+        self._esperar()
+        if not self._disponible():
+            return None
+        barras = self._serie(symbol, timeframe)
+        if barras is None:
+            return None
+        inicio = int(np.searchsorted(barras['time'], self._segundos(date_from), side='left'))
+        fin = int(np.searchsorted(barras['time'], self._segundos(date_to), side='right'))
+        return barras[inicio:fin].copy()
+
+    def copy_ticks_range(self, symbol, date_from, date_to, flags=constantes.COPY_TICKS_ALL):
+        self._esperar()
+        if not self._disponible() or symbol not in self.simbolos:
+            return None
+        paso = self.intervalo_ticks_ms
+        desde = -(-int(self._segundos(date_from) * 1000) // paso) * paso
+        hasta = min(int(self._segundos(date_to) * 1000), int(time.time() * 1000))
+        tiempos = range(desde, hasta + 1, paso)
+        ticks = np.zeros(len(tiempos), dtype=DTYPE_TICKS)
+        for i, tiempo_msc in enumerate(tiempos):
+            tick = self._tick(symbol, tiempo_msc)
+            ticks[i] = (tick.time, tick.bid, tick.ask, tick.last, tick.volume, tick.time_msc,
+                        tick.flags, tick.volume_real)
+        return ticks
+
+    def copy_ticks_from(self, symbol, date_from, count, flags=constantes.COPY_TICKS_ALL):
+        desde = date_from.timestamp() if isinstance(date_from, datetime) else date_from
+        hasta = desde + count * self.intervalo_ticks_ms / 1000.0
+        ticks = self.copy_ticks_range(symbol, desde, hasta, flags)
+        return None if ticks is None else ticks[:count]
+
+    def positions_total(self):
+        return len(self._posiciones)
+
+    def positions_get(self, symbol=None, ticket=None, group=None):
+        if not self._disponible():
+            return None
+        ahora = int(time.time() * 1000)
+        posiciones = []
+        with self._bloqueo:
+            for posicion in self._posiciones.values():
+                if symbol is not None and posicion.symbol != symbol:
+                    continue
+                if ticket is not None and posicion.ticket != ticket:
+                    continue
+                tick = self._tick(posicion.symbol, ahora)
+                if posicion.type == constantes.POSITION_TYPE_BUY:
+                    actual = tick.bid
+                    beneficio = (actual - posicion.price_open) * posicion.volume * self._tamano_contrato(posicion.symbol)
+                else:
+                    actual = tick.ask
+                    beneficio = (posicion.price_open - actual) * posicion.volume * self._tamano_contrato(posicion.symbol)
+                posiciones.append(posicion._replace(price_current=actual, profit=beneficio))
+        return tuple(posiciones)
+
+    def orders_get(self, *args, **kwargs):
+        return ()
+
+    def order_send(self, request):
+        self._esperar()
+        if not self._disponible():
+            return None
+        simbolo = request.get('symbol')
+        if simbolo not in self.simbolos:
+            self._error = (-2, f'Invalid symbol {simbolo}')
+            return None
+        tick = self._tick(simbolo, int(time.time() * 1000))
+        precio = tick.ask if request.get('type') == constantes.ORDER_TYPE_BUY else tick.bid
+
+        if self.probabilidad_recotizacion and self._aleatorio.random() < self.probabilidad_recotizacion:
+            return OrderSendResult(constantes.TRADE_RETCODE_REQUOTE, 0, 0, 0.0, 0.0, tick.bid, tick.ask,
+                                   'Requote', 0, request)
+
+        with self._bloqueo:
+            ticket = next(self._tickets)
+            accion = request.get('action', constantes.TRADE_ACTION_DEAL)
+            if accion == constantes.TRADE_ACTION_SLTP:
+                posicion = self._posiciones.get(request.get('position'))
+                if posicion is None:
+                    return OrderSendResult(10013, 0, 0, 0.0, 0.0, tick.bid, tick.ask, 'Invalid request', 0, request)
+                self._posiciones[posicion.ticket] = posicion._replace(sl=request.get('sl', 0.0), tp=request.get('tp', 0.0))
+                return OrderSendResult(constantes.TRADE_RETCODE_DONE, 0, ticket, 0.0, 0.0, tick.bid, tick.ask,
+                                       'Request executed', 0, request)
+
+            volumen = float(request.get('volume', 0.0))
+            if request.get('position'):
+                # Cierre de una posición existente
+                posicion = self._posiciones.pop(request['position'], None)
+                if posicion is None:
+                    return OrderSendResult(10013, 0, 0, 0.0, 0.0, tick.bid, tick.ask, 'Invalid request', 0, request)
+                signo = 1 if posicion.type == constantes.POSITION_TYPE_BUY else -1
+                self.balance += signo * (precio - posicion.price_open) * posicion.volume * self._tamano_contrato(simbolo)
+            else:
+                self._posiciones[ticket] = TradePosition(
+                    ticket, int(time.time()), request.get('type', constantes.ORDER_TYPE_BUY), volumen, precio,
+                    request.get('sl', 0.0), request.get('tp', 0.0), precio, 0.0, simbolo,
+                    request.get('comment', ''), request.get('magic', 0)
+                )
+            return OrderSendResult(constantes.TRADE_RETCODE_DONE, ticket, ticket, volumen, precio, tick.bid, tick.ask,
+                                   'Request executed', 0, request)
+
+
+# Exponer las constantes de MT5 como atributos, igual que el paquete real
+for _nombre in dir(constantes):
+    if _nombre.isupper():
+        setattr(BackendSimulado, _nombre, getattr(constantes, _nombre))
@@ -0,0 +1,194 @@
+import random
+import threading
+import time
+from collections import deque
+
+
+class SupervisorConexion:
+    """
+    Supervisa la conexión con el terminal: comprueba periódicamente su
+    estado (terminal_info y latencia de la consulta) y, si deja de responder,
+    reconecta con espera exponencial. Al reconectar el conector completa las
+    barras en caché desde su última marca de tiempo
+    """
+    def __init__(self, conector, intervalo=5.0, fallos_permitidos=2, espera_inicial=1.0,
+                 espera_maxima=60.0, factor=2.0, al_cambiar=None, muestras=1000):
+        """
+        Inicializa el supervisor
+
+        Args:
+            conector: Instancia de ConectorMT5 ya conectada
+            intervalo: Segundos entre comprobaciones mientras la conexión está activa
+            fallos_permitidos: Comprobaciones fallidas seguidas antes de reconectar
+            espera_inicial: Segundos antes del primer intento de reconexión
+            espera_maxima: Límite de la espera entre intentos
+            factor: Multiplicador de la espera tras cada intento fallido
+            al_cambiar: Función opcional llamada con (estado, mensaje) al perder
+                ('desconectado') o recuperar ('reconectado') la conexión
+            muestras: Mediciones de latencia conservadas para las estadísticas
+        """
+        self.conector = conector
+        self.intervalo = intervalo
+        self.fallos_permitidos = fallos_permitidos
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.factor = factor
+        self.al_cambiar = al_cambiar
+        self.reconexiones = 0
+        self.intentos_fallidos = 0
+        self.ultimo_error = None
+        self.ultima_salud = None
+        self._latencias = deque(maxlen=muestras)
+        self._fallos_seguidos = 0
+        self._espera = espera_inicial
+        self._aleatorio = random.Random()
+        self._inicio = None
+        self._conectado_desde = None
+        self._segundos_conectado = 0.0
+        self._bloqueo = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    @property
+    def conectado(self):
+        """
+        Indica si la conexión está activa según la última comprobación
+        """
+        return self._conectado_desde is not None
+
+    def iniciar(self):
+        """
+        Inicia el hilo de supervisión
+        """
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        ahora = time.monotonic()
+        self._inicio = self._inicio or ahora
+        if self.conector.conectado and self._conectado_desde is None:
+            self._conectado_desde = ahora
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="SupervisorConexion", daemon=True)
+        self._hilo.start()
+
+    def detener(self, espera=2.0):
+        """
+        Detiene el hilo de supervisión
+        """
+        self._detener.set()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(espera)
+        self._hilo = None
+        # El tiempo sin supervisión no cuenta como conectado
+        self._marcar(False)
+
+    def comprobar(self):
+        """
+        Realiza una comprobación de salud y actualiza el estado
+
+        Returns:
+            True si el terminal respondió correctamente
+        """
+        salud = self.conector.comprobar_salud()
+        self.ultima_salud = salud
+        if salud['conectado']:
+            self._latencias.append(salud['latencia_ms'])
+            self._fallos_seguidos = 0
+            return True
+        self._fallos_seguidos += 1
+        self.ultimo_error = salud['error']
+        return False
+
+    def reconectar(self):
+        """
+        Realiza un intento de reconexión y calcula la espera del siguiente
+
+        Returns:
+            True si la conexión se restableció
+        """
+        try:
+            restablecida = self.conector.reconectar()
+            if not restablecida:
+                self.ultimo_error = str(self.conector.mt5.last_error())
+        except Exception as e:
+            restablecida = False
+            self.ultimo_error = str(e)
+        if restablecida:
+            self.reconexiones += 1
+            self._fallos_seguidos = 0
+            self._espera = self.espera_inicial
+            self._marcar(True)
+            self._notificar('reconectado', f"Conexión con MT5 restablecida (reconexión {self.reconexiones})")
+        else:
+            self.intentos_fallidos += 1
+            self._espera = min(self.espera_maxima, self._espera * self.factor)
+        return restablecida
+
+    def _marcar(self, conectado):
+        """
+        Acumula el tiempo conectado al cambiar de estado
+        """
+        with self._bloqueo:
+            ahora = time.monotonic()
+            if conectado and self._conectado_desde is None:
+                self._conectado_desde = ahora
+            elif not conectado and self._conectado_desde is not None:
+                self._segundos_conectado += ahora - self._conectado_desde
+                self._conectado_desde = None
+
+    def _notificar(self, estado, mensaje):
+        """
+        Llama a al_cambiar sin dejar que un error detenga la supervisión
+        """
+        if self.al_cambiar is None:
+            return
+        try:
+            self.al_cambiar(estado, mensaje)
+        except Exception as e:
+            self.ultimo_error = f"Error en al_cambiar: {str(e)}"
+
+    def _bucle(self):
+        """
+        Bucle del hilo de supervisión
+        """
+        while not self._detener.is_set():
+            if self.conectado:
+                if not self.comprobar() and self._fallos_seguidos >= self.fallos_permitidos:
+                    self._marcar(False)
+                    self.conector.conectado = False
+                    self._espera = self.espera_inicial
+                    self._notificar('desconectado', f"Conexión con MT5 perdida: {self.ultimo_error}")
+                    continue
+                self._detener.wait(self.intervalo)
+            else:
+                # Espera con una pequeña variación para no sincronizar reintentos
+                espera = self._espera * (1 + 0.1 * self._aleatorio.random())
+                if self._detener.wait(espera):
+                    break
+                self.reconectar()
+
+    def estadisticas(self):
+        """
+        Obtiene el estado de la conexión
+
+        Returns:
+            Diccionario con conectado, segundos de la sesión actual, disponibilidad
+            (fracción del tiempo supervisado con conexión), reconexiones, intentos
+            fallidos, ping y latencia p50/máxima en milisegundos y último error
+        """
+        with self._bloqueo:
+            ahora = time.monotonic()
+            sesion = ahora - self._conectado_desde if self._conectado_desde is not None else 0.0
+            total = ahora - self._inicio if self._inicio is not None else 0.0
+            conectado_total = self._segundos_conectado + sesion
+        latencias = sorted(self._latencias)
+        return {
+            'conectado': self.conectado,
+            'segundos_conectado': sesion,
+            'disponibilidad': conectado_total / total if total > 0 else None,
+            'reconexiones': self.reconexiones,
+            'intentos_fallidos': self.intentos_fallidos,
+            'ping_ms': self.ultima_salud['ping_ms'] if self.ultima_salud else None,
+            'latencia_p50_ms': latencias[len(latencias) // 2] if latencias else None,
+            'latencia_max_ms': latencias[-1] if latencias else None,
+            'ultimo_error': self.ultimo_error,
+        }
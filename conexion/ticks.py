@@ -0,0 +1,388 @@
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from estrategias.base import Barra
+
+# Evento de tick: `recibido` es time.perf_counter() al leerlo del terminal
+EventoTick = namedtuple('EventoTick', ['simbolo', 'time_msc', 'bid', 'ask', 'recibido'])
+# Evento de barra construida a partir de ticks
+EventoBarra = namedtuple('EventoBarra', ['simbolo', 'barra', 'recibido'])
+
+
+class ConstructorBarras:
+    """
+    Construye barras OHLC de forma incremental a partir de ticks
+    """
+    def __init__(self, segundos=60):
+        """
+        Inicializa el constructor
+
+        Args:
+            segundos: Duración de cada barra en segundos
+        """
+        self.segundos = segundos
+        self._inicio = None
+        self._apertura = self._maximo = self._minimo = self._cierre = None
+
+    def actualizar(self, time_msc, precio):
+        """
+        Agrega un tick a la barra en formación
+
+        Args:
+            time_msc: Instante del tick en milisegundos
+            precio: Precio del tick (bid)
+
+        Returns:
+            La Barra que se acaba de cerrar, o None si el tick cae en la barra actual
+        """
+        inicio = time_msc // 1000 // self.segundos * self.segundos
+        cerrada = None
+        if self._inicio is None or inicio > self._inicio:
+            if self._inicio is not None:
+                cerrada = Barra(self._inicio, self._apertura, self._maximo, self._minimo, self._cierre)
+            self._inicio = inicio
+            self._apertura = self._maximo = self._minimo = self._cierre = precio
+            return cerrada
+        if precio > self._maximo:
+            self._maximo = precio
+        elif precio < self._minimo:
+            self._minimo = precio
+        self._cierre = precio
+        return None
+
+    def barra_actual(self):
+        """
+        Obtiene la barra en formación, o None si aún no hay ticks
+        """
+        if self._inicio is None:
+            return None
+        return Barra(self._inicio, self._apertura, self._maximo, self._minimo, self._cierre)
+
+
+class Suscripcion:
+    """
+    Suscripción a los eventos del flujo de ticks. Cada suscriptor tiene su
+    propia cola SimpleQueue (sin bloqueos explícitos en la inserción), así
+    que un consumidor lento no frena al hilo de lectura ni a los demás
+    """
+    def __init__(self, flujo, simbolos=None):
+        """
+        Inicializa la suscripción
+
+        Args:
+            flujo: FlujoTicks al que pertenece
+            simbolos: Símbolos de interés (None para todos)
+        """
+        self.flujo = flujo
+        self.simbolos = set(simbolos) if simbolos else None
+        self.cola = queue.SimpleQueue()
+
+    def acepta(self, simbolo):
+        """
+        Indica si la suscripción recibe eventos del símbolo
+        """
+        return self.simbolos is None or simbolo in self.simbolos
+
+    def obtener(self, espera=None):
+        """
+        Obtiene el siguiente evento
+
+        Args:
+            espera: Segundos máximos de espera (None para esperar indefinidamente)
+
+        Returns:
+            EventoTick o EventoBarra, o None si se agotó la espera
+        """
+        try:
+            return self.cola.get(timeout=espera)
+        except queue.Empty:
+            return None
+
+    def despachar(self, funcion, espera=0.1):
+        """
+        Procesa el siguiente evento con una función y registra la latencia
+        desde que el tick se leyó del terminal hasta que la función terminó
+
+        Args:
+            funcion: Función que recibe el evento
+            espera: Segundos máximos de espera por un evento
+
+        Returns:
+            True si se procesó un evento
+        """
+        evento = self.obtener(espera)
+        if evento is None:
+            return False
+        funcion(evento)
+        self.flujo.registrar_latencia(time.perf_counter() - evento.recibido)
+        return True
+
+
+class FlujoTicks:
+    """
+    Flujo de ticks en tiempo real: consulta en un único hilo los ticks de
+    todos los símbolos suscritos, descarta los ya entregados, construye
+    barras y reparte los eventos entre los suscriptores
+    """
+    def __init__(self, conector, intervalo=0.05, segundos_barra=60, ticks_por_consulta=1000, muestras_latencia=10000,
+                 al_error=None):
+        """
+        Inicializa el flujo
+
+        Args:
+            conector: Instancia de ConectorMT5
+            intervalo: Segundos entre consultas al terminal
+            segundos_barra: Duración de las barras construidas a partir de ticks
+            ticks_por_consulta: Máximo de ticks pedidos por símbolo en cada consulta
+            muestras_latencia: Muestras de latencia conservadas para las estadísticas
+            al_error: Función opcional llamada con (simbolo, excepción) cuando un
+                símbolo empieza a fallar; los demás símbolos siguen consultándose
+        """
+        self.conector = conector
+        self.intervalo = intervalo
+        self.segundos_barra = segundos_barra
+        self.ticks_por_consulta = ticks_por_consulta
+        self._simbolos = {}
+        self._suscripciones = []
+        self._latencias = deque(maxlen=muestras_latencia)
+        self._bloqueo = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._hilos_estrategias = []
+        self.al_error = al_error
+        self.ticks_recibidos = 0
+        self.errores = 0
+        self.ultimo_error = None
+
+    def agregar_simbolo(self, simbolo):
+        """
+        Empieza a seguir los ticks de un símbolo
+        """
+        with self._bloqueo:
+            if simbolo not in self._simbolos:
+                # Último time_msc visto, ticks ya entregados con ese time_msc,
+                # constructor de barras y error de la consulta anterior
+                self._simbolos[simbolo] = [None, 0, ConstructorBarras(self.segundos_barra), None]
+
+    def quitar_simbolo(self, simbolo):
+        """
+        Deja de seguir los ticks de un símbolo
+        """
+        with self._bloqueo:
+            self._simbolos.pop(simbolo, None)
+
+    def suscribir(self, simbolos=None):
+        """
+        Crea una suscripción a los eventos del flujo
+
+        Args:
+            simbolos: Símbolos de interés (None para todos). Se agregan al flujo si no estaban
+
+        Returns:
+            Suscripcion
+        """
+        for simbolo in simbolos or ():
+            self.agregar_simbolo(simbolo)
+        suscripcion = Suscripcion(self, simbolos)
+        with self._bloqueo:
+            self._suscripciones = self._suscripciones + [suscripcion]
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        """
+        Elimina una suscripción
+        """
+        with self._bloqueo:
+            self._suscripciones = [s for s in self._suscripciones if s is not suscripcion]
+
+    def conectar_estrategia(self, estrategia):
+        """
+        Suscribe una estrategia a su símbolo: cada tick llama a en_tick y cada
+        barra cerrada a en_barra, desde un hilo propio de la estrategia
+
+        Args:
+            estrategia: Instancia de EstrategiaBase
+
+        Returns:
+            Suscripcion creada
+        """
+        def procesar(evento):
+            if isinstance(evento, EventoTick):
+                estrategia.en_tick(evento)
+            else:
+                estrategia.en_barra(evento.barra)
+
+        return self.conectar(procesar, [estrategia.par_divisas], f"Ticks-{estrategia.__class__.__name__}",
+                             lambda: estrategia.activo,
+                             lambda e: estrategia.registrar_mensaje(f"Error al procesar tick: {str(e)}"))
+
+    def conectar(self, funcion, simbolos=None, nombre="Ticks", continuar=None, al_error=None):
+        """
+        Suscribe una función a los eventos del flujo y la llama desde un hilo
+        propio con cada evento (ej: MotorRiesgo.en_tick)
+
+        Args:
+            funcion: Función que recibe cada EventoTick o EventoBarra
+            simbolos: Símbolos de interés (None para todos)
+            nombre: Nombre del hilo
+            continuar: Función opcional; el hilo termina cuando devuelve False
+            al_error: Función opcional llamada con la excepción si `funcion` falla
+
+        Returns:
+            Suscripcion creada
+        """
+        suscripcion = self.suscribir(simbolos)
+
+        def bucle():
+            while not self._detener.is_set() and (continuar is None or continuar()):
+                try:
+                    suscripcion.despachar(funcion)
+                except Exception as e:
+                    if al_error is not None:
+                        al_error(e)
+            self.cancelar(suscripcion)
+
+        hilo = threading.Thread(target=bucle, name=nombre, daemon=True)
+        self._hilos_estrategias.append(hilo)
+        hilo.start()
+        return suscripcion
+
+    def registrar_latencia(self, segundos):
+        """
+        Registra una muestra de latencia tick → señal
+        """
+        self._latencias.append(segundos)
+
+    def estadisticas_latencia(self):
+        """
+        Calcula las estadísticas de latencia desde la lectura del tick hasta
+        que el suscriptor terminó de procesarlo
+
+        Returns:
+            Diccionario con muestras, p50, p99 y máximo en milisegundos
+        """
+        muestras = sorted(self._latencias)
+        if not muestras:
+            return {'muestras': 0, 'p50_ms': None, 'p99_ms': None, 'max_ms': None}
+        return {
+            'muestras': len(muestras),
+            'p50_ms': muestras[len(muestras) // 2] * 1000,
+            'p99_ms': muestras[min(len(muestras) - 1, int(len(muestras) * 0.99))] * 1000,
+            'max_ms': muestras[-1] * 1000,
+        }
+
+    def iniciar(self):
+        """
+        Inicia el hilo de lectura de ticks
+        """
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="FlujoTicks", daemon=True)
+        self._hilo.start()
+
+    def detener(self, espera=2.0):
+        """
+        Detiene el hilo de lectura y los hilos de las estrategias conectadas
+        """
+        self._detener.set()
+        for hilo in [self._hilo] + self._hilos_estrategias:
+            if hilo is not None and hilo is not threading.current_thread():
+                hilo.join(espera)
+        self._hilo = None
+        self._hilos_estrategias = []
+
+    def consultar(self):
+        """
+        Lee los ticks nuevos de todos los símbolos y los reparte. Un símbolo
+        que falla (retirado, fuera de la observación de mercado) no impide
+        consultar los demás
+
+        Returns:
+            Número de ticks nuevos procesados
+        """
+        with self._bloqueo:
+            simbolos = list(self._simbolos.items())
+        total = 0
+        for simbolo, estado in simbolos:
+            try:
+                total += self._consultar_simbolo(simbolo, estado)
+            except Exception as e:
+                self.errores += 1
+                self.ultimo_error = e
+                # Avisar solo cuando el símbolo empieza a fallar, no en cada consulta
+                if estado[3] is None and self.al_error is not None:
+                    self.al_error(simbolo, e)
+                estado[3] = e
+            else:
+                estado[3] = None
+        self.ticks_recibidos += total
+        return total
+
+    def _consultar_simbolo(self, simbolo, estado):
+        """
+        Lee y reparte los ticks nuevos de un símbolo. Varios ticks pueden
+        compartir time_msc, así que los ya entregados se descartan por
+        (time_msc, posición dentro de ese milisegundo) y no solo por tiempo
+
+        Returns:
+            Número de ticks nuevos
+        """
+        ultimo_msc, vistos, constructor, _ = estado
+        if ultimo_msc is None:
+            # Primera consulta: empezar desde el tick actual sin reproducir historial
+            tick = self.conector.obtener_ultimo_tick(simbolo)
+            ticks = [(tick.time_msc, tick.bid, tick.ask)]
+        else:
+            datos = self.conector.obtener_ticks(simbolo, ultimo_msc, self.ticks_por_consulta)
+            ticks = zip(datos['time_msc'].tolist(), datos['bid'].tolist(), datos['ask'].tolist())
+
+        recibido = time.perf_counter()
+        nuevos = 0
+        # Ticks de esta consulta con el mismo time_msc que el último entregado
+        repetidos = 0
+        for time_msc, bid, ask in ticks:
+            if ultimo_msc is not None:
+                if time_msc < ultimo_msc:
+                    continue
+                if time_msc == ultimo_msc:
+                    repetidos += 1
+                    if repetidos <= vistos:
+                        continue
+                    vistos += 1
+                else:
+                    ultimo_msc = time_msc
+                    vistos = repetidos = 1
+            else:
+                ultimo_msc = time_msc
+                vistos = repetidos = 1
+            nuevos += 1
+            self._publicar(simbolo, EventoTick(simbolo, time_msc, bid, ask, recibido))
+            barra = constructor.actualizar(time_msc, bid)
+            if barra is not None:
+                self._publicar(simbolo, EventoBarra(simbolo, barra, recibido))
+        estado[0] = ultimo_msc
+        estado[1] = vistos
+        return nuevos
+
+    def _publicar(self, simbolo, evento):
+        """
+        Entrega un evento a todas las suscripciones interesadas
+        """
+        for suscripcion in self._suscripciones:
+            if suscripcion.acepta(simbolo):
+                suscripcion.cola.put(evento)
+
+    def _bucle(self):
+        """
+        Bucle del hilo de lectura
+        """
+        while not self._detener.is_set():
+            inicio = time.monotonic()
+            try:
+                self.consultar()
+            except Exception as e:
+                # Un fallo puntual del terminal no debe detener el flujo
+                self.ultimo_error = e
+            self._detener.wait(max(0.0, self.intervalo - (time.monotonic() - inicio)))
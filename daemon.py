@@ -0,0 +1,428 @@
+import importlib
+import json
+import logging
+import logging.handlers
+import queue
+import signal
+import threading
+import time
+from conexion.backend import cargar_backend
+from conexion.grabador import BackendGrabador, BackendReproduccion
+from conexion.mt5 import ConectorMT5
+from conexion.ordenes import GestorOrdenes
+from conexion.remuestreo import GestorRemuestreo
+from conexion.riesgo import MotorRiesgo
+from conexion.supervisor import SupervisorConexion
+from conexion.ticks import FlujoTicks
+from estrategias.ejecutor import EjecutorMultiSimbolo
+from estrategias.registro import RegistroEstrategias
+from indicadores.nucleos import usar_nucleos
+from metricas import METRICAS, PerfiladorMuestreo
+
+# Configuración por defecto del modo headless
+CONFIGURACION_POR_DEFECTO = {
+    'backend': 'mt5',
+    'conexion': {'par_divisas': 'EURUSD'},
+    'estrategias': [],
+    'intervalo': 1.0,
+    'numero_barras': 1000,
+    'registro': {'archivo': 'bot.log', 'nivel': 'INFO'},
+    'estado': {'archivo': 'estado.json', 'intervalo': 10.0},
+    'supervisor': {'intervalo': 5.0, 'fallos_permitidos': 2, 'espera_maxima': 60.0},
+    'metricas': {'archivo': None, 'puerto': None, 'perfilador': False, 'pilas': 'perfil.txt'},
+    'grabacion': {'archivo': None},
+    'reproduccion': {'archivo': None, 'velocidad': None},
+    'remuestreo': {'periodos': []},
+    'nucleos': 'numpy',
+    'riesgo': {},
+    'ticks': {'intervalo': 0.05},
+    'ordenes': {'asincronas': False},
+}
+
+
+def cargar_configuracion(ruta):
+    """
+    Carga el archivo JSON de configuración y completa los valores por defecto
+
+    Ejemplo:
+        {
+            "backend": "mt5",
+            "conexion": {"par_divisas": "EURUSD", "periodo_tiempo": 1, "almacen": "datos"},
+            "estrategias": [
+                {"clase": "Cruce de Medias", "par_divisas": "GBPUSD",
+                 "parametros": {"periodo_rapido": 10}},
+                {"clase": "mi_paquete.estrategias:MiEstrategia"}
+            ],
+            "intervalo": 1.0,
+            "numero_barras": 500,
+            "registro": {"archivo": "bot.log"},
+            "estado": {"archivo": "estado.json", "intervalo": 10},
+            "supervisor": {"intervalo": 5, "fallos_permitidos": 2, "espera_maxima": 60},
+            "metricas": {"archivo": "metricas.prom", "puerto": 9108, "perfilador": false},
+            "grabacion": {"archivo": "sesion.grab"},
+            "remuestreo": {"periodos": [5, 16385]},
+            "nucleos": "auto",
+            "riesgo": {"max_volumen_orden": 1.0, "max_posiciones": 5, "max_perdida_diaria": 500,
+                       "max_drawdown": 0.1, "max_exposicion_divisa": {"USD": 500000}},
+            "ticks": {"intervalo": 0.05},
+            "ordenes": {"asincronas": true, "max_reintentos": 3}
+        }
+
+    Con "grabacion" se graban todas las respuestas del terminal. Con el
+    backend "reproduccion" se reproduce el archivo indicado en
+    "reproduccion" ({"archivo": ..., "velocidad": null o 1.0 para el ritmo original}).
+
+    Los periodos de "remuestreo" (constantes TIMEFRAME_*) se construyen a
+    partir de las barras M1, con una sola consulta al terminal por símbolo.
+    "nucleos" selecciona los núcleos de cálculo de los indicadores ('numpy',
+    'numba' o 'auto' para usar numba si está instalado).
+
+    Con límites en "riesgo" (argumentos de MotorRiesgo) cada orden se
+    comprueba antes de enviarla; el beneficio flotante se actualiza con los
+    ticks de los símbolos de las estrategias (FlujoTicks, con las opciones de
+    "ticks") y el estado de riesgo se resincroniza con el terminal al
+    conectar, al reconectar y junto con el estado.
+
+    Con "ordenes" {"asincronas": true} las estrategias envían sus órdenes
+    a un GestorOrdenes (el resto de claves son sus argumentos) en lugar de
+    esperar a order_send en su propio hilo.
+
+    Las métricas se escriben junto con el estado (en JSON si el archivo
+    termina en .json) y, si se indica un puerto, se publican por HTTP en
+    /metrics. El perfilador por muestreo también se activa o desactiva en
+    marcha con SIGUSR1; al desactivarlo se escriben las pilas en "pilas"
+
+    Args:
+        ruta: Ruta del archivo de configuración
+
+    Returns:
+        Diccionario con la configuración
+    """
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        configuracion = json.load(archivo)
+    for clave, valor in CONFIGURACION_POR_DEFECTO.items():
+        if isinstance(valor, dict):
+            configuracion[clave] = {**valor, **configuracion.get(clave, {})}
+        else:
+            configuracion.setdefault(clave, valor)
+    return configuracion
+
+
+def importar_clase(ruta):
+    """
+    Importa una clase a partir de una ruta "modulo:Clase"
+
+    Raises:
+        ValueError: Si la ruta no tiene el formato esperado
+    """
+    if ':' not in ruta:
+        raise ValueError(f"La clase debe indicarse como 'modulo:Clase': {ruta}")
+    modulo, nombre = ruta.split(':', 1)
+    return getattr(importlib.import_module(modulo), nombre)
+
+
+class BotHeadless:
+    """
+    Ejecuta el bot sin interfaz gráfica: conecta con MT5, lanza las
+    estrategias configuradas con EjecutorMultiSimbolo, envía los mensajes
+    al registro y publica periódicamente el estado en un archivo JSON
+    """
+    def __init__(self, configuracion, backend=None):
+        """
+        Inicializa el bot
+
+        Args:
+            configuracion: Diccionario devuelto por cargar_configuracion
+            backend: Backend del conector; sustituye al de la configuración si se indica
+        """
+        self.configuracion = configuracion
+        self.logger = self._configurar_registro(configuracion['registro'])
+        self.logger.info(f"Núcleos de los indicadores: {usar_nucleos(configuracion['nucleos'])}")
+
+        opciones = dict(configuracion['conexion'])
+        ruta_almacen = opciones.pop('almacen', None)
+        if ruta_almacen:
+            from conexion.almacen import AlmacenBarras
+            opciones['almacen'] = AlmacenBarras(ruta_almacen)
+        self.grabador = self.reproduccion = None
+        backend = backend or configuracion['backend']
+        if backend == 'reproduccion':
+            backend = self.reproduccion = BackendReproduccion(configuracion['reproduccion']['archivo'],
+                                          configuracion['reproduccion'].get('velocidad'))
+        if configuracion['grabacion'].get('archivo'):
+            backend = self.grabador = BackendGrabador(cargar_backend(backend), configuracion['grabacion']['archivo'])
+        self.conector = ConectorMT5(backend=backend, **opciones)
+        self.riesgo = None
+        if configuracion['riesgo']:
+            self.riesgo = self.conector.riesgo = MotorRiesgo(al_bloquear=self._bloqueo_riesgo,
+                                                             **configuracion['riesgo'])
+
+        self.cola_eventos = queue.Queue()
+        self.registro_estrategias = RegistroEstrategias()
+        self.estrategias = [self._crear_estrategia(e) for e in configuracion['estrategias']]
+        self.remuestreo = None
+        if configuracion['remuestreo'].get('periodos'):
+            self.remuestreo = GestorRemuestreo(self.conector, configuracion['remuestreo']['periodos'],
+                                               configuracion['numero_barras'])
+        self.ejecutor = EjecutorMultiSimbolo(
+            self.conector, self.estrategias, configuracion['intervalo'], self.cola_eventos,
+            configuracion['numero_barras'], remuestreo=self.remuestreo
+        )
+        self.ordenes = None
+        opciones_ordenes = dict(configuracion['ordenes'])
+        if opciones_ordenes.pop('asincronas', False):
+            self.ordenes = GestorOrdenes(self.conector, al_terminar=self._orden_terminada, **opciones_ordenes)
+            for estrategia in self.estrategias:
+                estrategia.gestor_ordenes = self.ordenes
+        self.ticks = None
+        if self.riesgo is not None:
+            self.ticks = FlujoTicks(self.conector, al_error=self._error_ticks, **configuracion['ticks'])
+        self.supervisor = SupervisorConexion(
+            self.conector, al_cambiar=self._cambio_conexion, **configuracion['supervisor'])
+        self.perfilador = PerfiladorMuestreo()
+        self._detener = threading.Event()
+        self.inicio = None
+
+    def _configurar_registro(self, opciones):
+        """
+        Configura el registro en consola y en archivo rotativo
+        """
+        logger = logging.getLogger("bot_mt5")
+        logger.setLevel(opciones.get('nivel', 'INFO'))
+        formato = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+        consola = logging.StreamHandler()
+        consola.setFormatter(formato)
+        logger.addHandler(consola)
+        if opciones.get('archivo'):
+            archivo = logging.handlers.RotatingFileHandler(
+                opciones['archivo'], maxBytes=5 * 1024 * 1024, backupCount=3, encoding='utf-8')
+            archivo.setFormatter(formato)
+            logger.addHandler(archivo)
+        return logger
+
+    def _cambio_conexion(self, estado, mensaje):
+        """
+        Registra las pérdidas y recuperaciones de la conexión
+        """
+        if estado == 'desconectado':
+            self.logger.warning(mensaje)
+        else:
+            self.logger.info(mensaje)
+            self.sincronizar_riesgo()
+
+    def _bloqueo_riesgo(self, motivo):
+        """
+        Registra el bloqueo de la operativa por el motor de riesgo
+        """
+        self.logger.warning(f"Operativa bloqueada por el motor de riesgo: {motivo}")
+
+    def _orden_terminada(self, orden):
+        """
+        Registra el resultado de cada orden del gestor de órdenes
+        """
+        if orden.estado == 'ejecutada':
+            self.logger.info(f"Orden {orden.id} ({orden.tipo}) ejecutada: ticket {orden.ticket}, "
+                             f"latencia {orden.latencia * 1000:.1f} ms, intentos {orden.intentos}")
+        else:
+            self.logger.warning(f"Orden {orden.id} ({orden.tipo}) {orden.estado}: {orden.error}")
+
+    def _error_ticks(self, simbolo, error):
+        """
+        Registra que un símbolo del flujo de ticks ha empezado a fallar
+        """
+        self.logger.warning(f"Error al leer los ticks de {simbolo}: {str(error)}")
+
+    def sincronizar_riesgo(self):
+        """
+        Sincroniza el motor de riesgo con la cuenta y las posiciones del terminal
+        """
+        if self.riesgo is None:
+            return
+        try:
+            self.riesgo.sincronizar(self.conector, {estrategia.par_divisas for estrategia in self.estrategias})
+        except Exception as e:
+            self.logger.error(f"Error al sincronizar el motor de riesgo: {str(e)}")
+
+    def _crear_estrategia(self, opciones):
+        """
+        Crea una estrategia a partir de su entrada en la configuración. La
+        clase se indica por su nombre en el registro de estrategias o como
+        ruta "modulo:Clase"
+        """
+        par_divisas = opciones.get('par_divisas')
+        periodo_tiempo = opciones.get('periodo_tiempo')
+        parametros = opciones.get('parametros', {})
+        if ':' in opciones['clase']:
+            clase = importar_clase(opciones['clase'])
+            return clase(self.conector, par_divisas, periodo_tiempo, **parametros)
+        return self.registro_estrategias.crear(opciones['clase'], self.conector, par_divisas,
+                                               periodo_tiempo, **parametros)
+
+    def estado(self):
+        """
+        Obtiene el estado actual del bot
+
+        Returns:
+            Diccionario con conexión, tiempo activo, ciclos, estrategias y cuenta
+        """
+        estado = {
+            'conectado': self.conector.conectado,
+            'segundos_activo': time.monotonic() - self.inicio if self.inicio else 0.0,
+            'ciclos': self.ejecutor.ciclos,
+            'conexion': self.supervisor.estadisticas(),
+            'riesgo': self.riesgo.estadisticas() if self.riesgo is not None else None,
+            'ordenes': self.ordenes.estadisticas() if self.ordenes is not None else None,
+            'ticks': ({'recibidos': self.ticks.ticks_recibidos, 'errores': self.ticks.errores,
+                       **self.ticks.estadisticas_latencia()} if self.ticks is not None else None),
+            'estrategias': [
+                {'clase': e.__class__.__name__, 'par_divisas': e.par_divisas, 'activo': e.activo}
+                for e in self.estrategias
+            ],
+        }
+        try:
+            info = self.conector.obtener_info_cuenta()
+            estado['cuenta'] = {'login': info.login, 'balance': info.balance, 'equity': info.equity}
+        except Exception as e:
+            estado['cuenta'] = {'error': str(e)}
+        return estado
+
+    def publicar_estado(self):
+        """
+        Escribe el estado en el archivo configurado
+        """
+        ruta = self.configuracion['estado'].get('archivo')
+        if not ruta:
+            return
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(self.estado(), archivo, indent=2)
+
+    def publicar_metricas(self):
+        """
+        Escribe las métricas en el archivo configurado
+        """
+        ruta = self.configuracion['metricas'].get('archivo')
+        if ruta:
+            METRICAS.escribir(ruta)
+
+    def alternar_perfilador(self, *args):
+        """
+        Activa o desactiva el perfilador por muestreo (también se usa como
+        manejador de SIGUSR1). Al desactivarlo registra las funciones con más
+        muestras y escribe las pilas en formato colapsado
+        """
+        if not self.perfilador.activo:
+            self.perfilador.reiniciar()
+            self.perfilador.iniciar()
+            self.logger.info("Perfilador por muestreo activado")
+            return
+        self.perfilador.detener()
+        for fila in self.perfilador.resultados(10):
+            self.logger.info(f"Perfil: {fila['funcion']} propias={fila['propias']} acumuladas={fila['acumuladas']}")
+        ruta = self.configuracion['metricas'].get('pilas')
+        if ruta:
+            self.perfilador.escribir_pilas(ruta)
+            self.logger.info(f"Pilas del perfilador escritas en {ruta}")
+
+    def detener(self, *args):
+        """
+        Solicita la parada del bot (también se usa como manejador de señales)
+        """
+        self._detener.set()
+
+    def ejecutar(self):
+        """
+        Conecta, inicia las estrategias y procesa eventos hasta que se pide la parada
+
+        Returns:
+            Código de salida del proceso
+        """
+        if not self.estrategias:
+            self.logger.error("La configuración no define ninguna estrategia")
+            return 1
+        try:
+            self.conector.conectar()
+        except Exception as e:
+            self.logger.error(f"Error al conectar: {str(e)}")
+            return 1
+        self.logger.info("Conectado a MetaTrader 5")
+        self.sincronizar_riesgo()
+
+        opciones_metricas = self.configuracion['metricas']
+        if opciones_metricas.get('puerto') is not None:
+            puerto = METRICAS.servir(opciones_metricas['puerto'])
+            self.logger.info(f"Métricas disponibles en http://127.0.0.1:{puerto}/metrics")
+        if opciones_metricas.get('perfilador'):
+            self.alternar_perfilador()
+
+        self.inicio = time.monotonic()
+        self.supervisor.iniciar()
+        if self.ordenes is not None:
+            self.ordenes.iniciar()
+        if self.ticks is not None:
+            # El motor de riesgo revalora las posiciones con cada tick
+            self.ticks.conectar(self.riesgo.en_tick, {e.par_divisas for e in self.estrategias}, "Ticks-Riesgo",
+                                al_error=lambda e: self.logger.error(f"Error al procesar tick: {str(e)}"))
+            self.ticks.iniciar()
+        self.ejecutor.iniciar()
+        intervalo_estado = self.configuracion['estado'].get('intervalo', 10.0)
+        proximo_estado = time.monotonic()
+        try:
+            while not self._detener.is_set():
+                try:
+                    tipo, datos = self.cola_eventos.get(timeout=0.5)
+                    if tipo == 'mensaje':
+                        self.logger.info(datos)
+                    elif tipo == 'estadisticas':
+                        self.logger.info(f"Ganancias: {datos[0]:.2f} Pérdidas: {datos[1]:.2f}")
+                    elif tipo == 'detenido':
+                        self.logger.info("Todas las estrategias se han detenido")
+                        break
+                except queue.Empty:
+                    pass
+                if self.reproduccion is not None and self.reproduccion.agotada:
+                    self.logger.info("Reproducción terminada")
+                    break
+                if time.monotonic() >= proximo_estado:
+                    self.sincronizar_riesgo()
+                    self.publicar_estado()
+                    self.publicar_metricas()
+                    proximo_estado = time.monotonic() + intervalo_estado
+        finally:
+            self.ejecutor.detener()
+            if self.ordenes is not None:
+                # Envía las órdenes ya encoladas antes de desconectar
+                self.ordenes.detener()
+            if self.ticks is not None:
+                self.ticks.detener()
+            self.supervisor.detener()
+            if self.perfilador.activo:
+                self.alternar_perfilador()
+            self.publicar_estado()
+            self.publicar_metricas()
+            METRICAS.detener_servidor()
+            self.conector.desconectar()
+            if self.grabador is not None:
+                self.grabador.cerrar()
+                self.logger.info(f"Grabación: {self.grabador.registros} registros, "
+                                 f"{self.grabador.bytes_escritos} bytes en {self.grabador.ruta}")
+            self.logger.info("Bot detenido")
+        return 0
+
+
+def ejecutar_headless(ruta_configuracion, backend=None):
+    """
+    Ejecuta el bot en modo headless hasta recibir SIGINT/SIGTERM
+
+    Args:
+        ruta_configuracion: Archivo JSON de configuración
+        backend: Backend del conector (opcional)
+
+    Returns:
+        Código de salida del proceso
+    """
+    bot = BotHeadless(cargar_configuracion(ruta_configuracion), backend)
+    signal.signal(signal.SIGINT, bot.detener)
+    signal.signal(signal.SIGTERM, bot.detener)
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, bot.alternar_perfilador)
+    return bot.ejecutar()
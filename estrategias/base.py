@@ -1,30 +1,172 @@
+from collections import namedtuple
+from conexion.ordenes import Orden
+
+# Barra entregada a las estrategias en cada cierre (mismos campos que MT5)
+Barra = namedtuple('Barra', ['time', 'open', 'high', 'low', 'close'])
+
 class EstrategiaBase:
     """
     Clase base para todas las estrategias de trading
     """
-    def __init__(self, conector):
+    # Nombre con el que aparece en el registro de estrategias
+    NOMBRE = 'Estrategia Base'
+    
+    def __init__(self, conector, par_divisas=None, periodo_tiempo=None):
         """
         Inicializa la estrategia
         
         Args:
             conector: Instancia del conector MT5
+            par_divisas: Símbolo que opera la estrategia (por defecto el del conector)
+            periodo_tiempo: Periodo de las barras (por defecto el del conector)
         """
         self.conector = conector
+        self.par_divisas = par_divisas or getattr(conector, 'par_divisas', None)
+        self.periodo_tiempo = periodo_tiempo or getattr(conector, 'periodo_tiempo', None)
         self.activo = False
+        # Últimos datos históricos recibidos del ejecutor
+        self.datos = None
+        self.ultima_barra = None
+        # Cola opcional por la que se envían eventos a la interfaz
+        self.cola_eventos = None
+        # Gestor de órdenes asíncrono opcional (ver GestorOrdenes)
+        self.gestor_ordenes = None
 
     def iniciar(self):
         """
         Inicia la ejecución de la estrategia
         """
         self.activo = True
-        print(f"Iniciando estrategia: {self.__class__.__name__}")
+        self.registrar_mensaje(f"Iniciando estrategia: {self.__class__.__name__}")
 
     def detener(self):
         """
         Detiene la ejecución de la estrategia
         """
         self.activo = False
-        print(f"Deteniendo estrategia: {self.__class__.__name__}")
+        self.registrar_mensaje(f"Deteniendo estrategia: {self.__class__.__name__}")
+
+    def actualizar_datos(self, datos):
+        """
+        Recibe los datos históricos más recientes de su símbolo
+        
+        Args:
+            datos: Barras con los datos históricos (las columnas pueden ser vistas
+                de la caché del conector, válidas hasta el siguiente ciclo)
+        """
+        self.datos = datos
+
+    def en_barra(self, barra):
+        """
+        Se llama en cada cierre de barra (por ejemplo durante un backtest).
+        Por defecto guarda la barra y ejecuta la lógica de la estrategia;
+        las estrategias pueden sobrescribirlo para usar indicadores incrementales
+        
+        Args:
+            barra: Barra (time, open, high, low, close) recién cerrada
+        """
+        self.ultima_barra = barra
+        self.ejecutar()
+
+    def en_tick(self, evento):
+        """
+        Se llama con cada tick nuevo de los símbolos suscritos (ver FlujoTicks).
+        Por defecto no hace nada
+        
+        Args:
+            evento: EventoTick con símbolo, tiempo, bid y ask
+        """
+        pass
+
+    def comprar(self, volumen, sl=None, tp=None, comentario=""):
+        """
+        Abre una posición de compra en el símbolo de la estrategia
+        
+        Args:
+            volumen: Volumen en lotes
+            sl: Precio de stop loss (opcional)
+            tp: Precio de take profit (opcional)
+            comentario: Comentario de la orden
+            
+        Returns:
+            Orden de la apertura: en curso si hay gestor de órdenes, o ya
+            ejecutada (con su ticket) si se envía de forma síncrona
+        """
+        if self.gestor_ordenes is not None:
+            return self.gestor_ordenes.enviar('compra', volumen, self.par_divisas, sl, tp, comentario)
+        ticket = self.conector.abrir_posicion('compra', volumen, self.par_divisas, sl, tp, comentario)
+        return Orden.sincrona('compra', volumen, self.par_divisas, ticket)
+
+    def vender(self, volumen, sl=None, tp=None, comentario=""):
+        """
+        Abre una posición de venta en el símbolo de la estrategia
+        
+        Args:
+            volumen: Volumen en lotes
+            sl: Precio de stop loss (opcional)
+            tp: Precio de take profit (opcional)
+            comentario: Comentario de la orden
+            
+        Returns:
+            Orden de la apertura: en curso si hay gestor de órdenes, o ya
+            ejecutada (con su ticket) si se envía de forma síncrona
+        """
+        if self.gestor_ordenes is not None:
+            return self.gestor_ordenes.enviar('venta', volumen, self.par_divisas, sl, tp, comentario)
+        ticket = self.conector.abrir_posicion('venta', volumen, self.par_divisas, sl, tp, comentario)
+        return Orden.sincrona('venta', volumen, self.par_divisas, ticket)
+
+    def cerrar_posicion(self, ticket):
+        """
+        Cierra una posición abierta
+        
+        Args:
+            ticket: Ticket de la posición, o la Orden devuelta por comprar/vender
+            
+        Returns:
+            Orden del cierre: en curso si hay gestor de órdenes, o ya ejecutada
+            (con el valor devuelto por el conector en resultado)
+            
+        Raises:
+            ValueError: Si la orden indicada no abrió ninguna posición (modo síncrono)
+        """
+        if self.gestor_ordenes is not None:
+            return self.gestor_ordenes.cerrar(ticket)
+        if isinstance(ticket, Orden):
+            if ticket.estado != 'ejecutada' or ticket.ticket is None:
+                raise ValueError(f"La orden no abrió ninguna posición ({ticket.estado})")
+            ticket = ticket.ticket
+        resultado = self.conector.cerrar_posicion(ticket)
+        return Orden.sincrona('cierre', None, self.par_divisas, resultado=resultado, cerrar=ticket)
+
+    def obtener_posiciones(self):
+        """
+        Obtiene las posiciones abiertas en el símbolo de la estrategia
+        """
+        return self.conector.obtener_posiciones(self.par_divisas)
+
+    def registrar_mensaje(self, mensaje):
+        """
+        Envía un mensaje de log a la interfaz, o lo imprime si no hay cola
+        
+        Args:
+            mensaje: Texto del mensaje
+        """
+        if self.cola_eventos is not None:
+            self.cola_eventos.put(('mensaje', mensaje))
+        else:
+            print(mensaje)
+
+    def publicar_estadisticas(self, ganancias, perdidas):
+        """
+        Envía las estadísticas actuales de la estrategia a la interfaz
+        
+        Args:
+            ganancias: Monto total de ganancias
+            perdidas: Monto total de pérdidas
+        """
+        if self.cola_eventos is not None:
+            self.cola_eventos.put(('estadisticas', (ganancias, perdidas)))
 
     def ejecutar(self):
         """
@@ -0,0 +1,76 @@
+import numpy as np
+from .base import EstrategiaBase
+from indicadores.sma import SMA
+
+class EstrategiaCruceMedias(EstrategiaBase):
+    """
+    Estrategia de cruce de medias móviles simples: compra cuando la media
+    rápida cruza por encima de la lenta y vende en el cruce contrario
+    """
+    NOMBRE = 'Cruce de Medias'
+    
+    def __init__(self, conector, par_divisas=None, periodo_tiempo=None,
+                 periodo_rapido=10, periodo_lento=30, volumen=0.1):
+        """
+        Inicializa la estrategia
+        
+        Args:
+            conector: Instancia del conector MT5
+            par_divisas: Símbolo que opera la estrategia
+            periodo_tiempo: Periodo de las barras
+            periodo_rapido: Periodo de la media rápida
+            periodo_lento: Periodo de la media lenta
+            volumen: Volumen en lotes de cada operación
+        """
+        super().__init__(conector, par_divisas, periodo_tiempo)
+        if periodo_rapido >= periodo_lento:
+            raise ValueError("El periodo rápido debe ser menor que el lento")
+        self.sma_rapida = SMA(periodo_rapido)
+        self.sma_lenta = SMA(periodo_lento)
+        self.volumen = volumen
+        self._diferencia_anterior = None
+        self._orden = None
+
+    def en_barra(self, barra):
+        """
+        Actualiza las medias de forma incremental y opera en los cruces
+        
+        Args:
+            barra: Barra recién cerrada
+        """
+        self.ultima_barra = barra
+        rapida = self.sma_rapida.actualizar(barra.close)
+        lenta = self.sma_lenta.actualizar(barra.close)
+        if rapida is None or lenta is None:
+            return
+        self._operar(rapida - lenta)
+
+    def ejecutar(self):
+        """
+        Ejecución en vivo: recalcula las medias con los últimos datos recibidos
+        """
+        datos = self.datos
+        if datos is None:
+            datos = self.conector.obtener_datos(self.sma_lenta.periodo + 1, self.par_divisas, self.periodo_tiempo)
+        rapida = self.sma_rapida.calcular(datos)[-1]
+        lenta = self.sma_lenta.calcular(datos)[-1]
+        # Sin historial suficiente las medias son NaN, igual que None en en_barra
+        if np.isnan(rapida) or np.isnan(lenta):
+            return
+        self._operar(rapida - lenta)
+
+    def _operar(self, diferencia):
+        """
+        Abre o invierte la posición cuando cambia el signo de la diferencia
+        """
+        anterior = self._diferencia_anterior
+        self._diferencia_anterior = diferencia
+        if anterior is None or (anterior > 0) == (diferencia > 0):
+            return
+        if self._orden is not None:
+            self.cerrar_posicion(self._orden)
+            self._orden = None
+        if diferencia > 0:
+            self._orden = self.comprar(self.volumen)
+        else:
+            self._orden = self.vender(self.volumen)
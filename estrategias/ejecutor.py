@@ -0,0 +1,256 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from metricas import METRICAS
+
+class EjecutorEstrategia:
+    """
+    Ejecuta periódicamente una estrategia en un hilo de trabajo, fuera del
+    hilo principal de Tkinter
+    """
+    def __init__(self, estrategia, intervalo=1.0, cola_eventos=None):
+        """
+        Inicializa el ejecutor
+        
+        Args:
+            estrategia: Instancia de EstrategiaBase a ejecutar
+            intervalo: Segundos entre ejecuciones consecutivas de la estrategia
+            cola_eventos: Cola thread-safe por la que la estrategia envía eventos a la interfaz
+        """
+        if intervalo <= 0:
+            raise ValueError("El intervalo debe ser mayor que cero")
+        self.estrategia = estrategia
+        self.intervalo = intervalo
+        self.cola_eventos = cola_eventos
+        self.estrategia.cola_eventos = cola_eventos
+        self._detener = threading.Event()
+        self._hilo = None
+        self.ciclos = 0
+
+    @property
+    def ejecutando(self):
+        """
+        Indica si el hilo de la estrategia está en marcha
+        """
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self):
+        """
+        Inicia la estrategia y su hilo de ejecución
+        """
+        if self.ejecutando:
+            return
+        self._detener.clear()
+        self.estrategia.iniciar()
+        self._hilo = threading.Thread(
+            target=self._bucle,
+            name=f"Estrategia-{self.estrategia.__class__.__name__}",
+            daemon=True
+        )
+        self._hilo.start()
+
+    def detener(self, espera=5.0):
+        """
+        Detiene el hilo de ejecución y la estrategia
+        
+        Args:
+            espera: Segundos máximos a esperar a que termine el ciclo en curso
+        """
+        self._detener.set()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(espera)
+        self._hilo = None
+        if self.estrategia.activo:
+            self.estrategia.detener()
+
+    def _bucle(self):
+        """
+        Bucle del hilo: ejecuta la estrategia a la cadencia configurada
+        """
+        proxima = time.monotonic()
+        nombre = self.estrategia.__class__.__name__
+        while not self._detener.is_set() and self.estrategia.activo:
+            try:
+                with METRICAS.temporizador('estrategia_ciclo_segundos', estrategia=nombre):
+                    self.estrategia.ejecutar()
+                self.ciclos += 1
+            except NotImplementedError as e:
+                self.estrategia.registrar_mensaje(f"Estrategia detenida: {str(e)}")
+                self.estrategia.detener()
+                break
+            except Exception as e:
+                METRICAS.contador('estrategia_errores_total', estrategia=nombre).incrementar()
+                self.estrategia.registrar_mensaje(f"Error en la estrategia: {str(e)}")
+
+            # Mantener la cadencia sin acumular retraso si un ciclo se alarga
+            proxima += self.intervalo
+            ahora = time.monotonic()
+            if proxima < ahora:
+                proxima = ahora
+            self._detener.wait(proxima - ahora)
+
+        # Avisar a la interfaz si la estrategia terminó por sí misma
+        if not self._detener.is_set() and self.cola_eventos is not None:
+            self.cola_eventos.put(('detenido', self.estrategia.__class__.__name__))
+
+
+class EjecutorMultiSimbolo:
+    """
+    Ejecuta varias estrategias sobre distintos símbolos y periodos de forma
+    concurrente, compartiendo una sola conexión con MetaTrader 5
+    """
+    def __init__(self, conector, estrategias, intervalo=1.0, cola_eventos=None,
+                 numero_barras=1000, max_hilos=None, remuestreo=None):
+        """
+        Inicializa el ejecutor
+        
+        Args:
+            conector: Instancia compartida del conector MT5
+            estrategias: Lista de instancias de EstrategiaBase (cada una con su par_divisas y periodo_tiempo)
+            intervalo: Segundos entre ciclos
+            cola_eventos: Cola thread-safe para enviar eventos a la interfaz
+            numero_barras: Barras de historial que se entregan a cada estrategia
+            max_hilos: Hilos máximos para ejecutar las estrategias en paralelo
+            remuestreo: GestorRemuestreo opcional; si se indica, los periodos
+                mayores se construyen a partir de una sola consulta M1 por símbolo
+        """
+        if intervalo <= 0:
+            raise ValueError("El intervalo debe ser mayor que cero")
+        self.conector = conector
+        self.estrategias = list(estrategias)
+        self.intervalo = intervalo
+        self.cola_eventos = cola_eventos
+        self.numero_barras = numero_barras
+        self.max_hilos = max_hilos or min(32, max(1, len(self.estrategias)))
+        self.remuestreo = remuestreo
+        for estrategia in self.estrategias:
+            estrategia.cola_eventos = cola_eventos
+        self._detener = threading.Event()
+        self._hilo = None
+        self._pool = None
+        self._bloqueo_pool = threading.Lock()
+        self.ciclos = 0
+
+    @property
+    def ejecutando(self):
+        """
+        Indica si el hilo coordinador está en marcha
+        """
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def agrupar_por_simbolo(self):
+        """
+        Agrupa las estrategias activas por (par_divisas, periodo_tiempo)
+        
+        Returns:
+            Diccionario {(par_divisas, periodo_tiempo): [estrategias]}
+        """
+        grupos = {}
+        for estrategia in self.estrategias:
+            if estrategia.activo:
+                clave = (estrategia.par_divisas, estrategia.periodo_tiempo)
+                grupos.setdefault(clave, []).append(estrategia)
+        return grupos
+
+    def iniciar(self):
+        """
+        Inicia todas las estrategias y el hilo coordinador
+        """
+        if self.ejecutando:
+            return
+        self._detener.clear()
+        for estrategia in self.estrategias:
+            estrategia.iniciar()
+        with self._bloqueo_pool:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_hilos, thread_name_prefix="Estrategia")
+        self._hilo = threading.Thread(target=self._bucle, name="EjecutorMultiSimbolo", daemon=True)
+        self._hilo.start()
+
+    def detener(self, espera=5.0):
+        """
+        Detiene el hilo coordinador y todas las estrategias
+        
+        Args:
+            espera: Segundos máximos a esperar a que termine el ciclo en curso
+        """
+        self._detener.set()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(espera)
+        self._hilo = None
+        # Retirar el pool bajo el bloqueo: si el coordinador no terminó a
+        # tiempo, su siguiente envío encuentra el pool a None y abandona el ciclo
+        with self._bloqueo_pool:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+        for estrategia in self.estrategias:
+            if estrategia.activo:
+                estrategia.detener()
+
+    @METRICAS.medir('ejecutor_ciclo_segundos')
+    def ejecutar_ciclo(self):
+        """
+        Ejecuta un ciclo: obtiene los datos de cada símbolo una sola vez y
+        reparte el resultado entre las estrategias que lo usan
+        """
+        grupos = self.agrupar_por_simbolo()
+        if not grupos:
+            return
+
+        fuente = self.remuestreo if self.remuestreo is not None else self.conector
+        datos = fuente.obtener_datos_multiples(grupos.keys(), self.numero_barras)
+
+        tareas = []
+        with self._bloqueo_pool:
+            if self._pool is None:
+                # Ejecutor detenido mientras se obtenían los datos
+                return
+            for clave, estrategias in grupos.items():
+                resultado = datos.get(clave)
+                if isinstance(resultado, Exception):
+                    for estrategia in estrategias:
+                        estrategia.registrar_mensaje(f"Error al obtener datos de {clave[0]}: {str(resultado)}")
+                    continue
+                for estrategia in estrategias:
+                    tareas.append(self._pool.submit(self._ejecutar_estrategia, estrategia, resultado))
+
+        for tarea in tareas:
+            tarea.result()
+        self.ciclos += 1
+
+    def _ejecutar_estrategia(self, estrategia, datos):
+        """
+        Entrega los datos a una estrategia y ejecuta su lógica
+        """
+        nombre = estrategia.__class__.__name__
+        try:
+            with METRICAS.temporizador('estrategia_ciclo_segundos', estrategia=nombre):
+                estrategia.actualizar_datos(datos)
+                estrategia.ejecutar()
+        except NotImplementedError as e:
+            estrategia.registrar_mensaje(f"Estrategia detenida: {str(e)}")
+            estrategia.detener()
+        except Exception as e:
+            METRICAS.contador('estrategia_errores_total', estrategia=nombre).incrementar()
+            estrategia.registrar_mensaje(f"Error en la estrategia ({estrategia.par_divisas}): {str(e)}")
+
+    def _bucle(self):
+        """
+        Bucle del hilo coordinador: ejecuta ciclos a la cadencia configurada
+        """
+        proxima = time.monotonic()
+        while not self._detener.is_set() and any(e.activo for e in self.estrategias):
+            try:
+                self.ejecutar_ciclo()
+            except Exception as e:
+                if self.cola_eventos is not None:
+                    self.cola_eventos.put(('mensaje', f"Error en el ciclo de estrategias: {str(e)}"))
+
+            proxima += self.intervalo
+            ahora = time.monotonic()
+            if proxima < ahora:
+                proxima = ahora
+            self._detener.wait(proxima - ahora)
+
+        if not self._detener.is_set() and self.cola_eventos is not None:
+            self.cola_eventos.put(('detenido', self.__class__.__name__))
@@ -0,0 +1,277 @@
+import ast
+import importlib
+import inspect
+import os
+import threading
+
+# Grupo de entry points con el que otros paquetes publican estrategias
+GRUPO_ENTRY_POINTS = "bot_mt5.estrategias"
+# Argumentos del constructor comunes a todas las estrategias
+ARGUMENTOS_BASE = ('self', 'conector', 'par_divisas', 'periodo_tiempo')
+
+
+class EntradaEstrategia:
+    """
+    Descripción de una estrategia registrada. La clase solo se importa al
+    llamar a cargar(), así que descubrir estrategias no importa sus módulos
+    ni sus dependencias
+    """
+    def __init__(self, nombre, modulo, clase, descripcion="", parametros=None, origen="paquete"):
+        """
+        Inicializa la entrada
+
+        Args:
+            nombre: Nombre visible de la estrategia (atributo NOMBRE o nombre de la clase)
+            modulo: Módulo que define la clase (ej: "estrategias.cruce_medias")
+            clase: Nombre de la clase
+            descripcion: Primer párrafo del docstring de la clase
+            parametros: Diccionario {parametro: valor por defecto} o None si se desconoce
+            origen: 'paquete' o 'entry_point'
+        """
+        self.nombre = nombre
+        self.modulo = modulo
+        self.clase = clase
+        self.descripcion = descripcion
+        self.parametros = parametros
+        self.origen = origen
+        self._clase = None
+
+    @property
+    def cargada(self):
+        """
+        Indica si el módulo de la estrategia ya se importó
+        """
+        return self._clase is not None
+
+    def cargar(self):
+        """
+        Importa el módulo de la estrategia y obtiene su clase
+
+        Returns:
+            Clase de la estrategia
+
+        Raises:
+            TypeError: Si la clase no deriva de EstrategiaBase
+        """
+        if self._clase is None:
+            from .base import EstrategiaBase
+            clase = getattr(importlib.import_module(self.modulo), self.clase)
+            if not (isinstance(clase, type) and issubclass(clase, EstrategiaBase)):
+                raise TypeError(f"{self.modulo}:{self.clase} no deriva de EstrategiaBase")
+            if self.parametros is None:
+                self.parametros = parametros_constructor(clase)
+            self._clase = clase
+        return self._clase
+
+    def __repr__(self):
+        return f"EntradaEstrategia(nombre={self.nombre!r}, clase={self.modulo}:{self.clase})"
+
+
+def parametros_constructor(clase):
+    """
+    Obtiene los parámetros propios del constructor de una estrategia ya importada
+
+    Returns:
+        Diccionario {parametro: valor por defecto (None si no tiene)}
+    """
+    parametros = {}
+    for nombre, parametro in inspect.signature(clase.__init__).parameters.items():
+        if nombre in ARGUMENTOS_BASE or parametro.kind in (parametro.VAR_POSITIONAL, parametro.VAR_KEYWORD):
+            continue
+        parametros[nombre] = None if parametro.default is parametro.empty else parametro.default
+    return parametros
+
+
+def _valor_literal(nodo):
+    """
+    Evalúa un nodo del AST si es un literal; en otro caso devuelve None
+    """
+    try:
+        return ast.literal_eval(nodo)
+    except (ValueError, TypeError, SyntaxError):
+        return None
+
+
+def _analizar_clase(nodo):
+    """
+    Extrae de la definición de una clase su NOMBRE, descripción y parámetros sin ejecutarla
+
+    Returns:
+        Tupla (nombre, descripcion, parametros)
+    """
+    nombre = nodo.name
+    parametros = {}
+    for elemento in nodo.body:
+        if isinstance(elemento, ast.Assign) and len(elemento.targets) == 1:
+            objetivo = elemento.targets[0]
+            if isinstance(objetivo, ast.Name) and objetivo.id == 'NOMBRE':
+                nombre = _valor_literal(elemento.value) or nombre
+        elif isinstance(elemento, ast.FunctionDef) and elemento.name == '__init__':
+            argumentos = elemento.args.args
+            defectos = [None] * (len(argumentos) - len(elemento.args.defaults)) + list(elemento.args.defaults)
+            for argumento, defecto in zip(argumentos, defectos):
+                if argumento.arg not in ARGUMENTOS_BASE:
+                    parametros[argumento.arg] = _valor_literal(defecto) if defecto is not None else None
+            for argumento, defecto in zip(elemento.args.kwonlyargs, elemento.args.kw_defaults):
+                parametros[argumento.arg] = _valor_literal(defecto) if defecto is not None else None
+    # Primer párrafo del docstring en una sola línea
+    descripcion = " ".join((ast.get_docstring(nodo) or "").strip().split("\n\n")[0].split())
+    return nombre, descripcion, parametros
+
+
+def _nombre_base(nodo):
+    """
+    Obtiene el nombre de una clase base del AST (Name o Attribute)
+    """
+    if isinstance(nodo, ast.Name):
+        return nodo.id
+    if isinstance(nodo, ast.Attribute):
+        return nodo.attr
+    return None
+
+
+class RegistroEstrategias:
+    """
+    Registro de estrategias disponibles. Las subclases de EstrategiaBase del
+    paquete estrategias se descubren leyendo el código fuente con ast, y las
+    de otros paquetes mediante entry points; ningún módulo se importa hasta
+    que se crea la estrategia
+    """
+    def __init__(self, directorio=None, paquete="estrategias", grupo=GRUPO_ENTRY_POINTS):
+        """
+        Inicializa el registro
+
+        Args:
+            directorio: Carpeta con los módulos de estrategias (por defecto la de este paquete)
+            paquete: Nombre del paquete correspondiente a la carpeta
+            grupo: Grupo de entry points a consultar (None para no consultarlos)
+        """
+        self.directorio = directorio or os.path.dirname(os.path.abspath(__file__))
+        self.paquete = paquete
+        self.grupo = grupo
+        self._entradas = None
+        self._bloqueo = threading.Lock()
+
+    def descubrir(self, forzar=False):
+        """
+        Busca las estrategias disponibles (solo la primera vez salvo que se fuerce)
+
+        Returns:
+            Diccionario {nombre: EntradaEstrategia}
+        """
+        with self._bloqueo:
+            if self._entradas is None or forzar:
+                entradas = {}
+                for entrada in self._descubrir_paquete() + self._descubrir_entry_points():
+                    # Las estrategias del paquete tienen prioridad ante nombres repetidos
+                    entradas.setdefault(entrada.nombre, entrada)
+                self._entradas = entradas
+            return self._entradas
+
+    def _descubrir_paquete(self):
+        """
+        Analiza los módulos de la carpeta de estrategias sin importarlos
+        """
+        clases = {}
+        for archivo in sorted(os.listdir(self.directorio)):
+            if not archivo.endswith('.py') or archivo.startswith('_'):
+                continue
+            modulo = f"{self.paquete}.{archivo[:-3]}"
+            try:
+                with open(os.path.join(self.directorio, archivo), 'r', encoding='utf-8') as fuente:
+                    arbol = ast.parse(fuente.read(), archivo)
+            except (OSError, SyntaxError, UnicodeDecodeError):
+                continue
+            for nodo in arbol.body:
+                if isinstance(nodo, ast.ClassDef):
+                    bases = [_nombre_base(base) for base in nodo.bases]
+                    clases[nodo.name] = (modulo, nodo, bases)
+
+        # Subclases directas o indirectas de EstrategiaBase dentro del paquete
+        estrategias = {'EstrategiaBase'} if 'EstrategiaBase' in clases else set()
+        cambios = True
+        while cambios:
+            cambios = False
+            for nombre, (_, _, bases) in clases.items():
+                if nombre not in estrategias and any(base in estrategias or base == 'EstrategiaBase'
+                                                     for base in bases):
+                    estrategias.add(nombre)
+                    cambios = True
+
+        entradas = []
+        for nombre in sorted(estrategias):
+            modulo, nodo, _ = clases[nombre]
+            visible, descripcion, parametros = _analizar_clase(nodo)
+            entradas.append(EntradaEstrategia(visible, modulo, nombre, descripcion, parametros))
+        return entradas
+
+    def _descubrir_entry_points(self):
+        """
+        Obtiene las estrategias publicadas por otros paquetes instalados
+        """
+        if not self.grupo:
+            return []
+        try:
+            from importlib.metadata import entry_points
+            puntos = entry_points()
+            if hasattr(puntos, 'select'):
+                puntos = puntos.select(group=self.grupo)
+            else:
+                puntos = puntos.get(self.grupo, [])
+        except Exception:
+            return []
+        entradas = []
+        for punto in puntos:
+            modulo, _, clase = punto.value.partition(':')
+            if clase:
+                entradas.append(EntradaEstrategia(punto.name, modulo.strip(), clase.strip(), origen='entry_point'))
+        return entradas
+
+    def nombres(self):
+        """
+        Obtiene los nombres de las estrategias disponibles ordenados alfabéticamente
+        """
+        return sorted(self.descubrir())
+
+    def obtener(self, nombre):
+        """
+        Obtiene la entrada de una estrategia
+
+        Raises:
+            KeyError: Si no hay ninguna estrategia con ese nombre
+        """
+        entradas = self.descubrir()
+        if nombre not in entradas:
+            raise KeyError(f"Estrategia no encontrada: {nombre}")
+        return entradas[nombre]
+
+    def parametros(self, nombre):
+        """
+        Obtiene los parámetros configurables de una estrategia y sus valores por defecto.
+        Las estrategias de entry points se importan para conocerlos
+
+        Returns:
+            Diccionario {parametro: valor por defecto}
+        """
+        entrada = self.obtener(nombre)
+        if entrada.parametros is None:
+            entrada.cargar()
+        return dict(entrada.parametros)
+
+    def crear(self, nombre, conector, par_divisas=None, periodo_tiempo=None, **parametros):
+        """
+        Importa la estrategia (si aún no lo estaba) y crea una instancia
+
+        Args:
+            nombre: Nombre de la estrategia en el registro
+            conector: Instancia del conector MT5
+            par_divisas: Símbolo que opera la estrategia
+            periodo_tiempo: Periodo de las barras
+            **parametros: Parámetros propios de la estrategia
+
+        Returns:
+            Instancia de la estrategia
+        """
+        clase = self.obtener(nombre).cargar()
+        return clase(conector, par_divisas, periodo_tiempo, **parametros)
+
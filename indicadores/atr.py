@@ -0,0 +1,93 @@
+from .base import IndicadorBase, columnas_precio, media_exponencial
+import numpy as np
+from metricas import METRICAS
+
+class ATR(IndicadorBase):
+    """
+    Indicador ATR (Average True Range) con el suavizado de Wilder. En modo
+    incremental recibe barras (Barra o tuplas (máximo, mínimo, cierre))
+    """
+    def __init__(self, periodo=14, max_valores=10000):
+        super().__init__("ATR", periodo, max_valores)
+
+    def reiniciar(self):
+        """
+        Reinicia el cierre anterior, la suma de la ventana inicial y la media
+        """
+        self._cierre_anterior = None
+        self._contador = 0
+        self._suma = 0.0
+        self._media = None
+
+    def _entradas(self, datos):
+        """
+        Convierte los datos en tuplas (máximo, mínimo, cierre)
+        """
+        maximos, minimos, cierres = columnas_precio(datos, 'high', 'low', 'close')
+        return zip(maximos.tolist(), minimos.tolist(), cierres.tolist())
+
+    @METRICAS.medir('indicador_calculo_segundos', indicador='ATR')
+    def calcular(self, datos):
+        """
+        Calcula el ATR basado en los datos históricos
+        
+        Args:
+            datos: Barras, DataFrame o arreglo con columnas high, low y close
+            
+        Returns:
+            Arreglo float64 con los valores del ATR (NaN sin datos suficientes)
+        """
+        maximos, minimos, cierres = columnas_precio(datos, 'high', 'low', 'close')
+        
+        # Rango verdadero: la primera barra solo tiene máximo - mínimo
+        rango = maximos - minimos
+        if len(cierres) > 1:
+            anteriores = cierres[:-1]
+            rango[1:] = np.maximum(rango[1:], np.maximum(np.abs(maximos[1:] - anteriores),
+                                                         np.abs(minimos[1:] - anteriores)))
+        atr = media_exponencial(rango, 1.0 / self.periodo, self.periodo)
+
+        # Continuar el modo incremental desde el último valor
+        if len(atr) and not np.isnan(atr[-1]):
+            self.reiniciar()
+            self._cierre_anterior = float(cierres[-1])
+            self._contador = self.periodo
+            self._media = float(atr[-1])
+        else:
+            self.inicializar(datos)
+
+        # Guardar los últimos valores
+        self.guardar_valores(atr)
+
+        return atr
+
+    def actualizar(self, barra):
+        """
+        Actualiza el ATR con una nueva barra en tiempo constante
+        
+        Args:
+            barra: Barra o tupla (máximo, mínimo, cierre)
+            
+        Returns:
+            El nuevo valor del ATR, o None si aún no hay datos suficientes
+        """
+        if hasattr(barra, 'close'):
+            maximo, minimo, cierre = barra.high, barra.low, barra.close
+        else:
+            maximo, minimo, cierre = barra
+        rango = maximo - minimo
+        if self._cierre_anterior is not None:
+            rango = max(rango, abs(maximo - self._cierre_anterior), abs(minimo - self._cierre_anterior))
+        self._cierre_anterior = cierre
+
+        if self._contador < self.periodo:
+            self._contador += 1
+            self._suma += rango
+            if self._contador < self.periodo:
+                return None
+            self._media = self._suma / self.periodo
+        else:
+            self._media += (rango - self._media) / self.periodo
+
+        self.ultimo_valor = self._media
+        return self.ultimo_valor
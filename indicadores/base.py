@@ -1,41 +1,194 @@
-import pandas as pd
 import numpy as np
+from .nucleos import suavizado
+
+def precios_cierre(datos):
+    """
+    Obtiene los precios de cierre como arreglo float64 contiguo
+    
+    Args:
+        datos: Barras, DataFrame, arreglo estructurado o secuencia de precios
+        
+    Returns:
+        np.ndarray float64 (sin copia si ya lo era)
+    """
+    if isinstance(datos, np.ndarray) and datos.dtype.names is None:
+        cierres = datos
+    elif hasattr(datos, 'to_numpy') and not hasattr(datos, 'columns'):
+        # Serie de pandas con los precios
+        cierres = datos.to_numpy()
+    elif isinstance(datos, (list, tuple)):
+        cierres = datos
+    else:
+        cierres = datos['close']
+        if hasattr(cierres, 'to_numpy'):
+            cierres = cierres.to_numpy()
+    return np.ascontiguousarray(cierres, dtype=np.float64)
+
+def columnas_precio(datos, *nombres):
+    """
+    Obtiene varias columnas de precios como arreglos float64 contiguos
+    
+    Args:
+        datos: Barras, DataFrame o arreglo estructurado
+        nombres: Columnas a obtener (ej: 'high', 'low', 'close')
+        
+    Returns:
+        Lista de np.ndarray float64 en el orden pedido
+    """
+    columnas = []
+    for nombre in nombres:
+        columna = datos[nombre]
+        if hasattr(columna, 'to_numpy'):
+            columna = columna.to_numpy()
+        columnas.append(np.ascontiguousarray(columna, dtype=np.float64))
+    return columnas
+
+def media_exponencial(valores, alfa, periodo):
+    """
+    Calcula de forma vectorizada la media exponencial y = y + alfa * (x - y),
+    sembrada con la media simple de los primeros `periodo` valores válidos.
+    Con alfa = 1 / periodo es el suavizado de Wilder (RSI, ATR). El bucle
+    recursivo lo ejecuta el núcleo activo (ver nucleos.usar_nucleos)
+    
+    Args:
+        valores: Arreglo float64; los NaN iniciales se ignoran
+        alfa: Factor de suavizado (0 < alfa <= 1)
+        periodo: Valores usados para sembrar la media
+        
+    Returns:
+        Arreglo float64 de la misma longitud (NaN sin datos suficientes)
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    resultado = np.full(len(valores), np.nan)
+    validos = np.flatnonzero(~np.isnan(valores))
+    if len(validos) == 0:
+        return resultado
+    inicio = validos[0]
+    semilla = inicio + periodo - 1
+    if semilla >= len(valores):
+        return resultado
+    tramo = valores[semilla:].copy()
+    tramo[0] = valores[inicio:semilla + 1].mean()
+    resultado[semilla:] = suavizado(tramo, alfa)
+    return resultado
 
 class IndicadorBase:
     """
     Clase base para todos los indicadores técnicos
     """
-    def __init__(self, nombre, periodo=14):
+    def __init__(self, nombre, periodo=14, max_valores=10000):
         """
         Inicializa el indicador
         
         Args:
             nombre: Nombre del indicador
             periodo: Período de cálculo del indicador
+            max_valores: Número máximo de valores conservados tras calcular
         """
         self.nombre = nombre
         self.periodo = periodo
-        self.valores = []
+        self.max_valores = max_valores
+        self.valores = np.empty(0)
         self.ultimo_valor = None
+        self.reiniciar()
 
     def calcular(self, datos):
         """
         Método abstracto que debe ser implementado por cada indicador
         
         Args:
-            datos: DataFrame con los datos históricos
+            datos: Barras, DataFrame o arreglo con los datos históricos
             
         Returns:
-            DataFrame con los valores calculados del indicador
+            Arreglo float64 con los valores calculados del indicador
         """
         raise NotImplementedError("Este método debe ser implementado por la clase hija")
 
+    def guardar_valores(self, valores):
+        """
+        Conserva una copia de los últimos max_valores valores calculados, de
+        modo que el indicador no retiene el resultado completo
+        
+        Args:
+            valores: Arreglo con los valores calculados (una fila por barra y
+                una columna por salida en los indicadores con varias salidas)
+        """
+        self.valores = np.array(valores[-self.max_valores:], dtype=np.float64)
+        self.ultimo_valor = self._valor(valores[-1]) if len(valores) > 0 else None
+
+    def _valor(self, fila):
+        """
+        Convierte una fila del cálculo por lotes al tipo que devuelve actualizar.
+        Los indicadores con varias salidas lo sobrescriben
+        """
+        return float(fila)
+
+    def _entradas(self, datos):
+        """
+        Convierte los datos a la secuencia de entradas de actualizar (precios
+        de cierre por defecto)
+        """
+        return precios_cierre(datos).tolist()
+
+    def reiniciar(self):
+        """
+        Reinicia el estado interno del modo incremental.
+        Las clases hijas que mantienen estado propio deben sobrescribirlo
+        """
+        pass
+
+    def inicializar(self, precios):
+        """
+        Alimenta el modo incremental con precios históricos
+        
+        Args:
+            precios: Precios de cierre en orden cronológico (o los datos que
+                espera el indicador, como Barras para los que usan máximos y mínimos)
+            
+        Returns:
+            El último valor del indicador tras procesar los precios
+        """
+        self.reiniciar()
+        for entrada in self._entradas(precios):
+            self.actualizar(entrada)
+        return self.ultimo_valor
+
+    def comprobar_consistencia(self, datos):
+        """
+        Compara el cálculo por lotes con el modo incremental sobre los mismos
+        datos. Deja el indicador con el estado incremental del final de los datos
+        
+        Args:
+            datos: Barras, DataFrame o arreglo con los datos históricos
+            
+        Returns:
+            Mayor diferencia absoluta entre ambos modos (del orden del redondeo
+            si coinciden), o infinito si difieren las posiciones sin valor
+        """
+        lotes = np.asarray(self.calcular(datos), dtype=np.float64)
+        self.reiniciar()
+        incremental = np.full(lotes.shape, np.nan)
+        for i, entrada in enumerate(self._entradas(datos)):
+            valor = self.actualizar(entrada)
+            if valor is not None:
+                incremental[i] = valor
+        vacios = np.isnan(lotes)
+        if not np.array_equal(vacios, np.isnan(incremental)):
+            return float('inf')
+        if vacios.all():
+            return 0.0
+        return float(np.max(np.abs(lotes[~vacios] - incremental[~vacios])))
+
     def actualizar(self, nuevo_precio):
         """
-        Actualiza el indicador con un nuevo precio
+        Actualiza el indicador con un nuevo precio en tiempo constante,
+        usando el estado interno en lugar de recalcular todo el histórico
         
         Args:
             nuevo_precio: Nuevo precio para actualizar el indicador
+            
+        Returns:
+            El nuevo valor del indicador, o None si aún no hay datos suficientes
         """
         raise NotImplementedError("Este método debe ser implementado por la clase hija")
 
@@ -53,6 +206,6 @@ class IndicadorBase:
         Obtiene todos los valores calculados del indicador
         
         Returns:
-            Lista de todos los valores calculados
+            Arreglo con los últimos valores calculados (como máximo max_valores)
         """
         return self.valores
@@ -0,0 +1,104 @@
+from .base import IndicadorBase, precios_cierre
+from collections import deque, namedtuple
+import numpy as np
+import pandas as pd
+from metricas import METRICAS
+
+# Valor de las bandas en una barra
+ValorBollinger = namedtuple('ValorBollinger', ['media', 'superior', 'inferior'])
+
+class Bollinger(IndicadorBase):
+    """
+    Bandas de Bollinger: media simple y bandas a `desviaciones` desviaciones
+    típicas (poblacionales) de la media
+    """
+    def __init__(self, periodo=20, desviaciones=2.0, max_valores=10000):
+        super().__init__("Bollinger", periodo, max_valores)
+        self.desviaciones = desviaciones
+
+    def reiniciar(self):
+        """
+        Reinicia el buffer circular y las sumas de la ventana. Las sumas se
+        guardan respecto a un precio de referencia para que la varianza no
+        pierda precisión por cancelación
+        """
+        self._buffer = deque(maxlen=self.periodo)
+        self._referencia = None
+        self._suma = 0.0
+        self._suma_cuadrados = 0.0
+        self._actualizaciones = 0
+
+    def _valor(self, fila):
+        """
+        Convierte una fila del cálculo por lotes a ValorBollinger
+        """
+        return ValorBollinger(*(float(v) for v in fila))
+
+    @METRICAS.medir('indicador_calculo_segundos', indicador='Bollinger')
+    def calcular(self, datos):
+        """
+        Calcula las bandas basadas en los datos históricos
+        
+        Args:
+            datos: Barras, DataFrame o arreglo con los datos históricos
+            
+        Returns:
+            Arreglo float64 de forma (barras, 3) con la media y las bandas
+            superior e inferior (NaN sin datos suficientes)
+        """
+        cierres = precios_cierre(datos)
+        ventana = pd.Series(cierres, copy=False).rolling(window=self.periodo)
+        media = ventana.mean().to_numpy()
+        desviacion = ventana.std(ddof=0).to_numpy()
+        bandas = np.column_stack((media, media + self.desviaciones * desviacion,
+                                  media - self.desviaciones * desviacion))
+
+        # Sembrar el modo incremental con la última ventana
+        self.inicializar(cierres[-self.periodo:])
+
+        # Guardar los últimos valores
+        self.guardar_valores(bandas)
+
+        return bandas
+
+    def actualizar(self, nuevo_precio):
+        """
+        Actualiza las bandas con un nuevo precio en tiempo constante
+        
+        Args:
+            nuevo_precio: Nuevo precio para actualizar el indicador
+            
+        Returns:
+            ValorBollinger, o None si aún no hay datos suficientes
+        """
+        if self._referencia is None:
+            self._referencia = nuevo_precio
+        if len(self._buffer) == self.periodo:
+            antiguo = self._buffer[0] - self._referencia
+            self._suma -= antiguo
+            self._suma_cuadrados -= antiguo * antiguo
+        self._buffer.append(nuevo_precio)
+        diferencia = nuevo_precio - self._referencia
+        self._suma += diferencia
+        self._suma_cuadrados += diferencia * diferencia
+
+        # Recalcular las sumas en cada vuelta completa del buffer, tomando
+        # como referencia el primer precio de la ventana
+        self._actualizaciones += 1
+        if self._actualizaciones >= self.periodo:
+            self._actualizaciones = 0
+            self._referencia = self._buffer[0]
+            diferencias = [precio - self._referencia for precio in self._buffer]
+            self._suma = sum(diferencias)
+            self._suma_cuadrados = sum(d * d for d in diferencias)
+
+        if len(self._buffer) < self.periodo:
+            return None
+
+        media = self._suma / self.periodo
+        varianza = max(self._suma_cuadrados / self.periodo - media * media, 0.0)
+        desviacion = varianza ** 0.5
+        media += self._referencia
+        self.ultimo_valor = ValorBollinger(media, media + self.desviaciones * desviacion,
+                                           media - self.desviaciones * desviacion)
+        return self.ultimo_valor
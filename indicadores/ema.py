@@ -0,0 +1,69 @@
+from .base import IndicadorBase, media_exponencial, precios_cierre
+import numpy as np
+from metricas import METRICAS
+
+class EMA(IndicadorBase):
+    """
+    Indicador EMA (Exponential Moving Average), sembrada con la media simple
+    del primer periodo
+    """
+    def __init__(self, periodo=14, max_valores=10000):
+        super().__init__("EMA", periodo, max_valores)
+        self.alfa = 2.0 / (periodo + 1)
+
+    def reiniciar(self):
+        """
+        Reinicia la suma de la ventana inicial y el valor de la media
+        """
+        self._contador = 0
+        self._suma = 0.0
+        self._media = None
+
+    @METRICAS.medir('indicador_calculo_segundos', indicador='EMA')
+    def calcular(self, datos):
+        """
+        Calcula la EMA basada en los datos históricos
+        
+        Args:
+            datos: Barras, DataFrame o arreglo con los datos históricos
+            
+        Returns:
+            Arreglo float64 con los valores de la EMA (NaN sin datos suficientes)
+        """
+        cierres = precios_cierre(datos)
+        ema = media_exponencial(cierres, self.alfa, self.periodo)
+
+        # Continuar el modo incremental desde el último valor
+        if len(ema) and not np.isnan(ema[-1]):
+            self.reiniciar()
+            self._contador = self.periodo
+            self._media = float(ema[-1])
+        else:
+            self.inicializar(cierres[~np.isnan(cierres)])
+
+        # Guardar los últimos valores
+        self.guardar_valores(ema)
+
+        return ema
+
+    def actualizar(self, nuevo_precio):
+        """
+        Actualiza la EMA con un nuevo precio en tiempo constante
+        
+        Args:
+            nuevo_precio: Nuevo precio para actualizar el indicador
+            
+        Returns:
+            El nuevo valor de la EMA, o None si aún no hay datos suficientes
+        """
+        if self._contador < self.periodo:
+            self._contador += 1
+            self._suma += nuevo_precio
+            if self._contador < self.periodo:
+                return None
+            self._media = self._suma / self.periodo
+        else:
+            self._media += self.alfa * (nuevo_precio - self._media)
+
+        self.ultimo_valor = self._media
+        return self.ultimo_valor
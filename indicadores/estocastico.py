@@ -0,0 +1,124 @@
+from .base import IndicadorBase, columnas_precio
+from .nucleos import extremos_ventana
+from collections import deque, namedtuple
+import numpy as np
+import pandas as pd
+from metricas import METRICAS
+
+# Valor del estocástico en una barra
+ValorEstocastico = namedtuple('ValorEstocastico', ['k', 'd'])
+
+class Estocastico(IndicadorBase):
+    """
+    Oscilador estocástico con los parámetros de MT5: %K sobre `periodo`
+    barras, ralentizado con `suavizado` barras, y %D como media simple de
+    %K. En modo incremental recibe barras (Barra o tuplas (máximo, mínimo, cierre))
+    """
+    def __init__(self, periodo=5, periodo_d=3, suavizado=3, max_valores=10000):
+        self.periodo_d = periodo_d
+        self.suavizado = suavizado
+        super().__init__("Estocastico", periodo, max_valores)
+
+    def reiniciar(self):
+        """
+        Reinicia las colas monótonas de máximos y mínimos y las ventanas de
+        ralentizado y de %D
+        """
+        self._indice = 0
+        self._maximos = deque()
+        self._minimos = deque()
+        self._numeradores = deque(maxlen=self.suavizado)
+        self._denominadores = deque(maxlen=self.suavizado)
+        self._valores_k = deque(maxlen=self.periodo_d)
+
+    def _entradas(self, datos):
+        """
+        Convierte los datos en tuplas (máximo, mínimo, cierre)
+        """
+        maximos, minimos, cierres = columnas_precio(datos, 'high', 'low', 'close')
+        return zip(maximos.tolist(), minimos.tolist(), cierres.tolist())
+
+    def _valor(self, fila):
+        """
+        Convierte una fila del cálculo por lotes a ValorEstocastico
+        """
+        return ValorEstocastico(*(float(v) for v in fila))
+
+    @METRICAS.medir('indicador_calculo_segundos', indicador='Estocastico')
+    def calcular(self, datos):
+        """
+        Calcula el estocástico basado en los datos históricos
+        
+        Args:
+            datos: Barras, DataFrame o arreglo con columnas high, low y close
+            
+        Returns:
+            Arreglo float64 de forma (barras, 2) con %K y %D (NaN sin datos
+            suficientes). Un rango nulo da 50
+        """
+        maximos, minimos, cierres = columnas_precio(datos, 'high', 'low', 'close')
+        maximo, minimo = extremos_ventana(maximos, minimos, self.periodo)
+        numerador = pd.Series(cierres - minimo, copy=False).rolling(window=self.suavizado).sum().to_numpy()
+        denominador = pd.Series(maximo - minimo, copy=False).rolling(window=self.suavizado).sum().to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = np.where(denominador > 0, 100 * numerador / denominador, 50.0)
+        k[np.isnan(denominador)] = np.nan
+        d = pd.Series(k, copy=False).rolling(window=self.periodo_d).mean().to_numpy()
+        resultado = np.column_stack((k, d))
+
+        # Sembrar el modo incremental con las últimas barras que influyen en el valor
+        necesarias = self.periodo + self.suavizado + self.periodo_d - 2
+        self.inicializar({'high': maximos[-necesarias:], 'low': minimos[-necesarias:],
+                          'close': cierres[-necesarias:]})
+
+        # Guardar los últimos valores
+        self.guardar_valores(resultado)
+
+        return resultado
+
+    def actualizar(self, barra):
+        """
+        Actualiza el estocástico con una nueva barra en tiempo constante
+        (amortizado)
+        
+        Args:
+            barra: Barra o tupla (máximo, mínimo, cierre)
+            
+        Returns:
+            ValorEstocastico (%D NaN hasta tener datos suficientes), o None
+            si aún no hay datos suficientes para %K
+        """
+        if hasattr(barra, 'close'):
+            maximo, minimo, cierre = barra.high, barra.low, barra.close
+        else:
+            maximo, minimo, cierre = barra
+
+        # Colas monótonas: el frente es el máximo (mínimo) de la ventana
+        indice = self._indice
+        self._indice += 1
+        while self._maximos and self._maximos[-1][1] <= maximo:
+            self._maximos.pop()
+        self._maximos.append((indice, maximo))
+        while self._minimos and self._minimos[-1][1] >= minimo:
+            self._minimos.pop()
+        self._minimos.append((indice, minimo))
+        if self._maximos[0][0] <= indice - self.periodo:
+            self._maximos.popleft()
+        if self._minimos[0][0] <= indice - self.periodo:
+            self._minimos.popleft()
+        if self._indice < self.periodo:
+            return None
+
+        mas_alto = self._maximos[0][1]
+        mas_bajo = self._minimos[0][1]
+        self._numeradores.append(cierre - mas_bajo)
+        self._denominadores.append(mas_alto - mas_bajo)
+        if len(self._numeradores) < self.suavizado:
+            return None
+
+        denominador = sum(self._denominadores)
+        k = 100 * sum(self._numeradores) / denominador if denominador > 0 else 50.0
+        self._valores_k.append(k)
+        d = sum(self._valores_k) / self.periodo_d if len(self._valores_k) == self.periodo_d else float('nan')
+        self.ultimo_valor = ValorEstocastico(k, d)
+        return self.ultimo_valor
@@ -0,0 +1,83 @@
+from .base import IndicadorBase, precios_cierre
+from .ema import EMA
+from collections import namedtuple
+import numpy as np
+from metricas import METRICAS
+
+# Valor del MACD en una barra
+ValorMACD = namedtuple('ValorMACD', ['macd', 'senal', 'histograma'])
+
+class MACD(IndicadorBase):
+    """
+    Indicador MACD: diferencia de dos EMA, su línea de señal (EMA del MACD)
+    e histograma (MACD - señal)
+    """
+    def __init__(self, periodo_rapido=12, periodo_lento=26, periodo_senal=9, max_valores=10000):
+        if periodo_rapido >= periodo_lento:
+            raise ValueError("El periodo rápido debe ser menor que el lento")
+        self.periodo_rapido = periodo_rapido
+        self.periodo_lento = periodo_lento
+        self.periodo_senal = periodo_senal
+        super().__init__("MACD", periodo_lento, max_valores)
+
+    def reiniciar(self):
+        """
+        Reinicia las tres medias exponenciales
+        """
+        self._rapida = EMA(self.periodo_rapido, max_valores=1)
+        self._lenta = EMA(self.periodo_lento, max_valores=1)
+        self._senal = EMA(self.periodo_senal, max_valores=1)
+
+    def _valor(self, fila):
+        """
+        Convierte una fila del cálculo por lotes a ValorMACD
+        """
+        return ValorMACD(*(float(v) for v in fila))
+
+    @METRICAS.medir('indicador_calculo_segundos', indicador='MACD')
+    def calcular(self, datos):
+        """
+        Calcula el MACD basado en los datos históricos
+        
+        Args:
+            datos: Barras, DataFrame o arreglo con los datos históricos
+            
+        Returns:
+            Arreglo float64 de forma (barras, 3) con el MACD, la señal y el
+            histograma (NaN sin datos suficientes)
+        """
+        cierres = precios_cierre(datos)
+
+        # Las EMA internas calculan por lotes y quedan sembradas para el modo
+        # incremental: las de precios con los cierres y la señal con el MACD
+        self.reiniciar()
+        macd = self._rapida.calcular(cierres) - self._lenta.calcular(cierres)
+        senal = self._senal.calcular(macd)
+        resultado = np.column_stack((macd, senal, macd - senal))
+
+        # Guardar los últimos valores
+        self.guardar_valores(resultado)
+
+        return resultado
+
+    def actualizar(self, nuevo_precio):
+        """
+        Actualiza el MACD con un nuevo precio en tiempo constante
+        
+        Args:
+            nuevo_precio: Nuevo precio para actualizar el indicador
+            
+        Returns:
+            ValorMACD (señal e histograma NaN hasta tener datos suficientes),
+            o None si aún no hay datos suficientes para el MACD
+        """
+        rapida = self._rapida.actualizar(nuevo_precio)
+        lenta = self._lenta.actualizar(nuevo_precio)
+        if lenta is None:
+            return None
+        macd = rapida - lenta
+        senal = self._senal.actualizar(macd)
+        if senal is None:
+            senal = float('nan')
+        self.ultimo_valor = ValorMACD(macd, senal, macd - senal)
+        return self.ultimo_valor
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from .base import media_exponencial, precios_cierre
+from metricas import METRICAS
+
+class MotorIndicadores:
+    """
+    Motor que calcula varios indicadores y periodos en una sola pasada
+    vectorizada sobre un arreglo compartido de precios de cierre
+    """
+    INDICADORES_SOPORTADOS = ('SMA', 'EMA', 'RSI')
+
+    def __init__(self, especificaciones):
+        """
+        Inicializa el motor con las especificaciones a calcular
+
+        Args:
+            especificaciones: Lista de tuplas (indicador, periodo), ej: [('SMA', 20), ('RSI', 14)]
+
+        Raises:
+            ValueError: Si algún indicador no está soportado o el periodo no es válido
+        """
+        self.especificaciones = []
+        for indicador, periodo in especificaciones:
+            indicador = indicador.upper()
+            if indicador not in self.INDICADORES_SOPORTADOS:
+                raise ValueError(f"Indicador no soportado: {indicador}")
+            if int(periodo) < 1:
+                raise ValueError(f"Periodo no válido para {indicador}: {periodo}")
+            self.especificaciones.append((indicador, int(periodo)))
+
+    def indice(self, indicador, periodo):
+        """
+        Obtiene la fila del resultado que corresponde a una especificación
+
+        Args:
+            indicador: Nombre del indicador (ej: "SMA")
+            periodo: Periodo del indicador
+
+        Returns:
+            Índice de la fila dentro del arreglo devuelto por calcular
+        """
+        return self.especificaciones.index((indicador.upper(), int(periodo)))
+
+    @METRICAS.medir('indicador_calculo_segundos', indicador='motor')
+    def calcular(self, datos):
+        """
+        Calcula todas las especificaciones sobre los precios de cierre
+
+        Args:
+            datos: Barras, DataFrame con columna 'close' o arreglo de precios de cierre
+
+        Returns:
+            Arreglo float64 de forma (especificaciones, barras). Las posiciones
+            sin datos suficientes contienen NaN
+        """
+        cierres = precios_cierre(datos)
+        n = len(cierres)
+        resultado = np.full((len(self.especificaciones), n), np.nan)
+        if n == 0:
+            return resultado
+
+        # Serie compartida por todas las SMA (envuelve el arreglo sin copiarlo)
+        serie_cierres = None
+        # Ganancias y pérdidas compartidas por todos los RSI
+        ganancias = perdidas = None
+
+        for fila, (indicador, periodo) in enumerate(self.especificaciones):
+            if indicador == 'SMA':
+                if periodo > n:
+                    continue
+                # Suma móvil compensada de pandas (O(n), sin la cancelación de
+                # restar sumas acumuladas de toda la serie), igual que SMA.calcular
+                if serie_cierres is None:
+                    serie_cierres = pd.Series(cierres, copy=False)
+                resultado[fila] = serie_cierres.rolling(window=periodo).mean().to_numpy()
+            elif indicador == 'EMA':
+                resultado[fila] = media_exponencial(cierres, 2.0 / (periodo + 1), periodo)
+            elif indicador == 'RSI':
+                if periodo >= n:
+                    continue
+                if ganancias is None:
+                    delta = np.diff(cierres)
+                    ganancias = np.maximum(delta, 0.0)
+                    perdidas = np.maximum(-delta, 0.0)
+                # Medias de Wilder, igual que RSI.calcular
+                media_ganancias = media_exponencial(ganancias, 1.0 / periodo, periodo)[periodo - 1:]
+                media_perdidas = media_exponencial(perdidas, 1.0 / periodo, periodo)[periodo - 1:]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    rs = media_ganancias / media_perdidas
+                    resultado[fila, periodo:] = np.where(media_perdidas > 0, 100 - (100 / (1 + rs)),
+                                                         np.where(media_ganancias > 0, 100.0, 50.0))
+
+        return resultado
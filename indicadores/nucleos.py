@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+# Implementaciones de los núcleos de cálculo de los indicadores
+NUCLEOS_DISPONIBLES = ('numpy', 'numba')
+
+
+def _suavizado_bucle(valores, alfa):
+    """
+    Suavizado exponencial y = ((1 - alfa) * y + alfa * x) / ((1 - alfa) + alfa)
+    partiendo de valores[0] y conservando el último valor ante un NaN, la
+    misma recurrencia que pandas ewm(alpha=alfa, adjust=False, ignore_na=True).
+    El resultado es equivalente hasta el redondeo (pandas puede diferir en
+    el último bit), así que las comparaciones deben usar una tolerancia.
+    Se compila con Numba
+    """
+    resultado = np.empty(len(valores))
+    if len(valores) == 0:
+        return resultado
+    factor = 1.0 - alfa
+    media = valores[0]
+    resultado[0] = media
+    for i in range(1, len(valores)):
+        actual = valores[i]
+        if actual == actual:
+            if media != media:
+                media = actual
+            elif media != actual:
+                media = (factor * media + alfa * actual) / (factor + alfa)
+        resultado[i] = media
+    return resultado
+
+
+def _suavizado_numpy(valores, alfa):
+    """
+    Suavizado exponencial vectorizado con pandas (ver _suavizado_bucle)
+    """
+    return pd.Series(valores, copy=False).ewm(alpha=alfa, adjust=False, ignore_na=True).mean().to_numpy()
+
+
+def _extremos_bucle(maximos, minimos, periodo):
+    """
+    Máximo de `maximos` y mínimo de `minimos` en ventanas móviles de
+    `periodo` valores con colas monótonas (O(1) amortizado por barra). Los
+    NaN e infinitos no entran en las colas y toda ventana que contiene uno da
+    NaN, igual que pandas rolling(periodo).max()/min(). Se compila con Numba
+    """
+    n = len(maximos)
+    mas_altos = np.full(n, np.nan)
+    mas_bajos = np.full(n, np.nan)
+    cola_maximos = np.empty(n, dtype=np.int64)
+    cola_minimos = np.empty(n, dtype=np.int64)
+    inicio_maximos = fin_maximos = 0
+    inicio_minimos = fin_minimos = 0
+    # Índice del último valor no finito de cada serie (-periodo: ninguno en la ventana)
+    nan_maximos = nan_minimos = -periodo
+    for i in range(n):
+        if not np.isfinite(maximos[i]):
+            nan_maximos = i
+        else:
+            while fin_maximos > inicio_maximos and maximos[cola_maximos[fin_maximos - 1]] <= maximos[i]:
+                fin_maximos -= 1
+            cola_maximos[fin_maximos] = i
+            fin_maximos += 1
+        if not np.isfinite(minimos[i]):
+            nan_minimos = i
+        else:
+            while fin_minimos > inicio_minimos and minimos[cola_minimos[fin_minimos - 1]] >= minimos[i]:
+                fin_minimos -= 1
+            cola_minimos[fin_minimos] = i
+            fin_minimos += 1
+        while fin_maximos > inicio_maximos and cola_maximos[inicio_maximos] <= i - periodo:
+            inicio_maximos += 1
+        while fin_minimos > inicio_minimos and cola_minimos[inicio_minimos] <= i - periodo:
+            inicio_minimos += 1
+        if i >= periodo - 1:
+            if nan_maximos <= i - periodo:
+                mas_altos[i] = maximos[cola_maximos[inicio_maximos]]
+            if nan_minimos <= i - periodo:
+                mas_bajos[i] = minimos[cola_minimos[inicio_minimos]]
+    return mas_altos, mas_bajos
+
+
+def _extremos_numpy(maximos, minimos, periodo):
+    """
+    Máximos y mínimos móviles vectorizados con pandas (ver _extremos_bucle)
+    """
+    mas_altos = pd.Series(maximos, copy=False).rolling(window=periodo).max().to_numpy()
+    mas_bajos = pd.Series(minimos, copy=False).rolling(window=periodo).min().to_numpy()
+    return mas_altos, mas_bajos
+
+
+_nucleos = {
+    'numpy': {'suavizado': _suavizado_numpy, 'extremos': _extremos_numpy},
+}
+_activo = 'numpy'
+
+
+def numba_disponible():
+    """
+    Indica si el paquete numba está instalado
+    """
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _compilar_numba():
+    """
+    Compila los núcleos con Numba la primera vez que se piden
+
+    Raises:
+        ImportError: Si numba no está instalado
+    """
+    if 'numba' not in _nucleos:
+        import numba
+        compilar = numba.njit(cache=True, nogil=True)
+        _nucleos['numba'] = {'suavizado': compilar(_suavizado_bucle), 'extremos': compilar(_extremos_bucle)}
+    return _nucleos['numba']
+
+
+def usar_nucleos(nombre='auto'):
+    """
+    Selecciona en tiempo de ejecución la implementación de los núcleos de
+    cálculo de los indicadores. Ambas son equivalentes hasta el redondeo:
+    los extremos móviles coinciden exactamente (también con NaN o infinitos,
+    que anulan cada ventana que los contiene) y el suavizado exponencial puede diferir
+    en el último bit
+
+    Args:
+        nombre: 'numpy' (por defecto al importar), 'numba' (bucles compilados)
+            o 'auto' (numba si está instalado)
+
+    Returns:
+        Nombre de la implementación activa
+
+    Raises:
+        ImportError: Si se pide 'numba' y el paquete no está instalado
+        ValueError: Si el nombre no es válido
+    """
+    global _activo
+    if nombre == 'auto':
+        nombre = 'numba' if numba_disponible() else 'numpy'
+    if nombre not in NUCLEOS_DISPONIBLES:
+        raise ValueError(f"Núcleos no válidos: {nombre}. Use uno de {NUCLEOS_DISPONIBLES} o 'auto'")
+    if nombre == 'numba':
+        _compilar_numba()
+    _activo = nombre
+    return _activo
+
+
+def nucleos_activos():
+    """
+    Obtiene el nombre de la implementación activa ('numpy' o 'numba')
+    """
+    return _activo
+
+
+def suavizado(valores, alfa):
+    """
+    Suavizado exponencial con la implementación activa, partiendo del primer valor
+
+    Args:
+        valores: Arreglo float64 contiguo
+        alfa: Factor de suavizado (0 < alfa <= 1)
+
+    Returns:
+        Arreglo float64 de la misma longitud
+    """
+    return _nucleos[_activo]['suavizado'](np.ascontiguousarray(valores, dtype=np.float64), alfa)
+
+
+def extremos_ventana(maximos, minimos, periodo):
+    """
+    Máximos y mínimos en ventanas móviles con la implementación activa
+
+    Args:
+        maximos: Arreglo float64 de máximos
+        minimos: Arreglo float64 de mínimos
+        periodo: Tamaño de la ventana
+
+    Returns:
+        Tupla (máximo, mínimo) de arreglos float64 (NaN en las primeras periodo - 1 posiciones)
+    """
+    return _nucleos[_activo]['extremos'](np.ascontiguousarray(maximos, dtype=np.float64),
+                                         np.ascontiguousarray(minimos, dtype=np.float64), periodo)
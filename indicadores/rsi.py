@@ -1,55 +1,116 @@
-from .base import IndicadorBase
-import pandas as pd
+from .base import IndicadorBase, media_exponencial, precios_cierre
 import numpy as np
+from metricas import METRICAS
 
 class RSI(IndicadorBase):
     """
-    Indicador RSI (Relative Strength Index)
+    Indicador RSI (Relative Strength Index) con el suavizado de Wilder
     """
-    def __init__(self, periodo=14):
-        super().__init__("RSI", periodo)
+    def __init__(self, periodo=14, max_valores=10000):
+        super().__init__("RSI", periodo, max_valores)
 
+    def reiniciar(self):
+        """
+        Reinicia el estado del modo incremental (último precio, sumas de la
+        ventana inicial y medias suavizadas de ganancias y pérdidas)
+        """
+        self._precio_anterior = None
+        self._contador = 0
+        self._suma_ganancias = 0.0
+        self._suma_perdidas = 0.0
+        self._media_ganancias = None
+        self._media_perdidas = None
+
+    @staticmethod
+    def _rsi(media_ganancias, media_perdidas):
+        """
+        Calcula el RSI a partir de las medias de ganancias y pérdidas. Sin
+        pérdidas el RSI es 100, y 50 si tampoco hay ganancias (precio plano)
+        """
+        if media_perdidas <= 0:
+            return 100.0 if media_ganancias > 0 else 50.0
+        return 100 - (100 / (1 + media_ganancias / media_perdidas))
+
+    @METRICAS.medir('indicador_calculo_segundos', indicador='RSI')
     def calcular(self, datos):
         """
-        Calcula el RSI basado en los datos históricos
+        Calcula el RSI con el suavizado de Wilder basado en los datos históricos
         
         Args:
-            datos: DataFrame con los datos históricos
+            datos: Barras, DataFrame o arreglo con los datos históricos
             
         Returns:
-            DataFrame con los valores del RSI
+            Arreglo float64 con los valores del RSI (NaN sin datos suficientes)
         """
+        cierres = precios_cierre(datos)
+        rsi = np.full(len(cierres), np.nan)
+        if len(cierres) <= self.periodo:
+            self.inicializar(cierres)
+            self.guardar_valores(rsi)
+            return rsi
+        
         # Calcular las ganancias y pérdidas
-        delta = datos['close'].diff()
-        ganancias = delta.where(delta > 0, 0)
-        perdidas = -delta.where(delta < 0, 0)
+        delta = np.diff(cierres)
+        ganancias = np.maximum(delta, 0.0)
+        perdidas = np.maximum(-delta, 0.0)
 
-        # Calcular el promedio de ganancias y pérdidas
-        avg_ganancias = ganancias.rolling(window=self.periodo).mean()
-        avg_perdidas = perdidas.rolling(window=self.periodo).mean()
+        # Medias de Wilder (media simple de la primera ventana y después
+        # suavizado exponencial con alfa = 1 / periodo)
+        alfa = 1.0 / self.periodo
+        media_ganancias = media_exponencial(ganancias, alfa, self.periodo)
+        media_perdidas = media_exponencial(perdidas, alfa, self.periodo)
 
         # Calcular el RSI
-        rs = avg_ganancias / avg_perdidas
-        rsi = 100 - (100 / (1 + rs))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = media_ganancias / media_perdidas
+            rsi[1:] = np.where(media_perdidas > 0, 100 - (100 / (1 + rs)),
+                               np.where(media_ganancias > 0, 100.0, 50.0))
+        rsi[:self.periodo] = np.nan
+
+        # Continuar el modo incremental desde el estado final
+        self.reiniciar()
+        self._precio_anterior = float(cierres[-1])
+        self._contador = self.periodo
+        self._media_ganancias = float(media_ganancias[-1])
+        self._media_perdidas = float(media_perdidas[-1])
 
-        # Guardar los valores
-        self.valores = rsi.tolist()
-        self.ultimo_valor = rsi.iloc[-1] if len(rsi) > 0 else None
+        # Guardar los últimos valores
+        self.guardar_valores(rsi)
 
         return rsi
 
-    def actualizar(self, nuevo_precio, datos_anteriores):
+    def actualizar(self, nuevo_precio):
         """
-        Actualiza el RSI con un nuevo precio
+        Actualiza el RSI con un nuevo precio en tiempo constante
         
         Args:
             nuevo_precio: Nuevo precio para actualizar el indicador
-            datos_anteriores: DataFrame con los datos históricos anteriores
+            
+        Returns:
+            El nuevo valor del RSI, o None si aún no hay datos suficientes
         """
-        # Agregar el nuevo precio a los datos
-        datos = datos_anteriores.copy()
-        datos = datos.append({'close': nuevo_precio}, ignore_index=True)
+        if self._precio_anterior is None:
+            self._precio_anterior = nuevo_precio
+            return None
+
+        delta = nuevo_precio - self._precio_anterior
+        self._precio_anterior = nuevo_precio
+        ganancia = delta if delta > 0 else 0.0
+        perdida = -delta if delta < 0 else 0.0
+
+        if self._contador < self.periodo:
+            # Primera ventana: media simple
+            self._contador += 1
+            self._suma_ganancias += ganancia
+            self._suma_perdidas += perdida
+            if self._contador < self.periodo:
+                return None
+            self._media_ganancias = self._suma_ganancias / self.periodo
+            self._media_perdidas = self._suma_perdidas / self.periodo
+        else:
+            alfa = 1.0 / self.periodo
+            self._media_ganancias += alfa * (ganancia - self._media_ganancias)
+            self._media_perdidas += alfa * (perdida - self._media_perdidas)
 
-        # Calcular el RSI actualizado
-        rsi = self.calcular(datos)
-        return rsi.iloc[-1]
+        self.ultimo_valor = self._rsi(self._media_ganancias, self._media_perdidas)
+        return self.ultimo_valor
@@ -1,44 +1,77 @@
-from .base import IndicadorBase
+from .base import IndicadorBase, precios_cierre
+from collections import deque
 import pandas as pd
+from metricas import METRICAS
 
 class SMA(IndicadorBase):
     """
     Indicador SMA (Simple Moving Average)
     """
-    def __init__(self, periodo=14):
-        super().__init__("SMA", periodo)
+    def __init__(self, periodo=14, max_valores=10000):
+        super().__init__("SMA", periodo, max_valores)
 
+    def reiniciar(self):
+        """
+        Reinicia el buffer circular y la suma acumulada del modo incremental
+        """
+        self._buffer = deque(maxlen=self.periodo)
+        self._suma = 0.0
+        self._compensacion = 0.0
+
+    def _acumular(self, valor):
+        """
+        Suma un valor a la suma de la ventana con compensación de Neumaier,
+        que recoge en _compensacion el error de redondeo de cada operación
+        para que no se acumule con las altas y bajas de la ventana
+        """
+        total = self._suma + valor
+        if abs(self._suma) >= abs(valor):
+            self._compensacion += (self._suma - total) + valor
+        else:
+            self._compensacion += (valor - total) + self._suma
+        self._suma = total
+
+    @METRICAS.medir('indicador_calculo_segundos', indicador='SMA')
     def calcular(self, datos):
         """
         Calcula la SMA basada en los datos históricos
         
         Args:
-            datos: DataFrame con los datos históricos
+            datos: Barras, DataFrame o arreglo con los datos históricos
             
         Returns:
-            DataFrame con los valores de la SMA
+            Arreglo float64 con los valores de la SMA (NaN sin datos suficientes)
         """
-        # Calcular la SMA
-        sma = datos['close'].rolling(window=self.periodo).mean()
+        cierres = precios_cierre(datos)
+        
+        # Calcular la SMA (la Serie envuelve el arreglo sin copiarlo)
+        sma = pd.Series(cierres, copy=False).rolling(window=self.periodo).mean().to_numpy()
+
+        # Sembrar el modo incremental con la última ventana
+        self.inicializar(cierres[-self.periodo:])
 
-        # Guardar los valores
-        self.valores = sma.tolist()
-        self.ultimo_valor = sma.iloc[-1] if len(sma) > 0 else None
+        # Guardar los últimos valores
+        self.guardar_valores(sma)
 
         return sma
 
-    def actualizar(self, nuevo_precio, datos_anteriores):
+    def actualizar(self, nuevo_precio):
         """
-        Actualiza la SMA con un nuevo precio
+        Actualiza la SMA con un nuevo precio en tiempo constante
         
         Args:
             nuevo_precio: Nuevo precio para actualizar el indicador
-            datos_anteriores: DataFrame con los datos históricos anteriores
+            
+        Returns:
+            El nuevo valor de la SMA, o None si aún no hay datos suficientes
         """
-        # Agregar el nuevo precio a los datos
-        datos = datos_anteriores.copy()
-        datos = datos.append({'close': nuevo_precio}, ignore_index=True)
+        if len(self._buffer) == self.periodo:
+            self._acumular(-self._buffer[0])
+        self._buffer.append(nuevo_precio)
+        self._acumular(nuevo_precio)
+
+        if len(self._buffer) < self.periodo:
+            return None
 
-        # Calcular la SMA actualizada
-        sma = self.calcular(datos)
-        return sma.iloc[-1]
+        self.ultimo_valor = (self._suma + self._compensacion) / self.periodo
+        return self.ultimo_valor
@@ -0,0 +1,497 @@
+"""
+Instrumentación del bot: contadores, histogramas de latencia, temporizadores
+y un perfilador por muestreo opcional. Las métricas se exportan en formato de
+texto de Prometheus o en JSON, a un archivo o por HTTP en un puerto local.
+
+Uso:
+
+    from metricas import METRICAS
+
+    with METRICAS.temporizador('mt5_llamada_segundos', operacion='copy_rates_range'):
+        ...
+    METRICAS.contador('ordenes_total', resultado='ejecutada').incrementar()
+"""
+import bisect
+import collections
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Límites (en segundos) de los intervalos de los histogramas de latencia
+LIMITES_POR_DEFECTO = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01,
+                       0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+def _clave_etiquetas(etiquetas):
+    """
+    Convierte un diccionario de etiquetas en una tupla ordenable y hashable
+    """
+    return tuple(sorted((str(k), str(v)) for k, v in etiquetas.items()))
+
+
+def _formatear_etiquetas(etiquetas, extra=()):
+    """
+    Formatea las etiquetas para el formato de texto de Prometheus
+    """
+    pares = list(etiquetas) + list(extra)
+    if not pares:
+        return ""
+    texto = ",".join('{}="{}"'.format(k, v.replace('\\', '\\\\').replace('"', '\\"')) for k, v in pares)
+    return "{" + texto + "}"
+
+
+class Contador:
+    """
+    Contador monótono
+    """
+    def __init__(self):
+        self.valor = 0
+        self._bloqueo = threading.Lock()
+
+    def incrementar(self, cantidad=1):
+        """
+        Suma una cantidad al contador
+        """
+        with self._bloqueo:
+            self.valor += cantidad
+
+
+class Histograma:
+    """
+    Histograma con intervalos fijos (como los de Prometheus); conserva la
+    cuenta, la suma y el máximo, y estima percentiles a partir de los intervalos
+    """
+    def __init__(self, limites=LIMITES_POR_DEFECTO):
+        """
+        Inicializa el histograma
+
+        Args:
+            limites: Límites superiores de los intervalos, en orden creciente
+        """
+        self.limites = tuple(limites)
+        self.cuentas = [0] * (len(self.limites) + 1)
+        self.cuenta = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+        self._bloqueo = threading.Lock()
+
+    def observar(self, valor):
+        """
+        Registra una observación
+        """
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._bloqueo:
+            self.cuentas[indice] += 1
+            self.cuenta += 1
+            self.suma += valor
+            if valor > self.maximo:
+                self.maximo = valor
+
+    def percentil(self, fraccion):
+        """
+        Estima un percentil interpolando dentro del intervalo que lo contiene
+
+        Args:
+            fraccion: Percentil entre 0 y 1 (ej: 0.99)
+
+        Returns:
+            Valor estimado, o None si no hay observaciones
+        """
+        with self._bloqueo:
+            cuentas = list(self.cuentas)
+            total = self.cuenta
+            maximo = self.maximo
+        if total == 0:
+            return None
+        objetivo = fraccion * total
+        acumulado = 0
+        for indice, cuenta in enumerate(cuentas):
+            if cuenta and acumulado + cuenta >= objetivo:
+                inferior = self.limites[indice - 1] if indice > 0 else 0.0
+                superior = self.limites[indice] if indice < len(self.limites) else maximo
+                superior = min(superior, maximo)
+                return inferior + (superior - inferior) * (objetivo - acumulado) / cuenta
+            acumulado += cuenta
+        return maximo
+
+    def resumen(self):
+        """
+        Obtiene cuenta, suma, media, p50, p90, p99 y máximo
+        """
+        return {
+            'cuenta': self.cuenta,
+            'suma': self.suma,
+            'media': self.suma / self.cuenta if self.cuenta else None,
+            'p50': self.percentil(0.5),
+            'p90': self.percentil(0.9),
+            'p99': self.percentil(0.99),
+            'maximo': self.maximo if self.cuenta else None,
+        }
+
+
+class _Temporizador:
+    """
+    Administrador de contexto que observa la duración de un bloque
+    """
+    __slots__ = ('histograma', 'inicio')
+
+    def __init__(self, histograma):
+        self.histograma = histograma
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.histograma.observar(time.perf_counter() - self.inicio)
+        return False
+
+
+class _TemporizadorNulo:
+    """
+    Temporizador sin efecto usado cuando las métricas están desactivadas
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+
+_TEMPORIZADOR_NULO = _TemporizadorNulo()
+
+
+class RegistroMetricas:
+    """
+    Registro de métricas con nombre y etiquetas. Es seguro entre hilos y,
+    desactivado, los temporizadores no miden nada
+    """
+    def __init__(self, activo=True):
+        """
+        Inicializa el registro
+
+        Args:
+            activo: Si es False los temporizadores no registran observaciones
+        """
+        self.activo = activo
+        self._metricas = {}
+        self._descripciones = {}
+        self._bloqueo = threading.Lock()
+        self._servidor = None
+
+    def describir(self, nombre, descripcion):
+        """
+        Asocia una descripción (HELP de Prometheus) a una métrica
+        """
+        self._descripciones[nombre] = descripcion
+
+    def _obtener(self, tipo, nombre, etiquetas):
+        """
+        Obtiene o crea la métrica con ese nombre y etiquetas
+        """
+        clave = (nombre, _clave_etiquetas(etiquetas))
+        metrica = self._metricas.get(clave)
+        if metrica is None:
+            with self._bloqueo:
+                metrica = self._metricas.get(clave)
+                if metrica is None:
+                    metrica = tipo()
+                    self._metricas[clave] = metrica
+        if not isinstance(metrica, tipo):
+            raise TypeError(f"La métrica {nombre} ya existe con otro tipo")
+        return metrica
+
+    def contador(self, nombre, **etiquetas):
+        """
+        Obtiene el contador con ese nombre y etiquetas
+        """
+        return self._obtener(Contador, nombre, etiquetas)
+
+    def histograma(self, nombre, **etiquetas):
+        """
+        Obtiene el histograma con ese nombre y etiquetas
+        """
+        return self._obtener(Histograma, nombre, etiquetas)
+
+    def temporizador(self, nombre, **etiquetas):
+        """
+        Crea un administrador de contexto que registra en segundos la
+        duración del bloque en el histograma indicado
+        """
+        if not self.activo:
+            return _TEMPORIZADOR_NULO
+        return _Temporizador(self.histograma(nombre, **etiquetas))
+
+    def medir(self, nombre, **etiquetas):
+        """
+        Decorador que registra la duración de cada llamada a la función
+        """
+        def decorador(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                if not self.activo:
+                    return funcion(*args, **kwargs)
+                with _Temporizador(self.histograma(nombre, **etiquetas)):
+                    return funcion(*args, **kwargs)
+            return envoltura
+        return decorador
+
+    def reiniciar(self):
+        """
+        Elimina todas las métricas registradas
+        """
+        with self._bloqueo:
+            self._metricas.clear()
+
+    def _agrupadas(self):
+        """
+        Agrupa las métricas por nombre
+
+        Returns:
+            Diccionario {nombre: [(etiquetas, métrica)]} ordenado por nombre
+        """
+        with self._bloqueo:
+            elementos = list(self._metricas.items())
+        grupos = {}
+        for (nombre, etiquetas), metrica in sorted(elementos, key=lambda e: e[0]):
+            grupos.setdefault(nombre, []).append((etiquetas, metrica))
+        return grupos
+
+    def exportar_json(self):
+        """
+        Exporta las métricas como diccionario serializable a JSON
+
+        Returns:
+            Diccionario {nombre: [{'etiquetas': {...}, 'valor' o resumen del histograma}]}
+        """
+        resultado = {}
+        for nombre, series in self._agrupadas().items():
+            lista = []
+            for etiquetas, metrica in series:
+                entrada = {'etiquetas': dict(etiquetas)}
+                if isinstance(metrica, Contador):
+                    entrada['valor'] = metrica.valor
+                else:
+                    entrada.update(metrica.resumen())
+                lista.append(entrada)
+            resultado[nombre] = lista
+        return resultado
+
+    def exportar_prometheus(self):
+        """
+        Exporta las métricas en el formato de texto de Prometheus
+
+        Returns:
+            Texto con una línea por serie
+        """
+        lineas = []
+        for nombre, series in self._agrupadas().items():
+            if nombre in self._descripciones:
+                lineas.append(f"# HELP {nombre} {self._descripciones[nombre]}")
+            if isinstance(series[0][1], Contador):
+                lineas.append(f"# TYPE {nombre} counter")
+                for etiquetas, metrica in series:
+                    lineas.append(f"{nombre}{_formatear_etiquetas(etiquetas)} {metrica.valor}")
+                continue
+            lineas.append(f"# TYPE {nombre} histogram")
+            for etiquetas, metrica in series:
+                with metrica._bloqueo:
+                    cuentas = list(metrica.cuentas)
+                    cuenta, suma = metrica.cuenta, metrica.suma
+                acumulado = 0
+                for limite, parcial in zip(metrica.limites + (float('inf'),), cuentas):
+                    acumulado += parcial
+                    le = "+Inf" if limite == float('inf') else repr(limite)
+                    lineas.append(f"{nombre}_bucket{_formatear_etiquetas(etiquetas, [('le', le)])} {acumulado}")
+                lineas.append(f"{nombre}_sum{_formatear_etiquetas(etiquetas)} {suma}")
+                lineas.append(f"{nombre}_count{_formatear_etiquetas(etiquetas)} {cuenta}")
+        return "\n".join(lineas) + "\n"
+
+    def escribir(self, ruta, formato=None):
+        """
+        Escribe las métricas en un archivo de forma atómica
+
+        Args:
+            ruta: Archivo de destino
+            formato: 'prometheus' o 'json' (por defecto según la extensión del archivo)
+        """
+        formato = formato or ('json' if ruta.endswith('.json') else 'prometheus')
+        if formato == 'json':
+            contenido = json.dumps(self.exportar_json(), indent=2)
+        else:
+            contenido = self.exportar_prometheus()
+        temporal = ruta + ".tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+
+    def servir(self, puerto, direccion="127.0.0.1"):
+        """
+        Publica las métricas por HTTP en un hilo propio: /metrics en formato
+        Prometheus y /metrics.json en JSON
+
+        Args:
+            puerto: Puerto local (0 para elegir uno libre)
+            direccion: Dirección en la que escuchar
+
+        Returns:
+            Puerto en el que se escucha
+        """
+        if self._servidor is not None:
+            return self._servidor.server_address[1]
+        registro = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    cuerpo = json.dumps(registro.exportar_json()).encode('utf-8')
+                    tipo = 'application/json'
+                elif self.path.startswith('/metrics'):
+                    cuerpo = registro.exportar_prometheus().encode('utf-8')
+                    tipo = 'text/plain; version=0.0.4'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', tipo)
+                self.send_header('Content-Length', str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer((direccion, puerto), Manejador)
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, name="ServidorMetricas", daemon=True).start()
+        return self._servidor.server_address[1]
+
+    def detener_servidor(self):
+        """
+        Detiene el servidor HTTP de métricas
+        """
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+
+class PerfiladorMuestreo:
+    """
+    Perfilador por muestreo: un hilo toma periódicamente la pila de los
+    demás hilos con sys._current_frames() y cuenta cuántas veces aparece
+    cada función. Su coste no depende del número de llamadas, así que puede
+    activarse con el bot en marcha
+    """
+    def __init__(self, intervalo=0.005, max_profundidad=64):
+        """
+        Inicializa el perfilador
+
+        Args:
+            intervalo: Segundos entre muestras
+            max_profundidad: Marcos máximos registrados por pila
+        """
+        self.intervalo = intervalo
+        self.max_profundidad = max_profundidad
+        self.muestras = 0
+        self._propias = collections.Counter()
+        self._acumuladas = collections.Counter()
+        self._pilas = collections.Counter()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    @property
+    def activo(self):
+        """
+        Indica si el perfilador está tomando muestras
+        """
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self):
+        """
+        Empieza a tomar muestras
+        """
+        if self.activo:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="PerfiladorMuestreo", daemon=True)
+        self._hilo.start()
+
+    def detener(self, espera=1.0):
+        """
+        Deja de tomar muestras (los resultados se conservan)
+        """
+        self._detener.set()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(espera)
+        self._hilo = None
+
+    def reiniciar(self):
+        """
+        Descarta las muestras tomadas
+        """
+        self.muestras = 0
+        self._propias.clear()
+        self._acumuladas.clear()
+        self._pilas.clear()
+
+    def _bucle(self):
+        """
+        Bucle del hilo de muestreo
+        """
+        propio = threading.get_ident()
+        while not self._detener.wait(self.intervalo):
+            for hilo, marco in sys._current_frames().items():
+                if hilo == propio:
+                    continue
+                pila = []
+                while marco is not None and len(pila) < self.max_profundidad:
+                    codigo = marco.f_code
+                    pila.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                    marco = marco.f_back
+                if not pila:
+                    continue
+                self._propias[pila[0]] += 1
+                for funcion in set(pila):
+                    self._acumuladas[funcion] += 1
+                self._pilas[";".join(reversed(pila))] += 1
+            self.muestras += 1
+
+    def resultados(self, limite=20):
+        """
+        Obtiene las funciones con más muestras
+
+        Args:
+            limite: Número de funciones a devolver
+
+        Returns:
+            Lista de diccionarios con funcion, propias (muestras en la propia
+            función) y acumuladas (muestras con la función en la pila)
+        """
+        return [{'funcion': funcion, 'propias': propias, 'acumuladas': self._acumuladas[funcion]}
+                for funcion, propias in self._propias.most_common(limite)]
+
+    def escribir_pilas(self, ruta):
+        """
+        Escribe las pilas en formato "colapsado" (una línea "a;b;c cuenta"),
+        compatible con flamegraph.pl y speedscope
+        """
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            for pila, cuenta in self._pilas.most_common():
+                archivo.write(f"{pila} {cuenta}\n")
+
+
+# Registro compartido por el conector, los indicadores y los ejecutores
+METRICAS = RegistroMetricas()
+METRICAS.describir('mt5_llamada_segundos', "Duración de las llamadas al terminal MT5")
+METRICAS.describir('conector_operacion_segundos', "Duración de las operaciones del conector")
+METRICAS.describir('indicador_calculo_segundos', "Duración del cálculo vectorizado de indicadores")
+METRICAS.describir('estrategia_ciclo_segundos', "Duración de cada ejecución de una estrategia")
+METRICAS.describir('ejecutor_ciclo_segundos', "Duración de cada ciclo completo del ejecutor")
+METRICAS.describir('estrategia_errores_total', "Errores lanzados por las estrategias")
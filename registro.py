@@ -0,0 +1,102 @@
+import logging
+import logging.handlers
+import queue
+import tkinter as tk
+from collections import deque
+
+class PanelRegistro:
+    """
+    Registro de mensajes para el área de texto de la interfaz. Los mensajes se
+    acumulan en un buffer circular acotado y se vuelcan al widget por lotes
+    con root.after, limitando las líneas visibles; el flujo completo se
+    escribe de forma asíncrona en un archivo rotativo
+    """
+    def __init__(self, root, widget, max_lineas=1000, capacidad=10000, intervalo_ms=100,
+                 ruta_archivo="bot.log", max_bytes=5 * 1024 * 1024, copias=3):
+        """
+        Inicializa el panel de registro
+        
+        Args:
+            root: Ventana principal de Tk
+            widget: tk.Text donde se muestran los mensajes
+            max_lineas: Líneas máximas visibles en el widget
+            capacidad: Mensajes máximos pendientes de volcar (los más antiguos se descartan)
+            intervalo_ms: Milisegundos entre volcados al widget
+            ruta_archivo: Archivo de registro rotativo (None para no escribir a disco)
+            max_bytes: Tamaño máximo de cada archivo de registro
+            copias: Número de archivos rotados que se conservan
+        """
+        self.root = root
+        self.widget = widget
+        self.max_lineas = max_lineas
+        self.intervalo_ms = intervalo_ms
+        # deque.append y popleft son atómicos: cualquier hilo puede agregar mensajes
+        self._pendientes = deque(maxlen=capacidad)
+        self.descartados = 0
+        self._activo = True
+        
+        # Escritura a disco en un hilo aparte mediante QueueHandler/QueueListener
+        self._logger = logging.getLogger("bot_mt5")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._listener = None
+        if ruta_archivo:
+            archivo = logging.handlers.RotatingFileHandler(
+                ruta_archivo, maxBytes=max_bytes, backupCount=copias, encoding='utf-8', delay=True)
+            archivo.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            cola = queue.SimpleQueue()
+            self._handler = logging.handlers.QueueHandler(cola)
+            self._logger.addHandler(self._handler)
+            self._listener = logging.handlers.QueueListener(cola, archivo)
+            self._listener.start()
+        
+        self.root.after(self.intervalo_ms, self._volcar)
+
+    def agregar(self, mensaje):
+        """
+        Agrega un mensaje. Se puede llamar desde cualquier hilo
+        
+        Args:
+            mensaje: Texto del mensaje
+        """
+        if len(self._pendientes) == self._pendientes.maxlen:
+            self.descartados += 1
+        self._pendientes.append(mensaje)
+        if self._listener is not None:
+            self._logger.info(mensaje)
+
+    def _volcar(self):
+        """
+        Vuelca los mensajes pendientes al widget en una sola inserción y
+        recorta las líneas que superan el máximo visible
+        """
+        if not self._activo:
+            return
+        if self._pendientes:
+            lineas = []
+            try:
+                while True:
+                    lineas.append(self._pendientes.popleft())
+            except IndexError:
+                pass
+            # Si llegan más líneas de las visibles solo se insertan las últimas
+            lineas = lineas[-self.max_lineas:]
+            
+            self.widget.config(state='normal')
+            self.widget.insert(tk.END, "\n".join(lineas) + "\n")
+            total = int(self.widget.index('end-1c').split('.')[0]) - 1
+            if total > self.max_lineas:
+                self.widget.delete('1.0', f"{total - self.max_lineas + 1}.0")
+            self.widget.see(tk.END)
+            self.widget.config(state='disabled')
+        self.root.after(self.intervalo_ms, self._volcar)
+
+    def detener(self):
+        """
+        Detiene los volcados y termina de escribir el archivo de registro
+        """
+        self._activo = False
+        if self._listener is not None:
+            self._listener.stop()
+            self._logger.removeHandler(self._handler)
+            self._listener = None
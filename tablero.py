@@ -0,0 +1,102 @@
+import threading
+
+class ActualizadorCuenta:
+    """
+    Consulta en segundo plano la cuenta y las posiciones abiertas a una
+    frecuencia configurable y guarda solo los campos que cambiaron. La
+    interfaz recoge los cambios acumulados una vez por cuadro, de modo que
+    varias consultas entre cuadros se combinan en una sola actualización
+    """
+    def __init__(self, conector, intervalo=1.0):
+        """
+        Inicializa el actualizador
+        
+        Args:
+            conector: Instancia de ConectorMT5
+            intervalo: Segundos entre consultas al terminal
+        """
+        if intervalo <= 0:
+            raise ValueError("El intervalo debe ser mayor que cero")
+        self.conector = conector
+        self.intervalo = intervalo
+        self.ultimo_error = None
+        self._ultimo = {}
+        self._cambios = {}
+        self._bloqueo = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        """
+        Inicia el hilo de consulta
+        """
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._ultimo = {}
+        self._hilo = threading.Thread(target=self._bucle, name="ActualizadorCuenta", daemon=True)
+        self._hilo.start()
+
+    def detener(self, espera=2.0):
+        """
+        Detiene el hilo de consulta
+        """
+        self._detener.set()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(espera)
+        self._hilo = None
+
+    def instantanea(self):
+        """
+        Consulta la cuenta y las posiciones y las formatea para la interfaz
+        
+        Returns:
+            Diccionario {campo: texto} con cuenta, balance, equity, beneficio
+            flotante de las posiciones ganadoras y perdedoras y posiciones
+        """
+        info = self.conector.obtener_info_cuenta()
+        posiciones = self.conector.obtener_posiciones()
+        ganancias = sum(p.profit for p in posiciones if p.profit > 0)
+        perdidas = -sum(p.profit for p in posiciones if p.profit < 0)
+        return {
+            'cuenta': str(info.login),
+            'balance': f"{info.balance:.2f}",
+            'equity': f"{info.equity:.2f}",
+            'flotante_ganancias': f"{ganancias:.2f}",
+            'flotante_perdidas': f"{perdidas:.2f}",
+            'posiciones': str(len(posiciones)),
+        }
+
+    def consultar(self):
+        """
+        Realiza una consulta y acumula los campos que cambiaron
+        """
+        actual = self.instantanea()
+        cambios = {campo: valor for campo, valor in actual.items() if self._ultimo.get(campo) != valor}
+        self._ultimo = actual
+        if cambios:
+            with self._bloqueo:
+                self._cambios.update(cambios)
+
+    def tomar_cambios(self):
+        """
+        Obtiene y limpia los cambios acumulados desde la última llamada
+        
+        Returns:
+            Diccionario {campo: texto} solo con los campos que cambiaron
+        """
+        with self._bloqueo:
+            cambios, self._cambios = self._cambios, {}
+        return cambios
+
+    def _bucle(self):
+        """
+        Bucle del hilo de consulta
+        """
+        while not self._detener.is_set():
+            try:
+                self.consultar()
+                self.ultimo_error = None
+            except Exception as e:
+                self.ultimo_error = e
+            self._detener.wait(self.intervalo)